@@ -0,0 +1,104 @@
+""" Rounds per second of one bot connection on localhost.
+
+Long fights: the session's player and enemy get many lives, like bench_fight_api, so every batch is resolved whole.
+Real games: a Normal game is over after about six rounds, so the rate is bounded by messages per second.
+
+Run: python -m benchmark.bench_bot_server
+"""
+import asyncio
+import time
+from random import Random
+from unittest.mock import MagicMock
+
+from source.bot_server import BotProtocol
+from source.models import Player, Enemy, Battle
+
+BATCH = 65_536
+LONG_BATCHES = 100
+GAME_BATCH = 16
+GAME_MESSAGES = 20_000
+PIPELINE = 256
+ROUNDS = 200_000
+
+
+class LongFightProtocol(BotProtocol):
+    """
+    Bot connection whose games last for millions of rounds
+    """
+
+    def hello(self, line: bytes) -> tuple[bytes, bool]:
+        reply = super().hello(line)
+        game = self.session.game
+        game.player.lives = 10 ** 9
+        game.enemy.lives = 10 ** 9
+        return reply
+
+
+async def play(protocol: type, messages: int, batch_size: int) -> tuple[int, float]:
+    """
+    Send pipelined batches and count resolved rounds
+    :return: rounds and seconds
+    """
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(lambda: protocol(MagicMock()), '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    rng = Random(1)
+    batch = bytes(rng.choice(b'123') for _ in range(batch_size)) + b'\n'
+    async with server:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port, limit=2 ** 20)
+        writer.write(b'Bot 1 1\n')
+        await reader.readline()
+        rounds = 0
+        start = time.perf_counter()
+        for sent in range(0, messages, PIPELINE):
+            window = min(PIPELINE, messages - sent)
+            writer.write(batch * window)
+            for _ in range(window):
+                rounds += int((await reader.readline()).split(maxsplit=1)[0])
+        elapsed = time.perf_counter() - start
+        writer.close()
+    return rounds, elapsed
+
+
+def bench_engine() -> tuple[float, float]:
+    """
+    Rounds per second of resolve_codes() and of play_round() in one long fight
+    """
+    def battle() -> Battle:
+        player = Player('Bot')
+        player.lives = 10 ** 9
+        enemy = Enemy('Hard', 1)
+        enemy.lives = 10 ** 9
+        return Battle(player, enemy, 'Hard', headless=True)
+
+    rng = Random(1)
+    player_codes = bytes(rng.choice(b'123') for _ in range(ROUNDS))
+    enemy_codes = bytes(rng.choice(b'123') for _ in range(ROUNDS))
+    codes_battle = battle()
+    start = time.perf_counter()
+    for offset in range(0, ROUNDS, BATCH):
+        codes_battle.resolve_codes(player_codes[offset:offset + BATCH], enemy_codes[offset:offset + BATCH])
+    codes_time = time.perf_counter() - start
+    round_battle = battle()
+    attacks = {ord('1'): 'Paper', ord('2'): 'Stone', ord('3'): 'Scissors'}
+    start = time.perf_counter()
+    for player_code, enemy_code in zip(player_codes, enemy_codes):
+        round_battle.play_round(attacks[player_code], attacks[enemy_code])
+    round_time = time.perf_counter() - start
+    assert codes_battle.player.score == round_battle.player.score
+    return ROUNDS / codes_time, ROUNDS / round_time
+
+
+def main() -> None:
+    codes_rate, round_rate = bench_engine()
+    print(f'engine, play_round():     {round_rate:12.0f} rounds/s')
+    print(f'engine, resolve_codes():  {codes_rate:12.0f} rounds/s')
+    rounds, elapsed = asyncio.run(play(LongFightProtocol, LONG_BATCHES, BATCH))
+    print(f'connection, long fights:  {rounds / elapsed:12.0f} rounds/s ({BATCH} attacks per message)')
+    rounds, elapsed = asyncio.run(play(BotProtocol, GAME_MESSAGES, GAME_BATCH))
+    print(f'connection, Normal games: {rounds / elapsed:12.0f} rounds/s, {GAME_MESSAGES / elapsed:.0f} messages/s, '
+          f'{rounds / GAME_MESSAGES:.1f} rounds per message')
+
+
+if __name__ == '__main__':
+    main()
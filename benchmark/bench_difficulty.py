@@ -0,0 +1,40 @@
+""" Enemy spawn cost by level: validated Enemy() against the compiled difficulty table.
+
+Run: python -m benchmark.bench_difficulty
+"""
+import time
+
+from settings import MODE_HARD
+from source.difficulty import Difficulty
+from source.models import Enemy
+
+SPAWNS = 200_000
+LEVELS = (1, 1_000, 1_000_000)
+
+
+def bench_enemy(level: int) -> float:
+    start = time.perf_counter()
+    for _ in range(SPAWNS):
+        Enemy(MODE_HARD, level)
+    return (time.perf_counter() - start) / SPAWNS
+
+
+def bench_table(level: int) -> float:
+    table = Difficulty().table(MODE_HARD)
+    table.spawn(level)  # first spawn above the compiled levels extends the table
+    start = time.perf_counter()
+    for _ in range(SPAWNS):
+        table.spawn(level)
+    return (time.perf_counter() - start) / SPAWNS
+
+
+def main() -> None:
+    start = time.perf_counter()
+    Difficulty().table(MODE_HARD).spawn(LEVELS[-1])
+    print(f'compile {LEVELS[-1]} levels: {(time.perf_counter() - start) * 1e3:.0f}ms')
+    for level in LEVELS:
+        print(f'level {level:>9}: Enemy() {bench_enemy(level) * 1e9:6.0f}ns, table {bench_table(level) * 1e9:6.0f}ns')
+
+
+if __name__ == '__main__':
+    main()
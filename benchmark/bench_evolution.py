@@ -0,0 +1,28 @@
+""" Enemy evolution: time per generation in one process and on the process pool, cached fitness and
+the player score against the evolved enemy on new games.
+
+Run: python -m benchmark.bench_evolution
+"""
+import os
+import time
+
+from source.evolution import EnemyEvolution, player_score
+
+WORKERS = (1, None)
+
+
+def main() -> None:
+    for workers in WORKERS:
+        evolution = EnemyEvolution(workers=workers, seed=1)
+        start = time.perf_counter()
+        strategy = evolution.run()
+        elapsed = time.perf_counter() - start
+        candidates = evolution.population * (evolution.generations + 1)
+        print(f'{workers or os.cpu_count()} worker(s): {elapsed / evolution.generations * 1e3:8.1f}ms/generation, '
+              f'{len(evolution.fitness)} of {candidates} candidates scored')
+    print(f'mean player score on new games: random enemy {player_score(None, seed=2):.2f}, '
+          f'evolved enemy {player_score(strategy.genome(), seed=2):.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+""" Rounds per second in long Hard-mode games: exception interface vs result-code interface.
+
+Run: python -m benchmark.bench_fight_api
+"""
+import io
+import random
+import time
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from settings import MODE_HARD, ATTACK_PAIRS_OUTCOME, PAPER, STONE, SCISSORS
+from source.exceptions import EnemyDown, GameOver
+from source.models import Player, Enemy, Battle, FightOutcome
+
+ROUNDS = 200_000
+PLAYER_LIVES = 10_000
+
+
+def fight_results() -> list[int]:
+    attacks = (PAPER, STONE, SCISSORS)
+    rng = random.Random(1)
+    return [ATTACK_PAIRS_OUTCOME[(rng.choice(attacks), rng.choice(attacks))] for _ in range(ROUNDS)]
+
+
+def new_battle() -> Battle:
+    with patch('builtins.input', return_value='bot'):
+        player = Player()
+    player.lives = PLAYER_LIVES
+    return Battle(player, Enemy(MODE_HARD, 1), MODE_HARD)
+
+
+def bench_exceptions(results: list[int]) -> float:
+    """
+    handle_fight_result() with EnemyDown and GameOver unwinding, output discarded
+    """
+    battle = new_battle()
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        for fight_result in results:
+            try:
+                battle.handle_fight_result(fight_result)
+            except EnemyDown:
+                battle.enemy = Enemy(MODE_HARD, battle.enemy.level + 1)
+            except GameOver:
+                battle.player.lives = PLAYER_LIVES
+    return time.perf_counter() - start
+
+
+def bench_result_codes(results: list[int]) -> float:
+    """
+    resolve() returning FightResult
+    """
+    battle = new_battle()
+    start = time.perf_counter()
+    for fight_result in results:
+        outcome = battle.resolve(fight_result).outcome
+        if outcome == FightOutcome.ENEMY_DOWN:
+            battle.enemy = Enemy(MODE_HARD, battle.enemy.level + 1)
+        elif outcome == FightOutcome.GAME_OVER:
+            battle.player.lives = PLAYER_LIVES
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    results = fight_results()
+    exceptions = bench_exceptions(results)
+    result_codes = bench_result_codes(results)
+    print(f'exceptions:   {ROUNDS / exceptions:10.0f} rounds/s')
+    print(f'result codes: {ROUNDS / result_codes:10.0f} rounds/s ({exceptions / result_codes:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
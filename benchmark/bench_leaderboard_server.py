@@ -0,0 +1,87 @@
+""" Requests per second of the HTTP leaderboard on localhost: full responses and 304 revalidations.
+
+Run: python -m benchmark.bench_leaderboard_server
+"""
+import asyncio
+import multiprocessing
+import random
+import tempfile
+import time
+
+from settings import MODE_NORMAL, MODE_HARD
+from source.leaderboard_server import LeaderboardServer
+from source.record import PlayerRecord
+from source.score_store import ShardedScoreStore
+
+CONNECTIONS = 32
+REQUESTS = 50_000
+PORT = 8765
+PATH = b'/leaderboard'
+
+
+def run_server(directory: str, ready) -> None:
+    server = LeaderboardServer(ShardedScoreStore(directory, writer='bench'), port=PORT)
+
+    async def serve() -> None:
+        listener = await server.start()
+        ready.set()
+        async with listener:
+            await listener.serve_forever()
+
+    asyncio.run(serve())
+
+
+async def client(count: int, etag: bytes) -> None:
+    """
+    Keep-alive connection sending requests one after another
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', PORT)
+    request = b'GET ' + PATH + b' HTTP/1.1\r\nHost: localhost\r\n'
+    if etag:
+        request += b'If-None-Match: ' + etag + b'\r\n'
+    request += b'\r\n'
+    for _ in range(count):
+        writer.write(request)
+        head = await reader.readuntil(b'\r\n\r\n')
+        length = head.find(b'Content-Length: ')
+        if length >= 0:
+            await reader.readexactly(int(head[length + 16:head.index(b'\r\n', length)]))
+    writer.close()
+
+
+async def fetch_etag() -> bytes:
+    reader, writer = await asyncio.open_connection('127.0.0.1', PORT)
+    writer.write(b'GET ' + PATH + b' HTTP/1.1\r\nConnection: close\r\n\r\n')
+    response = await reader.read()
+    writer.close()
+    start = response.index(b'ETag: ') + 6
+    return response[start:response.index(b'\r\n', start)]
+
+
+async def bench(etag: bytes) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(client(REQUESTS // CONNECTIONS, etag) for _ in range(CONNECTIONS)))
+    return REQUESTS / (time.perf_counter() - start)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = ShardedScoreStore(tmp_dir, writer='bench')
+        rng = random.Random(1)
+        for i in range(10):
+            store.save_record(PlayerRecord(f'player{i}', rng.choice((MODE_NORMAL, MODE_HARD)), rng.randint(0, 100)))
+        ready = multiprocessing.Event()
+        server = multiprocessing.Process(target=run_server, args=(tmp_dir, ready), daemon=True)
+        server.start()
+        ready.wait()
+        try:
+            etag = asyncio.run(fetch_etag())
+            print(f'200 OK:           {asyncio.run(bench(b"")):10.0f} requests/s')
+            print(f'304 Not Modified: {asyncio.run(bench(etag)):10.0f} requests/s')
+        finally:
+            server.terminate()
+            server.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+""" Cost of the round metrics: Battle.play_round() of the previous release, which validated every result,
+against play_round() with metrics disabled and enabled, and the same for the bulk resolve_codes() of bots.
+A battle adds its tallied rounds to the metrics once, like a game when the enemy is down or the game is over.
+
+Run: python -m benchmark.bench_metrics
+"""
+import time
+from random import Random
+from typing import Callable, Optional
+
+from settings import MODE_HARD, WIN, LOSE, ATTACK_PAIRS_OUTCOME
+from source.events import RoundResolvedEvent, EnemyDownEvent
+from source.metrics import METRICS
+from source.models import Player, Enemy, Battle, FightResult, FightOutcome
+from source.strategies import ATTACKS
+from source.validations import validate_fight_result
+
+ROUNDS = 100_000
+CODES_BATCH = 65536
+CODES_BATCHES = 8
+REPEATS = 21
+
+
+class PreviousBattle(Battle):
+    """
+    Battle resolving rounds like before the metrics
+    """
+    __slots__ = ()
+
+    def play_round(self, player_attack: str, enemy_attack: str) -> FightResult:
+        self.enemy.last_player_attack = player_attack
+        return self.resolve(ATTACK_PAIRS_OUTCOME[(player_attack, enemy_attack)], player_attack, enemy_attack)
+
+    def resolve(self, fight_result: int, player_attack: Optional[str] = None,
+                enemy_attack: Optional[str] = None) -> FightResult:
+        validate_fight_result(fight_result)
+        if self.profiles is not None:
+            self.profiles.on_fight(self.player.name, fight_result, player_attack)
+        if self.events is not None:
+            self.events.emit(RoundResolvedEvent(self.player.name, self.mode, fight_result, player_attack,
+                                                enemy_attack))
+        if fight_result == WIN:
+            self.player.score += self.points_for_fight
+            if self.enemy.lose_fight():
+                self.player.score += self.points_for_killing
+                if self.events is not None:
+                    self.events.emit(EnemyDownEvent(self.player.name, self.mode, self.enemy.level,
+                                                    self.player.score))
+                outcome = FightOutcome.ENEMY_DOWN
+            else:
+                outcome = FightOutcome.PLAYER_HIT
+        elif fight_result == LOSE:
+            outcome = FightOutcome.GAME_OVER if self.player.lose_fight() else FightOutcome.PLAYER_MISSED
+        else:
+            outcome = FightOutcome.DRAW
+        return FightResult(outcome, self.player.lives, self.enemy.lives, self.player.score)
+
+
+def long_battle(battle_class: type, enabled: bool) -> Battle:
+    METRICS.enabled = enabled
+    player = Player('Bench')
+    player.lives = 10 ** 9
+    enemy = Enemy(MODE_HARD, 1)
+    enemy.lives = 10 ** 9
+    return battle_class(player, enemy, MODE_HARD, headless=True)
+
+
+def bench_rounds(battle: Battle, pairs: list[tuple[str, str]]) -> float:
+    start = time.perf_counter()
+    for player_attack, enemy_attack in pairs:
+        battle.play_round(player_attack, enemy_attack)
+    battle.count_fights()
+    return (time.perf_counter() - start) / len(pairs)
+
+
+def bench_codes(battle: Battle, codes: list[tuple[bytes, bytes]]) -> float:
+    start = time.perf_counter()
+    for player_codes, enemy_codes in codes:
+        battle.resolve_codes(player_codes, enemy_codes)
+    return (time.perf_counter() - start) / (len(codes) * CODES_BATCH)
+
+
+def best(function: Callable[[], float]) -> float:
+    return min(function() for _ in range(REPEATS))
+
+
+def main() -> None:
+    rng = Random(1)
+    pairs = [(rng.choice(ATTACKS), rng.choice(ATTACKS)) for _ in range(ROUNDS)]
+    codes = [(rng.randbytes(CODES_BATCH).translate(bytes(b'123'[i % 3] for i in range(256))),
+              rng.randbytes(CODES_BATCH).translate(bytes(b'123'[i % 3] for i in range(256))))
+             for _ in range(CODES_BATCHES)]
+    previous = best(lambda: bench_rounds(long_battle(PreviousBattle, False), pairs))
+    disabled = best(lambda: bench_rounds(long_battle(Battle, False), pairs))
+    enabled = best(lambda: bench_rounds(long_battle(Battle, True), pairs))
+    print(f'play_round(), previous release: {previous * 1e9:8.1f}ns')
+    print(f'play_round(), metrics disabled: {disabled * 1e9:8.1f}ns ({(disabled - previous) / previous:+.2%})')
+    print(f'play_round(), metrics enabled:  {enabled * 1e9:8.1f}ns ({(enabled - previous) / previous:+.2%})')
+    disabled = best(lambda: bench_codes(long_battle(Battle, False), codes))
+    enabled = best(lambda: bench_codes(long_battle(Battle, True), codes))
+    print(f'resolve_codes(), metrics disabled: {disabled * 1e9:5.1f}ns per round')
+    print(f'resolve_codes(), metrics enabled:  {enabled * 1e9:5.1f}ns per round ({(enabled - disabled) / disabled:+.2%})')
+    start = time.perf_counter()
+    body = METRICS.render()
+    print(f'scrape: {(time.perf_counter() - start) * 1e6:.0f}us, {len(body)} bytes')
+    METRICS.enabled = False
+
+
+if __name__ == '__main__':
+    main()
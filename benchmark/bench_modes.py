@@ -0,0 +1,35 @@
+""" Scoring lookups of the mode profiles: cost per call by number of registered modes.
+
+Run: python -m benchmark.bench_modes
+"""
+import time
+
+from settings import MODE_HARD
+from source.models import Enemy, Player, Battle, fight_points
+from source.modes import ModeRegistry
+
+CALLS = 500_000
+REGISTRY_SIZES = (2, 64, 4096)
+
+
+def bench(function, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        function(*args)
+    return (time.perf_counter() - start) / CALLS
+
+
+def main() -> None:
+    player = Player('Bench')
+    enemy = Enemy(MODE_HARD, 1)
+    print(f'fight_points(): {bench(fight_points, MODE_HARD) * 1e9:6.0f}ns')
+    print(f'Enemy():        {bench(Enemy, MODE_HARD, 5) * 1e9:6.0f}ns')
+    print(f'Battle():       {bench(Battle, player, enemy, MODE_HARD, None, None, True) * 1e9:6.0f}ns')
+    for size in REGISTRY_SIZES:
+        registry = ModeRegistry([{'option': str(option), 'name': f'Mode{option}', 'multiplier': option}
+                                 for option in range(1, size + 1)])
+        print(f'{size:>5} modes, profile(): {bench(registry.profile, f"Mode{size}") * 1e9:6.0f}ns')
+
+
+if __name__ == '__main__':
+    main()
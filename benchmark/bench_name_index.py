@@ -0,0 +1,46 @@
+""" Name prefix search over 10^6 distinct names: sorted index vs scanning every record.
+
+Run: python -m benchmark.bench_name_index
+"""
+import random
+import time
+
+from settings import MODE_NORMAL, MODE_HARD
+from source.name_index import NameIndex
+
+NAMES = 1_000_000
+QUERIES = 1_000
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def make_rows() -> list[tuple[str, str, int]]:
+    rng = random.Random(1)
+    names = set()
+    while len(names) < NAMES:
+        names.add(''.join(rng.choices(LETTERS, k=8)))
+    return [(name, rng.choice((MODE_NORMAL, MODE_HARD)), rng.randint(0, 1000)) for name in names]
+
+
+def main() -> None:
+    rows = make_rows()
+    rng = random.Random(2)
+    prefixes = [''.join(rng.choices(LETTERS, k=rng.randint(2, 4))) for _ in range(QUERIES)]
+
+    start = time.perf_counter()
+    index = NameIndex(rows)
+    print(f'build index:  {time.perf_counter() - start:8.2f}s')
+
+    start = time.perf_counter()
+    matches = sum(len(index.search(prefix)) for prefix in prefixes)
+    indexed = (time.perf_counter() - start) / QUERIES
+    print(f'index search: {indexed * 1e6:8.1f}us/query ({matches} matches)')
+
+    start = time.perf_counter()
+    for prefix in prefixes[:10]:
+        [row for row in rows if row[0].startswith(prefix)]
+    scanned = (time.perf_counter() - start) / 10
+    print(f'full scan:    {scanned * 1e6:8.1f}us/query ({scanned / indexed:.0f}x)')
+
+
+if __name__ == '__main__':
+    main()
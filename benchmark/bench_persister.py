@@ -0,0 +1,55 @@
+""" Per-game save latency and throughput: synchronous save vs write-behind persister.
+Both save into a sharded score store in a temporary directory, every commit is fsynced.
+
+Run: python -m benchmark.bench_persister
+"""
+import tempfile
+import time
+
+from settings import MODE_NORMAL
+from source.persister import WriteBehindPersister
+from source.record import PlayerRecord
+from source.score_store import ShardedScoreStore
+
+GAMES = 2000
+BATCH_SIZES = (1, 8, 64, 512)
+
+
+def bench_sync(store: ShardedScoreStore) -> tuple[float, float]:
+    """
+    Every game commits its record before it ends
+    """
+    start = time.perf_counter()
+    for i in range(GAMES):
+        store.save_records([PlayerRecord(f'p{i}', MODE_NORMAL, i)])
+    elapsed = time.perf_counter() - start
+    return elapsed / GAMES, elapsed
+
+
+def bench_write_behind(store: ShardedScoreStore, batch_size: int) -> tuple[float, float]:
+    """
+    Games only enqueue, the worker commits in batches
+    """
+    persister = WriteBehindPersister(store.save_records, batch_size=batch_size).start()
+    submit_time = 0.0
+    start = time.perf_counter()
+    for i in range(GAMES):
+        submit_start = time.perf_counter()
+        persister.submit(PlayerRecord(f'p{i}', MODE_NORMAL, i))
+        submit_time += time.perf_counter() - submit_start
+    persister.close()
+    return submit_time / GAMES, time.perf_counter() - start
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        latency, total = bench_sync(ShardedScoreStore(f'{directory}/sync', 'bench'))
+        print(f'sync:                 save {latency * 1e6:8.1f}us  {GAMES / total:8.0f} games/s')
+        for batch_size in BATCH_SIZES:
+            store = ShardedScoreStore(f'{directory}/b{batch_size}', 'bench')
+            latency, total = bench_write_behind(store, batch_size)
+            print(f'write-behind b={batch_size:<4}: save {latency * 1e6:8.1f}us  {GAMES / total:8.0f} games/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+""" Pairing latency of the player versus player matchmaker with 50k queued players.
+
+Run: python -m benchmark.bench_pvp
+"""
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import time
+
+from settings import MODE_NORMAL, MODE_HARD, PVP_SCORE_WINDOW
+from source.pvp import Matchmaker, Ticket, PvpServer
+from source.score_store import ShardedScoreStore
+
+QUEUED = 50_000
+ARRIVALS = 100_000
+NETWORK_PAIRS = 200
+
+
+def queued_matchmaker(mode: str) -> Matchmaker:
+    """
+    Matchmaker with QUEUED players whose scores are too far apart to pair with each other
+    """
+    matchmaker = Matchmaker()
+    for number in range(QUEUED):
+        matchmaker.join(Ticket(f'queued{number}', mode, number * 2 * (PVP_SCORE_WINDOW + 1)))
+    return matchmaker
+
+
+def bench_join() -> list[float]:
+    """
+    join() time of random arrivals, the queue stays around QUEUED players
+    """
+    matchmaker = queued_matchmaker(MODE_NORMAL)
+    rng = random.Random(1)
+    top = QUEUED * 2 * (PVP_SCORE_WINDOW + 1)
+    tickets = [Ticket(f'player{number}', MODE_NORMAL, rng.randrange(top)) for number in range(ARRIVALS)]
+    times = []
+    for ticket in tickets:
+        start = time.perf_counter()
+        matchmaker.join(ticket)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+async def bench_network() -> list[float]:
+    """
+    Time from sending the hello of the second player to receiving the matched message
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        server = PvpServer(ShardedScoreStore(tmp_dir, writer='bench'), port=0)
+        server.matchmaker = queued_matchmaker(MODE_HARD)
+        times = []
+        async with await server.start():
+            for number in range(NETWORK_PAIRS):
+                connections = []
+                for name in (f'first{number}', f'second{number}'):
+                    reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+                    connections.append((reader, writer))
+                    start = time.perf_counter()
+                    writer.write(json.dumps({'name': name, 'mode': MODE_NORMAL}).encode() + b'\n')
+                    await reader.readline()
+                (first_reader, _), (second_reader, _) = connections
+                await second_reader.readline()
+                times.append(time.perf_counter() - start)
+                await first_reader.readline()
+                for _, writer in connections:
+                    writer.write(b'{"attack": "0"}\n')
+                for reader, writer in connections:
+                    await reader.readline()
+                    writer.close()
+        return times
+
+
+def main() -> None:
+    join_times = bench_join()
+    network_times = asyncio.run(bench_network())
+    print(f'queued players: {QUEUED}')
+    print(f'join:           median {statistics.median(join_times) * 1e6:.2f}us, '
+          f'p99 {statistics.quantiles(join_times, n=100)[98] * 1e6:.2f}us')
+    print(f'network:        median {statistics.median(network_times) * 1e3:.2f}ms, '
+          f'p99 {statistics.quantiles(network_times, n=100)[98] * 1e3:.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+""" Writes to the output stream per round: print per line vs one frame per round.
+
+Run: python -m benchmark.bench_renderer
+"""
+import io
+import random
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from settings import MODE_HARD
+from source.game import Game
+from source.renderer import LineRenderer, FrameRenderer, AnsiRenderer
+
+ROUNDS = 10_000
+
+
+class CountingStream(io.StringIO):
+    """
+    Counts write() calls, each of them is a write syscall on an unbuffered terminal or socket
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        return super().write(text)
+
+
+def bench(renderer_type: type) -> float:
+    """
+    Writes per round of one long game, the attack prompt is written to the same stream
+    """
+    stream = CountingStream()
+    attacks = random.Random(1)
+
+    def fake_input(prompt: str = '') -> str:
+        if prompt:
+            stream.write(prompt)
+        return str(attacks.randint(1, 3))
+
+    with redirect_stdout(stream), patch('builtins.input', fake_input):
+        game = Game(name='bot', mode=MODE_HARD, rng=random.Random(2), renderer=renderer_type(stream))
+        game.player.lives = ROUNDS
+        rounds = 0
+        game.begin()
+        while rounds < ROUNDS and game.player.lives:
+            game.print_status()
+            game.after_round(game.battle.fight_round())
+            rounds += 1
+        game.renderer.flush()
+    return stream.writes / rounds
+
+
+def main() -> None:
+    line = bench(LineRenderer)
+    for renderer_type in (LineRenderer, FrameRenderer, AnsiRenderer):
+        writes = bench(renderer_type)
+        print(f'{renderer_type.__name__:<13} {writes:6.2f} writes/round ({line / writes:.1f}x fewer)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+""" save_score() of games that don't enter the full score shard: with and without the admission threshold.
+The games save into a sharded score store in a temporary directory.
+
+Run: python -m benchmark.bench_save_score
+"""
+import tempfile
+import time
+from contextlib import nullcontext
+from unittest.mock import patch
+
+from settings import MODE_NORMAL, MAX_RECORDS_NUMBER
+from source.game import Game
+from source.record import PlayerRecord
+from source.score_store import ShardedScoreStore
+
+GAMES = 20_000
+
+
+def bench(game: Game, threshold: bool) -> float:
+    start = time.perf_counter()
+    with nullcontext() if threshold else patch.object(game.store, 'admits', return_value=True):
+        for _ in range(GAMES):
+            game.save_score()
+    return GAMES / (time.perf_counter() - start)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = ShardedScoreStore(tmp_dir, writer='bench')
+        store.save_records([PlayerRecord(f'player{i}', MODE_NORMAL, 100 + i) for i in range(MAX_RECORDS_NUMBER)])
+        game = Game(name='bot', mode=MODE_NORMAL, headless=True, store=store)
+        game.player.score = 1
+        without = bench(game, threshold=False)
+        with_threshold = bench(game, threshold=True)
+        print(f'read, sort and rewrite: {without:10.0f} saves/s')
+        print(f'admission threshold:    {with_threshold:10.0f} saves/s ({with_threshold / without:.0f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+""" Import throughput of CSV and JSON Lines score files into the score store.
+
+Run: python -m benchmark.bench_score_io
+"""
+import csv
+import os
+import random
+import tempfile
+import time
+
+from settings import MODE_NORMAL, MODE_HARD
+from source.record import PlayerRecord
+from source.score_io import write_rows, import_scores
+from source.score_store import ShardedScoreStore
+
+ROWS = 1_000_000
+RECORD_BY_RECORD_ROWS = 20_000
+
+
+def make_rows(count: int) -> list[tuple[str, str, int]]:
+    rng = random.Random(1)
+    return [(f'player{i}', rng.choice((MODE_NORMAL, MODE_HARD)), rng.randint(0, 10 ** 6)) for i in range(count)]
+
+
+def bench_record_by_record(path: str) -> float:
+    """
+    Rows/s of building PlayerRecords one by one with a duplicate scan of the list per insert
+    """
+    start = time.perf_counter()
+    records = []
+    with open(path, newline='') as file:
+        lines = csv.reader(file)
+        next(lines)
+        for name, mode, score in lines:
+            record = PlayerRecord(name, mode, int(score))
+            if record not in records:
+                records.append(record)
+    return RECORD_BY_RECORD_ROWS / (time.perf_counter() - start)
+
+
+def bench_import(path: str, directory: str, max_records) -> float:
+    store = ShardedScoreStore(directory, writer='bench', max_records=max_records)
+    start = time.perf_counter()
+    import_scores(path, store)
+    return ROWS / (time.perf_counter() - start)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        small_path = os.path.join(tmp_dir, 'small.csv')
+        write_rows(small_path, make_rows(RECORD_BY_RECORD_ROWS))
+        print(f'record by record ({RECORD_BY_RECORD_ROWS} rows): {bench_record_by_record(small_path):10.0f} rows/s')
+        rows = make_rows(ROWS)
+        for file_format in ('.csv', '.jsonl'):
+            path = os.path.join(tmp_dir, f'scores{file_format}')
+            write_rows(path, rows)
+            for max_records in (5, None):
+                directory = os.path.join(tmp_dir, f'store{file_format}{max_records}')
+                print(f'import {file_format:<6} keep {str(max_records):<4}: '
+                      f'{bench_import(path, directory, max_records):10.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+""" Leaderboard view of a 10M-record store: mapped binary file vs text score file.
+
+Run: python -m benchmark.bench_score_mmap
+"""
+import os
+import tempfile
+import time
+from array import array
+
+from settings import MODE_NORMAL, MODE_HARD
+from source.score_mmap import BinaryScoreFile, write_score_columns
+from source.score_store import ScoreShard
+
+RECORDS = 10_000_000
+TEXT_RECORDS = 1_000_000
+TOP = 10
+
+
+def write_binary(path: str) -> None:
+    half = RECORDS // 2
+    columns = {mode: ((f'player{i}' for i in range(half)), array('q', range(half, 0, -1)))
+               for mode in (MODE_NORMAL, MODE_HARD)}
+    write_score_columns(path, columns)
+
+
+def bench_binary(path: str) -> float:
+    """
+    Open the mapping and read the global top
+    """
+    start = time.perf_counter()
+    with BinaryScoreFile(path) as score_file:
+        score_file.top(TOP)
+    return time.perf_counter() - start
+
+
+def bench_text(directory: str) -> float:
+    """
+    Decode the whole text score file to show its top, like GameRecord.read_records
+    """
+    shard = ScoreShard(directory, MODE_NORMAL, 'bench', max_records=None)
+    shard.merge_rows([(f'player{i}', MODE_NORMAL, i) for i in range(TEXT_RECORDS)])
+    start = time.perf_counter()
+    sorted(shard.iter_rows(), key=lambda row: row[2], reverse=True)[:TOP]
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'scores.bin')
+        start = time.perf_counter()
+        write_binary(path)
+        print(f'write {RECORDS} records:        {time.perf_counter() - start:8.2f}s')
+        print(f'binary top-{TOP} of {RECORDS}:  {bench_binary(path) * 1000:8.2f}ms')
+        print(f'text top-{TOP} of {TEXT_RECORDS}:     {bench_text(tmp_dir) * 1000:8.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+""" Score statistics: cost of counting a game, percentile queries and size of the merged statistics.
+
+The counts are then scaled to billions of games: the buckets, and so the query cost and the size, stay the same.
+
+Run: python -m benchmark.bench_score_stats
+"""
+import time
+from random import Random
+
+from settings import MODE_HARD
+from source.score_stats import ScoreStats
+
+GAMES = 1_000_000
+WRITERS = 16
+QUERIES = 100_000
+SCALE = 1000
+
+
+def main() -> None:
+    rng = Random(1)
+    scores = [int(rng.paretovariate(1.2) * 10) for _ in range(GAMES)]
+    writers = [ScoreStats() for _ in range(WRITERS)]
+    start = time.perf_counter()
+    for index, score in enumerate(scores):
+        writers[index % WRITERS].add(MODE_HARD, score)
+    print(f'add():        {(time.perf_counter() - start) / GAMES * 1e9:8.0f}ns per game')
+    start = time.perf_counter()
+    merged = ScoreStats()
+    for stats in writers:
+        merged.merge(ScoreStats.from_bytes(stats.to_bytes()))
+    print(f'merge:        {(time.perf_counter() - start) * 1e3:8.2f}ms for {WRITERS} writers')
+    histogram = merged.histogram(MODE_HARD)
+    histogram.counts = {bucket: count * SCALE for bucket, count in histogram.counts.items()}
+    histogram.count *= SCALE
+    histogram.total *= SCALE
+    start = time.perf_counter()
+    histogram.percentile(99)
+    print(f'first query:  {(time.perf_counter() - start) * 1e6:8.1f}us, {len(histogram.counts)} buckets')
+    start = time.perf_counter()
+    for index in range(QUERIES):
+        histogram.percentile(index % 1000 / 10)
+    print(f'percentile(): {(time.perf_counter() - start) / QUERIES * 1e6:8.2f}us over {histogram.count} games')
+    print(f'size:         {len(merged.to_bytes()):8} bytes')
+
+
+if __name__ == '__main__':
+    main()
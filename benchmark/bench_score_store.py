@@ -0,0 +1,73 @@
+""" 64 writer processes: single score file vs sharded score store.
+
+Run: python -m benchmark.bench_score_store
+"""
+import fcntl
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+from settings import MODE_NORMAL
+from source.record import GameRecord, PlayerRecord
+from source.score_store import ShardedScoreStore
+
+WRITERS = 64
+RECORDS_PER_WRITER = 50
+
+
+def single_file_writer(directory: str, writer_id: int) -> float:
+    """
+    Read-parse-sort-rewrite of one shared file, serialized with a file lock
+    """
+    start = time.perf_counter()
+    with patch('source.record.get_score_file_path', return_value=f'{directory}/scores.txt'), \
+            open(f'{directory}/scores.lock', 'w') as lock:
+        for i in range(RECORDS_PER_WRITER):
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                game_record = GameRecord(MODE_NORMAL)
+                game_record.add_record(PlayerRecord(f'w{writer_id}', MODE_NORMAL, i))
+                game_record.save_to_file()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    return time.perf_counter() - start
+
+
+def sharded_writer(directory: str, writer_id: int) -> float:
+    """
+    Every writer owns its shard, no lock is needed
+    """
+    start = time.perf_counter()
+    store = ShardedScoreStore(directory, writer=f'w{writer_id}')
+    for i in range(RECORDS_PER_WRITER):
+        store.save_record(PlayerRecord(f'w{writer_id}', MODE_NORMAL, i))
+    return time.perf_counter() - start
+
+
+def run_writers(writer, directory: str) -> float:
+    """
+    Run all writers at once and return the slowest writer's time
+    """
+    with ProcessPoolExecutor(WRITERS) as pool:
+        return max(pool.map(writer, [directory] * WRITERS, range(WRITERS)))
+
+
+def main() -> None:
+    total = WRITERS * RECORDS_PER_WRITER
+    with tempfile.TemporaryDirectory() as directory:
+        single = run_writers(single_file_writer, directory)
+    with tempfile.TemporaryDirectory() as directory:
+        sharded = run_writers(sharded_writer, directory)
+        store = ShardedScoreStore(directory)
+        start = time.perf_counter()
+        top = store.top()
+        merge = time.perf_counter() - start
+    print(f'{WRITERS} writer processes x {RECORDS_PER_WRITER} records')
+    print(f'single file: {single:.3f}s ({total / single:.0f} saves/s)')
+    print(f'sharded:     {sharded:.3f}s ({total / sharded:.0f} saves/s)')
+    print(f'global top-{len(top)} merge of {WRITERS} shards: {merge * 1000:.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+""" Scripted games per second through the real CLI entry point source.game.main.
+
+Run: python -m benchmark.bench_script
+"""
+import io
+import os
+import tempfile
+import time
+from contextlib import redirect_stdout
+from random import Random
+from unittest.mock import patch
+
+from source.game import main
+
+GAMES = 5000
+ATTACKS_PER_GAME = 40
+
+
+def write_script(path: str) -> None:
+    rng = Random(1)
+    with open(path, 'w') as script:
+        for i in range(GAMES):
+            attacks = ''.join(str(rng.randint(1, 3)) for _ in range(ATTACKS_PER_GAME))
+            script.write(f'bot{i} {rng.randint(1, 2)} {attacks}\n')
+
+
+def main_bench() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        script_path = os.path.join(directory, 'games.txt')
+        write_script(script_path)
+        with patch('source.record.get_score_file_path', return_value=os.path.join(directory, 'scores.txt')):
+            for full_output in (False, True):
+                argv = ['--script', script_path] + (['--full-output'] if full_output else [])
+                start = time.perf_counter()
+                with redirect_stdout(io.StringIO()):
+                    main(argv)
+                elapsed = time.perf_counter() - start
+                output = 'full output' if full_output else 'summary'
+                print(f'{output:<12} {GAMES / elapsed:8.0f} games/s')
+
+
+if __name__ == '__main__':
+    main_bench()
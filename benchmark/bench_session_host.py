@@ -0,0 +1,44 @@
+""" Session host throughput by number of worker threads.
+
+On a free-threaded interpreter (3.13t) throughput should scale with workers,
+on GIL builds it stays flat but results are the same.
+
+Run: python -m benchmark.bench_session_host
+"""
+import sys
+import time
+from random import Random
+
+from settings import MODE_HARD
+from source.persister import WriteBehindPersister
+from source.session import SessionHost
+
+SESSIONS = 2000
+ROUNDS_PER_SESSION = 500
+WORKERS = (1, 2, 4, 8)
+
+
+def bot_attacks(seed: int) -> list[str]:
+    rng = Random(seed)
+    return [str(rng.randint(1, 3)) for _ in range(ROUNDS_PER_SESSION)]
+
+
+def main() -> None:
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f'Python {sys.version.split()[0]}, GIL {"enabled" if gil else "disabled"}')
+    sessions = [(f'bot{i}', MODE_HARD, bot_attacks(SESSIONS + i), i) for i in range(SESSIONS)]
+    expected = None
+    for workers in WORKERS:
+        with WriteBehindPersister(commit=lambda batch: None) as persister, \
+                SessionHost(workers, persister) as host:
+            start = time.perf_counter()
+            states = host.run(sessions)
+            elapsed = time.perf_counter() - start
+        scores = [state.score for state in states]
+        expected = expected or scores
+        status = 'ok' if scores == expected else 'MISMATCH'
+        print(f'{workers} workers: {SESSIONS / elapsed:8.0f} sessions/s  results {status}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+""" Cost of idle timeouts of 100k sessions: timer wheel vs a heap of deadlines.
+
+Every session is opened, touched TOUCHES times while time runs and finally expires.
+The heap pushes a new deadline on every touch and skips stale ones on pop, so it grows with the messages
+and every operation is O(log n); the wheel only stores the time of the touch and moves a timer once per timeout.
+
+Run: python -m benchmark.bench_session_manager
+"""
+import heapq
+import time
+
+from source.session_manager import SessionManager
+
+SESSIONS = 100_000
+TOUCHES = 10
+IDLE_TIMEOUT = 60.0
+STEP = 1.0
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Session:
+    __slots__ = ()
+
+    def expire(self, save: bool) -> None:
+        pass
+
+
+class HeapSessions:
+    """
+    Idle timeouts in a heap of (deadline, order, session) with lazy deletion
+    """
+
+    def __init__(self, idle_timeout: float, clock: Clock) -> None:
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self.deadlines = {}
+        self.heap = []
+        self.order = 0
+
+    def open(self, session: Session) -> None:
+        self.touch(session)
+
+    def touch(self, session: Session) -> None:
+        deadline = self.clock() + self.idle_timeout
+        self.deadlines[session] = deadline
+        self.order += 1
+        heapq.heappush(self.heap, (deadline, self.order, session))
+
+    def expire(self) -> int:
+        now = self.clock()
+        expired = 0
+        while self.heap and self.heap[0][0] <= now:
+            deadline, _, session = heapq.heappop(self.heap)
+            if self.deadlines.get(session) == deadline:
+                del self.deadlines[session]
+                session.expire(True)
+                expired += 1
+        return expired
+
+
+def run(manager, clock: Clock) -> float:
+    sessions = [Session() for _ in range(SESSIONS)]
+    start = time.perf_counter()
+    for session in sessions:
+        manager.open(session)
+    for _ in range(TOUCHES):
+        clock.now += STEP
+        for session in sessions:
+            manager.touch(session)
+        manager.expire()
+    expired = 0
+    while expired < SESSIONS:
+        clock.now += STEP
+        expired += manager.expire()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    clock = Clock()
+    heap = run(HeapSessions(IDLE_TIMEOUT, clock), clock)
+    clock = Clock()
+    wheel = run(SessionManager(SESSIONS, IDLE_TIMEOUT, clock=clock), clock)
+    operations = SESSIONS * (TOUCHES + 2)
+    for name, elapsed in (('heap', heap), ('timer wheel', wheel)):
+        print(f'{name:12} {elapsed * 1e3:8.1f}ms  {elapsed / operations * 1e9:6.0f}ns per open/touch/expire')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+""" Memory of 100k idle sessions: SessionState vs the same fields in a plain object.
+
+Run: python -m benchmark.bench_sessions
+"""
+import tracemalloc
+from multiprocessing import Pool
+
+from settings import MODE_NORMAL, SESSION_BYTES_BUDGET
+from source.session import SessionState
+
+SESSIONS = 100_000
+
+
+class PlainSession:
+    def __init__(self, name, mode, level=0, lives=2, enemy_lives=0, score=0):
+        self.name = name
+        self.mode = mode
+        self.level = level
+        self.lives = lives
+        self.enemy_lives = enemy_lives
+        self.score = score
+
+
+def rss_kb() -> int:
+    """
+    Resident set size of the process
+    """
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def bench(session_class) -> tuple[float, int]:
+    """
+    Runs in a fresh process: RSS growth first, then traced bytes per session
+    """
+    rss_before = rss_kb()
+    sessions = [session_class(f'player{i}', MODE_NORMAL) for i in range(SESSIONS)]
+    rss = rss_kb() - rss_before
+    del sessions
+    tracemalloc.start()
+    sessions = [session_class(f'player{i}', MODE_NORMAL) for i in range(SESSIONS)]
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return traced / SESSIONS, rss
+
+
+def main() -> None:
+    print(f'{SESSIONS} idle sessions, budget {SESSION_BYTES_BUDGET} bytes/session')
+    for session_class in (PlainSession, SessionState):
+        with Pool(1) as pool:
+            per_session, rss = pool.apply(bench, (session_class,))
+        print(f'{session_class.__name__:<13} {per_session:6.1f} bytes/session  RSS +{rss / 1024:.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+""" Fan-out of leaderboard diffs to 10k spectators, and publish() cost on the write path.
+
+Spectators are protocol objects on in-memory transports, so only the hub's own work is timed.
+
+Run: python -m benchmark.bench_spectators
+"""
+import time
+
+from settings import MODE_NORMAL, MODE_HARD
+from source.record import PlayerRecord
+from source.spectators import SpectatorHub, SpectatorProtocol
+
+SPECTATORS = 10_000
+TICKS = 20
+RECORDS_PER_TICK = 1_000
+
+
+class MemoryTransport:
+    """
+    Transport counting written bytes
+    """
+
+    def __init__(self) -> None:
+        self.messages = 0
+        self.size = 0
+
+    def set_write_buffer_limits(self, high: int) -> None:
+        pass
+
+    def write(self, data: bytes) -> None:
+        self.messages += 1
+        self.size += len(data)
+
+
+def main() -> None:
+    hub = SpectatorHub([])
+    transports = []
+    for _ in range(SPECTATORS):
+        transport = MemoryTransport()
+        SpectatorProtocol(hub).connection_made(transport)
+        transports.append(transport)
+
+    records = [PlayerRecord(f'player{score}', (MODE_NORMAL, MODE_HARD)[score % 2], score)
+               for score in range(TICKS * RECORDS_PER_TICK)]
+    publish_time = flush_time = 0.0
+    for tick in range(TICKS):
+        start = time.perf_counter()
+        for record in records[tick * RECORDS_PER_TICK:(tick + 1) * RECORDS_PER_TICK]:
+            hub.publish(record)
+        publish_time += time.perf_counter() - start
+        start = time.perf_counter()
+        hub.flush()
+        flush_time += time.perf_counter() - start
+
+    messages = transports[0].messages
+    print(f'spectators:  {SPECTATORS}')
+    print(f'publish:     {publish_time / len(records) * 1e9:8.0f}ns/record')
+    print(f'flush:       {flush_time / TICKS * 1e3:8.2f}ms/tick '
+          f'({flush_time / TICKS / SPECTATORS * 1e9:.0f}ns/spectator)')
+    print(f'messages:    {messages} per spectator ({transports[0].size} bytes) '
+          f'for {len(records)} records in {TICKS} ticks')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+""" Input validation per keystroke and bulk validation of imported records.
+
+Run: python -m benchmark.bench_validations
+"""
+import gc
+import random
+import time
+
+from settings import ALLOWED_ATTACKS, MODE_NORMAL, MODE_HARD
+from source.validations import is_valid_input_attack, validate_name, validate_mode, validate_record_rows
+
+KEYSTROKES = 1_000_000
+ROWS = 1_000_000
+REPEATS = 3
+
+
+def bench_keystrokes() -> tuple[float, float]:
+    """
+    Rebuilding the tuple of options on every input vs the compiled frozenset
+    """
+    inputs = [str(i % 5) for i in range(KEYSTROKES)]
+    start = time.perf_counter()
+    for attack_input in inputs:
+        attack_input in tuple(ALLOWED_ATTACKS.keys())
+    rebuilt = time.perf_counter() - start
+    start = time.perf_counter()
+    for attack_input in inputs:
+        is_valid_input_attack(attack_input)
+    return rebuilt, time.perf_counter() - start
+
+
+def validate_one_by_one(rows: list[tuple[str, str, int]]) -> None:
+    for name, mode, score in rows:
+        validate_name(name)
+        validate_mode(mode)
+        if not isinstance(score, int) or score < 0:
+            raise ValueError
+
+
+def bench_rows() -> tuple[float, float]:
+    """
+    Validation of every row with the single validators vs validation of the whole batch, best of REPEATS
+    """
+    rng = random.Random(1)
+    rows = [(f'player{i}', rng.choice((MODE_NORMAL, MODE_HARD)), rng.randint(0, 1000)) for i in range(ROWS)]
+    gc.freeze()
+    timings = {validate_one_by_one: [], validate_record_rows: []}
+    for _ in range(REPEATS):
+        for validate, times in timings.items():
+            start = time.perf_counter()
+            validate(rows)
+            times.append(time.perf_counter() - start)
+    gc.unfreeze()
+    return min(timings[validate_one_by_one]), min(timings[validate_record_rows])
+
+
+def main() -> None:
+    rebuilt, compiled = bench_keystrokes()
+    print(f'keystrokes rebuilt tuple: {rebuilt / KEYSTROKES * 1e9:6.0f}ns/input')
+    print(f'keystrokes compiled set:  {compiled / KEYSTROKES * 1e9:6.0f}ns/input ({rebuilt / compiled:.1f}x)')
+    per_row, batch = bench_rows()
+    print(f'rows one by one: {ROWS / per_row:12.0f} rows/s')
+    print(f'rows in a batch: {ROWS / batch:12.0f} rows/s ({per_row / batch:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
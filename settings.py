@@ -1,19 +1,75 @@
 """ Constants and settings used in the project """
+import json
 import os
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 MODE_NORMAL = 'Normal'
 MODE_HARD = 'Hard'
-MODES = {'1': MODE_NORMAL,
-         '2': MODE_HARD}
+MODES_FILE = f'{ROOT_DIR}/assets/modes.json'
+with open(MODES_FILE) as _modes_file:
+    MODE_CONFIG = json.load(_modes_file)
+MODES = {str(mode['option']): mode['name'] for mode in MODE_CONFIG}
+MODE_NAME_MAX_SIZE = 16
 PLAYER_LIVES = 2
+SESSION_BYTES_BUDGET = 192
+SESSION_HOST_WORKERS = 8
+SESSION_IDLE_TIMEOUT = 300.0
+SESSION_TIMER_TICK = 1.0
+SESSION_TIMER_SLOTS = 512
+SESSION_SAVE_EXPIRED = True
 POINTS_FOR_FIGHT = 1
 POINTS_FOR_KILLING = 5
 MAX_RECORDS_NUMBER = 5
-HARD_MODE_MULTIPLIER = 2
+PERSISTER_BATCH_SIZE = 64
+PERSISTER_FLUSH_INTERVAL = 0.05
+EVENT_BUS_WORKERS = 4
+EVENT_BUS_BATCH_SIZE = 100
+EVENT_BUS_FLUSH_INTERVAL = 0.05
+VALIDATION_CHUNK_SIZE = 8192
 SCORE_FILE = 'scores.txt'
 SCORE_TEST_FILE = 'scores_test.txt'
+SCORE_SHARDS_DIR = 'scores'
+PROFILES_FILE = 'profiles.json'
+SCORE_SHARD_FORMAT = '.txt'
+SCORE_CSV_FORMAT = '.csv'
+SCORE_JSONL_FORMAT = '.jsonl'
+SCORE_NPY_FORMAT = '.npy'
+SCORE_FIELDS = ('name', 'mode', 'score')
+SCORE_IO_CHUNK_SIZE = 65536
+SCORE_IMPORT_WRITER = 'import'
+SCORE_BINARY_FILE = 'scores.bin'
+SCORE_BINARY_NAME_SIZE = 32
+SCORE_STATS_DIR = 'score_stats'
+SCORE_STATS_FORMAT = '.bin'
+SCORE_STATS_PRECISION = 7
+SCORE_STATS_PERCENTILES = (50, 90, 99, 99.9)
+SCORE_STATS_FLUSH_INTERVAL = 10.0
+LEADERBOARD_HOST = '127.0.0.1'
+LEADERBOARD_PORT = 8080
+LEADERBOARD_CHECK_INTERVAL = 0.5
+SPECTATOR_PORT = 8081
+SPECTATOR_TICK = 0.1
+SPECTATOR_BUFFER_SIZE = 65536
+PVP_PORT = 8082
+PVP_SCORE_WINDOW = 10
+BOT_PORT = 8083
+BOT_MAX_BATCH = 1048576
+BOT_MAX_SESSIONS = 10000
+BOT_ROUNDS_PER_TURN = 65536
+BOT_WRITE_BUFFER = 262144
+METRICS_PORT = 8084
+METRICS_SAVE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+ENEMY_STRATEGY_FILE = 'enemy_strategy.json'
+DIFFICULTY_TABLE_LEVELS = 1024
+DIFFICULTY_MAX_LIVES = 2 ** 62
+EVOLUTION_POPULATION = 24
+EVOLUTION_GENERATIONS = 30
+EVOLUTION_GAMES = 30
+EVOLUTION_MAX_ROUNDS = 300
+EVOLUTION_MUTATION = 0.1
+EVOLUTION_ELITE = 2
+EVOLUTION_WORKERS = None
 TEST_FILE_PATH = f'{ROOT_DIR}/{SCORE_TEST_FILE}'
 NEW_TEST_FILE_PATH = f'{ROOT_DIR}/new_test_file.txt'
 WRONG_TEST_FILE_PATH = f'{ROOT_DIR}/wrong_file.txt'
@@ -25,6 +81,7 @@ WIN = 1
 DRAW = 0
 LOSE = -1
 MAIN_MENU_OPTIONS = {"1": "Play", "2": "Score", "3": "Exit"}
+SCORE_MENU_OPTIONS = {"1": "Show", "2": "Search", "0": "Back"}
 ALLOWED_ATTACKS = {'1': PAPER,
                    '2': STONE,
                    '3': SCISSORS,
@@ -44,5 +101,6 @@ INPUT_BASIC_TEXT = 'Please select an option from the list:\n'
 BASIC_OPTION_TEXTS = {
     'main_menu': '----Main Menu----',
     'attacks': '----Attack----',
-    'mode': '----Mode----'
+    'mode': '----Mode----',
+    'score_menu': '----Score----'
 }
@@ -0,0 +1,342 @@
+""" Line protocol for bots playing many rounds per message """
+import asyncio
+from random import Random
+from typing import NamedTuple, Optional
+
+from settings import MODES, LEADERBOARD_HOST, BOT_PORT, BOT_MAX_BATCH, BOT_ROUNDS_PER_TURN, BOT_WRITE_BUFFER, \
+    SCORE_STATS_FLUSH_INTERVAL
+from source.difficulty import Difficulty
+from source.exceptions import WhiteSpaceInputError, EmptyInputError, SessionLimitError
+from source.game import Game
+from source.metrics import METRICS
+from source.models import FightOutcome, ATTACK_CODES, enemy_attack_codes
+from source.persister import WriteBehindPersister
+from source.score_stats import ScoreStatsStore
+from source.session_manager import SessionManager
+from source.strategies import EnemyStrategy
+from source.validations import validate_name, is_valid_input_mode
+
+QUIT_CODE = b'0'
+QUIT = 'quit'
+READY = 'ready'
+ENEMY_CODES_CHUNK = 65536
+
+
+class BatchResult(NamedTuple):
+    """
+    Outcome of one batch of attacks and the state after it
+    """
+    rounds: int
+    outcome: str
+    lives: int
+    level: int
+    enemy_lives: int
+    score: int
+
+    def line(self) -> bytes:
+        return f'{self.rounds} {self.outcome} {self.lives} {self.level} {self.enemy_lives} {self.score}\n'.encode()
+
+
+class BotSession:
+    """
+    Games of one bot. A new game starts with the same name and mode when the previous one is over.
+    Enemy attacks come from one stream of the session, so the results do not depend on how attacks are batched.
+    Enemies with a strategy draw their attacks round by round from the same random generator.
+    """
+
+    def __init__(self, name: str, mode: str, seed: Optional[int] = None,
+                 persister: Optional[WriteBehindPersister] = None, enemy_strategy: Optional[EnemyStrategy] = None,
+                 difficulty: Optional[Difficulty] = None, stats: Optional[ScoreStatsStore] = None) -> None:
+        """
+        Initialize the session and start the first game
+        :param name: - player's name
+        :param mode: - mode of the games
+        :param seed: - seed of the session random generator
+        :param persister: - saves scores of finished games in background if set
+        :param enemy_strategy: - strategy of the enemies, strategy of the difficulty level if not set
+        :param difficulty: - curves of the enemies, default curves if not set
+        :param stats: - counts the final score of every game if set
+        """
+        self.name = name
+        self.mode = mode
+        self.rng = Random(seed)
+        self.persister = persister
+        self.enemy_strategy = enemy_strategy
+        self.difficulty = difficulty
+        self.stats = stats
+        self.games = 0
+        self._enemy_codes = b''
+        self._enemy_index = 0
+        self.new_game()
+
+    def new_game(self) -> None:
+        """
+        Start the next game of the session
+        """
+        self.game = Game(persister=self.persister, headless=True, name=self.name, mode=self.mode, rng=self.rng,
+                         enemy_strategy=self.enemy_strategy, difficulty=self.difficulty, stats=self.stats)
+        self.game.begin()
+        self.games += 1
+
+    def state(self, rounds: int, outcome: str) -> BatchResult:
+        """
+        Batch result with the current game state
+        """
+        game = self.game
+        return BatchResult(rounds, outcome, game.player.lives, game.enemy.level, game.enemy.lives, game.player.score)
+
+    def play(self, codes: bytes) -> BatchResult:
+        """
+        Resolve attack option codes in order until the enemy is down, the game is over, '0' or the end of codes.
+        After the enemy is down the result shows the next enemy, after the game is over the final state of the game.
+        :param codes: - attack options without separators, e.g. b'1231'
+        """
+        quit_at = codes.find(QUIT_CODE)
+        if quit_at >= 0:
+            codes = codes[:quit_at]
+        if self.game.enemy.strategy is None:
+            rounds, outcome = self.game.battle.resolve_codes(codes, self._take_enemy_codes(len(codes)))
+            self._enemy_index += rounds
+        else:
+            rounds, outcome = self.game.battle.resolve_codes(codes)
+        if outcome == FightOutcome.ENEMY_DOWN:
+            self.game.new_enemy()
+        elif outcome == FightOutcome.GAME_OVER:
+            self.game.on_game_over()
+            result = self.state(rounds, outcome.name.lower())
+            self.new_game()
+            return result
+        elif quit_at >= 0:
+            return self.state(rounds, QUIT)
+        return self.state(rounds, outcome.name.lower())
+
+    def _take_enemy_codes(self, count: int) -> bytes:
+        if len(self._enemy_codes) - self._enemy_index < count:
+            self._enemy_codes = (self._enemy_codes[self._enemy_index:] +
+                                 enemy_attack_codes(self.rng, max(count, ENEMY_CODES_CHUNK)))
+            self._enemy_index = 0
+        return self._enemy_codes[self._enemy_index:self._enemy_index + count]
+
+
+class BotProtocol(asyncio.Protocol):
+    """
+    Connection of one bot, every message is a line.
+    The first line is 'name mode_option [seed]', every next line is a batch of attack options.
+    Every line is answered with 'rounds outcome lives level enemy_lives score' or 'error text'.
+    Lines may be sent without waiting for answers, all lines of one read are answered with one write.
+
+    Backpressure: reading stops while the bot does not read its answers, and after BOT_ROUNDS_PER_TURN
+    attack options the rest of the read waits for the next loop iteration, so one bot can not hold the
+    loop and a bot sending faster than its rounds are resolved is slowed down by TCP flow control.
+    """
+
+    def __init__(self, persister: Optional[WriteBehindPersister] = None,
+                 sessions: Optional[SessionManager] = None, enemy_strategy: Optional[EnemyStrategy] = None,
+                 difficulty: Optional[Difficulty] = None, stats: Optional[ScoreStatsStore] = None) -> None:
+        """
+        Initialize the connection
+        :param persister: - saves scores of finished games in background if set
+        :param sessions: - admits the connection and expires it when idle if set
+        :param enemy_strategy: - strategy of the enemies, strategy of the difficulty level if not set
+        :param difficulty: - curves of the enemies, default curves if not set
+        :param stats: - counts the final score of every game if set
+        """
+        self.persister = persister
+        self.sessions = sessions
+        self.enemy_strategy = enemy_strategy
+        self.difficulty = difficulty
+        self.stats = stats
+        self.transport = None
+        self.session: Optional[BotSession] = None
+        self.buffer = b''
+        self.writing_paused = False
+        self.backlog = False
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.transport = transport
+        transport.set_write_buffer_limits(high=BOT_WRITE_BUFFER)
+        if self.sessions is not None:
+            try:
+                self.sessions.open(self)
+            except SessionLimitError:
+                transport.write(b'error Server is full.\n')
+                transport.close()
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if self.sessions is not None:
+            self.sessions.close(self)
+        if self.session is not None:
+            METRICS.shard().active -= 1
+
+    def pause_writing(self) -> None:
+        self.writing_paused = True
+        self.transport.pause_reading()
+
+    def resume_writing(self) -> None:
+        self.writing_paused = False
+        if not self.backlog:
+            self.transport.resume_reading()
+
+    def expire(self, save: bool) -> None:
+        """
+        Close the idle connection, the score of the current game is saved or discarded
+        """
+        if self.session is not None and save:
+            self.session.game.save_score()
+        self.transport.write(b'error Session expired.\n')
+        self.transport.close()
+
+    def data_received(self, data: bytes) -> None:
+        self.buffer = self.buffer + data if self.buffer else data
+        if self.sessions is not None:
+            self.sessions.touch(self)
+        if not self.backlog:
+            self.process()
+
+    def process(self) -> None:
+        """
+        Answer the complete lines of the buffer, at most BOT_ROUNDS_PER_TURN attack options at once
+        """
+        buffer = self.buffer
+        replies = []
+        close = False
+        start = 0
+        budget = BOT_ROUNDS_PER_TURN
+        while not close:
+            end = buffer.find(b'\n', start)
+            if end < 0:
+                if len(buffer) - start > BOT_MAX_BATCH:
+                    replies.append(b'error Line is too long.\n')
+                    close = True
+                break
+            if budget <= 0:
+                break
+            reply, close = self.respond(buffer[start:end].rstrip(b'\r'))
+            replies.append(reply)
+            budget -= end - start
+            start = end + 1
+        self.buffer = buffer[start:]
+        if replies:
+            self.transport.write(b''.join(replies))
+        if close:
+            self.transport.close()
+            return
+        backlog = budget <= 0 and b'\n' in self.buffer
+        if backlog != self.backlog:
+            self.backlog = backlog
+            if backlog:
+                self.transport.pause_reading()
+            elif not self.writing_paused:
+                self.transport.resume_reading()
+        if backlog:
+            asyncio.get_running_loop().call_soon(self.resume_processing)
+
+    def resume_processing(self) -> None:
+        if not self.transport.is_closing():
+            self.process()
+
+    def respond(self, line: bytes) -> tuple[bytes, bool]:
+        """
+        Answer to one line and whether to close the connection after it
+        """
+        if self.session is None:
+            return self.hello(line)
+        if line.translate(None, ATTACK_CODES + QUIT_CODE):
+            return b'error Incorrect input.\n', False
+        result = self.session.play(line)
+        return result.line(), result.outcome == QUIT
+
+    def hello(self, line: bytes) -> tuple[bytes, bool]:
+        """
+        Start the session of the bot
+        """
+        try:
+            name, mode_input, *seed = line.decode().split()
+            validate_name(name)
+            seed = int(seed[0]) if seed else None
+        except (ValueError, IndexError, WhiteSpaceInputError, EmptyInputError):
+            return b'error Expected: name mode_option [seed].\n', True
+        if not is_valid_input_mode(mode_input):
+            return f'error Incorrect mode: {mode_input}.\n'.encode(), True
+        self.session = BotSession(name, MODES[mode_input], seed, self.persister, self.enemy_strategy, self.difficulty,
+                                  self.stats)
+        METRICS.shard().active += 1
+        return self.session.state(0, READY).line(), False
+
+
+class BotServer:
+    """
+    TCP server of the bot protocol
+    """
+
+    def __init__(self, host: str = LEADERBOARD_HOST, port: int = BOT_PORT,
+                 persister: Optional[WriteBehindPersister] = None, sessions: Optional[SessionManager] = None,
+                 enemy_strategy: Optional[EnemyStrategy] = None, difficulty: Optional[Difficulty] = None,
+                 stats: Optional[ScoreStatsStore] = None,
+                 stats_flush_interval: float = SCORE_STATS_FLUSH_INTERVAL) -> None:
+        """
+        Initialize the server
+        :param host: - host to listen on
+        :param port: - port to listen on, 0 for any free port
+        :param persister: - saves scores of finished games in background if set
+        :param sessions: - admission control and idle timeouts of the connections, default limits if not set
+        :param enemy_strategy: - strategy of the enemies of all bots, strategy of the difficulty level if not set
+        :param difficulty: - curves of the enemies, default curves if not set
+        :param stats: - counts the final score of every game if set, flushed while serving and when stopped
+        :param stats_flush_interval: - seconds between flushes of the statistics changed by new games
+        """
+        self.host = host
+        self.port = port
+        self.persister = persister
+        self.sessions = SessionManager() if sessions is None else sessions
+        self.enemy_strategy = enemy_strategy
+        self.difficulty = difficulty
+        self.stats = stats
+        self.stats_flush_interval = stats_flush_interval
+        self._expiry: Optional[asyncio.Task] = None
+        self._stats_flush: Optional[asyncio.Task] = None
+
+    async def start(self) -> asyncio.AbstractServer:
+        """
+        Start listening and expiring idle connections, the bound port is saved to port
+        """
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(
+            lambda: BotProtocol(self.persister, self.sessions, self.enemy_strategy, self.difficulty, self.stats),
+            self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self._expiry = loop.create_task(self.sessions.run())
+        if self.stats is not None:
+            self._stats_flush = loop.create_task(self.flush_stats())
+        return server
+
+    async def flush_stats(self) -> None:
+        """
+        Flush the statistics every stats_flush_interval seconds if games changed them, until cancelled.
+        The file is written on the default executor, so the bots keep playing meanwhile.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.stats_flush_interval)
+            if self.stats.changed:
+                await loop.run_in_executor(None, self.stats.flush)
+
+    async def serve(self) -> None:
+        """
+        Serve until cancelled
+        """
+        server = await self.start()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._expiry.cancel()
+            if self._stats_flush is not None:
+                self._stats_flush.cancel()
+                self.stats.flush()
+
+    def serve_forever(self) -> None:
+        """
+        Run the server in a new event loop
+        """
+        asyncio.run(self.serve())
@@ -0,0 +1,209 @@
+""" Difficulty curves of the enemies compiled to per-level tables """
+import json
+import threading
+from itertools import accumulate, repeat
+from math import log
+from random import Random
+from typing import Optional
+
+from settings import MODES, DIFFICULTY_TABLE_LEVELS, DIFFICULTY_MAX_LIVES
+from source.exceptions import IncorrectDifficultyError, IncorrectLevelError, IncorrectStrategyError
+from source.models import Enemy
+from source.modes import mode_profile
+from source.strategies import EnemyStrategy, CONTEXTS
+
+LINEAR = 'linear'
+EXPONENTIAL = 'exponential'
+STEPPED = 'stepped'
+DATA = 'data'
+
+
+class Curve:
+    """
+    Value of every level from 1: linear, exponential, stepped or listed values
+    """
+    __slots__ = ('kind', 'base', 'step', 'growth', 'every', 'data')
+
+    def __init__(self, kind: str, base: int = 1, step: int = 1, growth: float = 2.0, every: int = 1,
+                 data: tuple[int, ...] = ()) -> None:
+        """
+        Initialize the curve
+        :param kind: - linear: base + step * (level - 1),
+                       exponential: base * growth ** (level - 1),
+                       stepped: base + step * ((level - 1) // every),
+                       data: values of the first levels, the last value repeats after them
+        """
+        if kind not in (LINEAR, EXPONENTIAL, STEPPED, DATA) or every < 1 or growth < 1 or base < 1 or step < 0 \
+                or (kind == DATA and (not data or min(data) < 1)):
+            raise IncorrectDifficultyError
+        self.kind = kind
+        self.base = base
+        self.step = step
+        self.growth = growth
+        self.every = every
+        self.data = tuple(data)
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> "Curve":
+        """
+        Curve of the config, e.g. {"curve": "stepped", "base": 1, "step": 2, "every": 5}
+        """
+        try:
+            return cls(spec['curve'], int(spec.get('base', 1)), int(spec.get('step', 1)),
+                       float(spec.get('growth', 2.0)), int(spec.get('every', 1)),
+                       tuple(int(value) for value in spec.get('data', ())))
+        except (KeyError, TypeError, ValueError) as error:
+            raise IncorrectDifficultyError from error
+
+    def values(self, start: int, stop: int) -> list[int]:
+        """
+        Values of the levels from start to stop, stop excluded
+        """
+        if self.kind == LINEAR:
+            return list(range(self.base + self.step * (start - 1), self.base + self.step * (stop - 1), self.step)) \
+                if self.step else [self.base] * (stop - start)
+        if self.kind == STEPPED:
+            return [self.base + self.step * ((level - 1) // self.every) for level in range(start, stop)]
+        if self.kind == DATA:
+            listed = list(self.data[start - 1:stop - 1])
+            return listed + [self.data[-1]] * (stop - start - len(listed))
+        if (start - 1) * log(self.growth) + log(self.base) >= log(DIFFICULTY_MAX_LIVES):
+            return [DIFFICULTY_MAX_LIVES] * (stop - start)
+        first = self.base * self.growth ** (start - 1)
+        return [min(round(value), DIFFICULTY_MAX_LIVES)
+                for value in accumulate(repeat(self.growth, stop - start - 1), lambda value, growth:
+                                        min(value * growth, DIFFICULTY_MAX_LIVES), initial=first)]
+
+
+class DifficultyTable:
+    """
+    Lives, killing points and strategy of the enemy of every level, precomputed for the first levels
+    and extended twice as far when a higher level is asked, so spawning does not depend on the level.
+    """
+
+    def __init__(self, mode: str, lives: Curve, points: Curve, strategies: tuple[tuple[int, EnemyStrategy], ...] = (),
+                 level_step: int = 1, levels: int = DIFFICULTY_TABLE_LEVELS) -> None:
+        """
+        Compile the table
+        :param mode: - mode of the game
+        :param lives: - enemy lives by level
+        :param points: - points for killing the enemy by level
+        :param strategies: - (first level, strategy) pairs, the enemy attacks are equally likely before the first
+        :param level_step: - levels between two enemies of one game
+        :param levels: - levels compiled at once
+        """
+        if level_step < 1:
+            raise IncorrectDifficultyError
+        self.mode = mode
+        self.lives_curve = lives
+        self.points_curve = points
+        self.thresholds = tuple(sorted(strategies, key=lambda threshold: threshold[0]))
+        self.level_step = level_step
+        # index 0 is not a level
+        self.lives = [0]
+        self.points = [0]
+        self.strategies: list[Optional[EnemyStrategy]] = [None]
+        self._lock = threading.Lock()
+        self.extend(levels)
+
+    def __len__(self) -> int:
+        return len(self.strategies) - 1
+
+    def extend(self, levels: int) -> None:
+        """
+        Compile the levels up to levels, strategies are extended last
+        """
+        with self._lock:
+            self._extend(levels)
+
+    def _extend(self, levels: int) -> None:
+        start, stop = len(self.strategies), levels + 1
+        if stop <= start:
+            return
+        self.lives += self.lives_curve.values(start, stop)
+        self.points += self.points_curve.values(start, stop)
+        strategy, level = None, start
+        for first_level, next_strategy in self.thresholds:
+            if first_level <= start:
+                strategy = next_strategy
+                continue
+            end = min(first_level, stop)
+            self.strategies += [strategy] * (end - level)
+            strategy, level = next_strategy, end
+        self.strategies += [strategy] * (stop - level)
+
+    def spawn(self, level: int, rng: Optional[Random] = None, strategy: Optional[EnemyStrategy] = None) -> Enemy:
+        """
+        Enemy of the level
+        :param rng: - random generator of the session
+        :param strategy: - strategy of the enemy instead of the strategy of the level if set
+        """
+        if level >= len(self.strategies):
+            self.extend(max(level, 2 * len(self)))
+        elif level < 1:
+            raise IncorrectLevelError
+        return Enemy.spawn(level, self.lives[level], rng, strategy or self.strategies[level])
+
+    def killing_points(self, level: int) -> int:
+        return self.points[level]
+
+
+class Difficulty:
+    """
+    Difficulty tables of all modes, compiled on first use
+    """
+
+    def __init__(self, config: Optional[dict] = None) -> None:
+        """
+        Initialize the difficulty
+        :param config: - curves by mode name, e.g.
+                         {"Hard": {"lives": {"curve": "exponential", "base": 2, "growth": 1.5},
+                                   "points": {"curve": "linear", "base": 10, "step": 2},
+                                   "strategies": [{"from_level": 5, "weights": {...}}], "level_step": 1}},
+                         modes without curves keep the lives and points of their mode profile
+        """
+        self.config = config or {}
+        if set(self.config) - set(MODES.values()):
+            raise IncorrectDifficultyError
+        self._tables: dict[str, DifficultyTable] = {}
+
+    def table(self, mode: str) -> DifficultyTable:
+        """
+        Compiled table of the mode
+        """
+        table = self._tables.get(mode)
+        if table is None:
+            table = self._tables[mode] = self.compile(mode)
+        return table
+
+    def compile(self, mode: str) -> DifficultyTable:
+        spec = self.config.get(mode, {})
+        profile = mode_profile(mode)
+        multiplier = profile.enemy_lives_multiplier
+        lives = Curve.from_dict(spec['lives']) if 'lives' in spec else Curve(LINEAR, multiplier, multiplier)
+        points = Curve.from_dict(spec['points']) if 'points' in spec else Curve(LINEAR, profile.killing_points, 0)
+        try:
+            strategies = tuple((int(threshold['from_level']), EnemyStrategy({
+                context: tuple(float(weight) for weight in threshold['weights'][context]) for context in CONTEXTS}))
+                for threshold in spec.get('strategies', ()))
+            level_step = int(spec.get('level_step', 1))
+        except (KeyError, TypeError, ValueError, IncorrectStrategyError) as error:
+            raise IncorrectDifficultyError from error
+        return DifficultyTable(mode, lives, points, strategies, level_step)
+
+
+def load_difficulty(path: str) -> Difficulty:
+    """
+    Difficulty of the JSON config file
+    """
+    with open(path) as file:
+        try:
+            config = json.load(file)
+        except ValueError as error:
+            raise IncorrectDifficultyError from error
+    if not isinstance(config, dict):
+        raise IncorrectDifficultyError
+    return Difficulty(config)
+
+
+DEFAULT_DIFFICULTY = Difficulty()
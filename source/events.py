@@ -0,0 +1,214 @@
+""" Event bus for game lifecycle events """
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, NamedTuple, Optional, TYPE_CHECKING
+
+from settings import EVENT_BUS_WORKERS, EVENT_BUS_BATCH_SIZE, EVENT_BUS_FLUSH_INTERVAL
+from source.exceptions import IncorrectDispatchTypeError
+
+if TYPE_CHECKING:
+    from source.record import PlayerRecord
+
+INLINE = 'inline'
+THREAD = 'thread'
+BATCH = 'batch'
+DISPATCH_TYPES = (INLINE, THREAD, BATCH)
+
+_STOP = object()
+
+
+class RoundResolvedEvent(NamedTuple):
+    """
+    One resolved round of a battle, the fight result is for the player
+    """
+    player_name: str
+    mode: str
+    fight_result: int
+    player_attack: Optional[str]
+    enemy_attack: Optional[str]
+
+
+class EnemyDownEvent(NamedTuple):
+    """
+    Enemy of the level is down, score of the player after the kill
+    """
+    player_name: str
+    mode: str
+    level: int
+    score: int
+
+
+class GameOverEvent(NamedTuple):
+    """
+    Player lost the game with the final score
+    """
+    player_name: str
+    mode: str
+    score: int
+
+
+class RecordSavedEvent(NamedTuple):
+    """
+    Record of a finished game is committed to the score store
+    """
+    record: "PlayerRecord"
+
+
+class ThreadSubscriber:
+    """
+    Runs handler for every event on the bus thread pool
+    """
+
+    def __init__(self, handler: Callable, pool: ThreadPoolExecutor) -> None:
+        self.handler = handler
+        self.pool = pool
+
+    def deliver(self, event) -> None:
+        self.pool.submit(self.handler, event)
+
+    def flush(self) -> None:
+        pass
+
+
+class BatchSubscriber:
+    """
+    Buffers events and runs handler with a list of events on the bus thread pool,
+    when the batch is full or flush_interval seconds after its first event
+    """
+
+    def __init__(self, handler: Callable, pool: ThreadPoolExecutor, batch_size: int,
+                 flush_interval: float = EVENT_BUS_FLUSH_INTERVAL) -> None:
+        self.handler = handler
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.deadline = 0.0
+
+    def deliver(self, event) -> None:
+        if not self.buffer:
+            self.deadline = time.monotonic() + self.flush_interval
+        self.buffer.append(event)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush_due(self, now: float) -> None:
+        """
+        Flush the batch if it waits since the deadline
+        """
+        if self.buffer and now >= self.deadline:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            self.pool.submit(self.handler, self.buffer)
+            self.buffer = []
+
+
+class EventBus:
+    """
+    Delivers events to subscribers.
+    Inline handlers run in emit(), the other subscribers get events through one queue,
+    so emit() does not depend on how many of them are attached.
+    """
+
+    def __init__(self, workers: int = EVENT_BUS_WORKERS) -> None:
+        """
+        Initialize the bus
+        :param workers: - threads running non-inline handlers
+        """
+        self.workers = workers
+        self._inline = defaultdict(list)
+        self._async = defaultdict(list)
+        self._queue = queue.SimpleQueue()
+        self._batches: list[BatchSubscriber] = []
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+
+    def subscribe(self, event_type: type, handler: Callable, dispatch: str = INLINE,
+                  batch_size: int = EVENT_BUS_BATCH_SIZE, flush_interval: float = EVENT_BUS_FLUSH_INTERVAL) -> None:
+        """
+        Subscribe handler to events of the type
+        :param event_type: - class of the event
+        :param handler: - called with the event, or with a list of events for batch dispatch
+        :param dispatch: - inline, thread or batch
+        :param batch_size: - events in one batch for batch dispatch
+        :param flush_interval: - max seconds an event waits for its batch to fill for batch dispatch
+        """
+        if dispatch not in DISPATCH_TYPES:
+            raise IncorrectDispatchTypeError
+        if dispatch == INLINE:
+            self._inline[event_type].append(handler)
+            return
+        self._start()
+        if dispatch == THREAD:
+            self._async[event_type].append(ThreadSubscriber(handler, self._pool))
+        else:
+            subscriber = BatchSubscriber(handler, self._pool, batch_size, flush_interval)
+            self._batches.append(subscriber)
+            self._async[event_type].append(subscriber)
+
+    def emit(self, event) -> None:
+        """
+        Send event to subscribers
+        """
+        event_type = type(event)
+        for handler in self._inline.get(event_type, ()):
+            handler(event)
+        if event_type in self._async:
+            self._queue.put(event)
+
+    def close(self) -> None:
+        """
+        Deliver queued events, flush batches and wait for handlers
+        """
+        if self._dispatcher is None:
+            return
+        self._queue.put(_STOP)
+        self._dispatcher.join()
+        for subscribers in self._async.values():
+            for subscriber in subscribers:
+                subscriber.flush()
+        self._pool.shutdown(wait=True)
+        self._async.clear()
+        self._batches.clear()
+        self._dispatcher = None
+        self._pool = None
+
+    def __enter__(self) -> "EventBus":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _start(self) -> None:
+        if self._dispatcher is None:
+            self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='event-handler')
+            self._dispatcher = threading.Thread(target=self._dispatch, name='event-dispatcher', daemon=True)
+            self._dispatcher.start()
+
+    def _dispatch(self) -> None:
+        """
+        Dispatcher loop: deliver events, wait for the next one at most until the earliest batch deadline
+        """
+        while True:
+            deadline = min((subscriber.deadline for subscriber in self._batches if subscriber.buffer), default=None)
+            try:
+                if deadline is None:
+                    event = self._queue.get()
+                else:
+                    event = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                event = None
+            if event is _STOP:
+                break
+            if event is not None:
+                for subscriber in self._async[type(event)]:
+                    subscriber.deliver(event)
+            if deadline is not None:
+                now = time.monotonic()
+                for subscriber in self._batches:
+                    subscriber.flush_due(now)
@@ -0,0 +1,150 @@
+""" Genetic optimizer of enemy strategies scored by self-play against player strategies """
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from random import Random
+from typing import Iterable, Optional
+
+from settings import MODE_HARD, EVOLUTION_POPULATION, EVOLUTION_GENERATIONS, EVOLUTION_GAMES, EVOLUTION_MAX_ROUNDS, \
+    EVOLUTION_MUTATION, EVOLUTION_ELITE, EVOLUTION_WORKERS
+from source.models import Player, Enemy, Battle, FightOutcome
+from source.strategies import EnemyStrategy, Genome, PLAYER_STRATEGIES, ATTACKS, CONTEXTS
+
+EVOLUTION_PLAYER_NAME = 'bot'
+TOURNAMENT_SIZE = 3
+
+
+def play_game(strategy: Optional[EnemyStrategy], player_strategy: str, mode: str, rng: Random,
+              max_rounds: int) -> int:
+    """
+    Play one headless game with the Battle rules
+    :param strategy: - strategy of the enemies, equally likely attacks if not set
+    :param player_strategy: - name of the player strategy
+    :return: player's score
+    """
+    player = PLAYER_STRATEGIES[player_strategy]()
+    battle = Battle(Player(EVOLUTION_PLAYER_NAME), Enemy(mode, 1, rng, strategy), mode, headless=True)
+    for _ in range(max_rounds):
+        player_attack = player.attack(rng)
+        enemy_attack = battle.enemy.attack()
+        outcome = battle.play_round(player_attack, enemy_attack).outcome
+        player.observe(player_attack, enemy_attack)
+        if outcome == FightOutcome.ENEMY_DOWN:
+            battle.enemy = Enemy(mode, battle.enemy.level + 1, rng, strategy)
+        elif outcome == FightOutcome.GAME_OVER:
+            break
+    battle.count_fights()
+    return battle.player.score
+
+
+def player_score(genome: Optional[Genome], mode: str = MODE_HARD, games: int = EVOLUTION_GAMES,
+                 max_rounds: int = EVOLUTION_MAX_ROUNDS, seed: int = 0) -> float:
+    """
+    Mean score of all player strategies against the enemy strategy, lower is a harder enemy
+    :param genome: - flat weights of the enemy strategy, equally likely attacks if not set
+    :param games: - games of every player strategy
+    :param seed: - seed of the games, the same seed gives every strategy the same players
+    """
+    strategy = None if genome is None else EnemyStrategy.from_genome(genome)
+    total = 0
+    for index, player_strategy in enumerate(PLAYER_STRATEGIES):
+        rng = Random(seed * len(PLAYER_STRATEGIES) + index)
+        for _ in range(games):
+            total += play_game(strategy, player_strategy, mode, rng, max_rounds)
+    return total / (games * len(PLAYER_STRATEGIES))
+
+
+def normalized(weights: Iterable[float]) -> tuple[float, ...]:
+    """
+    Weights of every context scaled to sum to 1, equal weights for a context without any
+    """
+    weights = list(weights)
+    size = len(ATTACKS)
+    result = []
+    for start in range(0, len(weights), size):
+        context = [max(weight, 0.0) for weight in weights[start:start + size]]
+        total = sum(context)
+        result.extend(weight / total for weight in context) if total else result.extend([1 / size] * size)
+    return tuple(result)
+
+
+class EnemyEvolution:
+    """
+    Evolves enemy strategies that minimize the mean score of the player strategies.
+    Every candidate is scored with the same seed, so the fitness of a genome does not change
+    and is cached: elites and repeated genomes are not played again in later generations.
+    """
+
+    def __init__(self, mode: str = MODE_HARD, population: int = EVOLUTION_POPULATION,
+                 generations: int = EVOLUTION_GENERATIONS, games: int = EVOLUTION_GAMES,
+                 max_rounds: int = EVOLUTION_MAX_ROUNDS, mutation: float = EVOLUTION_MUTATION,
+                 elite: int = EVOLUTION_ELITE, workers: Optional[int] = EVOLUTION_WORKERS, seed: int = 0) -> None:
+        """
+        Initialize the optimizer
+        :param mode: - mode of the games
+        :param population: - candidates in every generation
+        :param generations: - number of generations
+        :param games: - games of every player strategy per candidate
+        :param max_rounds: - rounds after which a game is stopped
+        :param mutation: - standard deviation of the weight mutation
+        :param elite: - best candidates copied to the next generation
+        :param workers: - processes scoring candidates, os.cpu_count() if not set, 1 to score in this process
+        :param seed: - seed of the evolution and of the scoring games
+        """
+        self.mode = mode
+        self.population = population
+        self.generations = generations
+        self.games = games
+        self.max_rounds = max_rounds
+        self.mutation = mutation
+        self.elite = elite
+        self.workers = workers
+        self.seed = seed
+        self.rng = Random(seed)
+        self.fitness: dict[Genome, float] = {}
+        self.best_scores: list[float] = []
+
+    def run(self) -> EnemyStrategy:
+        """
+        Evolve the strategies
+        :return: the strategy with the lowest player score
+        """
+        genomes = [normalized([1.0] * len(CONTEXTS) * len(ATTACKS))]
+        genomes += [self.random_genome() for _ in range(self.population - 1)]
+        executor = ProcessPoolExecutor(self.workers) if self.workers != 1 else None
+        try:
+            for _ in range(self.generations):
+                self.score(genomes, executor)
+                ranked = sorted(genomes, key=self.fitness.__getitem__)
+                self.best_scores.append(self.fitness[ranked[0]])
+                genomes = ranked[:self.elite] + [self.child(ranked) for _ in range(self.population - self.elite)]
+            self.score(genomes, executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return EnemyStrategy.from_genome(min(genomes, key=self.fitness.__getitem__))
+
+    def score(self, genomes: list[Genome], executor: Optional[ProcessPoolExecutor]) -> None:
+        """
+        Score the genomes missing in the fitness cache
+        """
+        new = list(dict.fromkeys(genome for genome in genomes if genome not in self.fitness))
+        scorer = partial(player_score, mode=self.mode, games=self.games, max_rounds=self.max_rounds, seed=self.seed)
+        results = map(scorer, new) if executor is None else executor.map(scorer, new)
+        self.fitness.update(zip(new, results))
+
+    def random_genome(self) -> Genome:
+        return normalized(self.rng.random() for _ in range(len(CONTEXTS) * len(ATTACKS)))
+
+    def child(self, ranked: list[Genome]) -> Genome:
+        """
+        Child of two tournament winners: every context comes from one of the parents, weights are mutated
+        """
+        first, second = self.select(ranked), self.select(ranked)
+        size = len(ATTACKS)
+        weights = []
+        for start in range(0, len(first), size):
+            weights.extend((first if self.rng.random() < 0.5 else second)[start:start + size])
+        return normalized(weight + self.rng.gauss(0, self.mutation) for weight in weights)
+
+    def select(self, ranked: list[Genome]) -> Genome:
+        return ranked[min(self.rng.randrange(len(ranked)) for _ in range(TOURNAMENT_SIZE))]
@@ -39,3 +39,47 @@ class IncorrectLevelError(Exception):
 
 class IncorrectFightResult(Exception):
     """ Raised if result of battle is incorrect """
+
+
+class IncorrectDispatchTypeError(Exception):
+    """ Raised if event subscriber dispatch type is incorrect """
+
+
+class InputSchemaError(Exception):
+    """ Raised if input asset options do not match the settings """
+
+
+class IncorrectScoreError(Exception):
+    """ Raised if score of a record is incorrect """
+
+
+class IncorrectFileFormatError(Exception):
+    """ Raised if score file format is not supported """
+
+
+class IncorrectScoreFileError(Exception):
+    """ Raised if file is not a binary score file """
+
+
+class IncorrectStrategyError(Exception):
+    """ Raised if enemy strategy weights are incorrect """
+
+
+class IncorrectDifficultyError(Exception):
+    """ Raised if difficulty curves are incorrect """
+
+
+class IncorrectModeConfigError(Exception):
+    """ Raised if modes config is incorrect """
+
+
+class IncorrectPercentileError(Exception):
+    """ Raised if percentile is not between 0 and 100 """
+
+
+class SessionLimitError(Exception):
+    """ Raised if a server has no room for one more session """
+
+
+class ScoreSaveError(Exception):
+    """ Raised if scores could not be saved """
@@ -1,30 +1,116 @@
 """ This file is the entry file. Run it to start."""
+import argparse
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+from random import Random
+from typing import Iterable, Optional, TextIO
+
 from source.input_generator import InputGenerator
-from settings import MODES, SCORE_FILE
-from source.exceptions import GameOver, EnemyDown, QuitApp, RecordInRecordsError
-from source.models import Player, Enemy, Battle
-from source.record import GameRecord
-from source.validations import is_valid_input_mode, is_valid_input_menu
+from settings import MODES, ALLOWED_ATTACKS, MAX_RECORDS_NUMBER, NAME_ADDITIONAL_SPACES, LEADERBOARD_PORT, \
+    SPECTATOR_PORT, PVP_PORT, BOT_PORT, ENEMY_STRATEGY_FILE, MODE_NAME_MAX_SIZE, SCORE_STATS_PERCENTILES, \
+    METRICS_PORT, BOT_MAX_SESSIONS, SESSION_IDLE_TIMEOUT
+from source.difficulty import Difficulty, DifficultyTable, DEFAULT_DIFFICULTY, load_difficulty
+from source.evolution import EnemyEvolution, player_score
+from source.events import EventBus, GameOverEvent, RecordSavedEvent
+from source.exceptions import QuitApp, RecordInRecordsError, IncorrectFileFormatError, IncorrectScoreError, \
+    WhiteSpaceInputError, EmptyInputError, IncorrectModeError
+from source.leaderboard_server import LeaderboardServer, LEADERBOARD_PATH
+from source.metrics import METRICS, MetricsServer, METRICS_PATH
+from source.models import Player, Enemy, Battle, FightOutcome, FightResult
+from source.modes import mode_profile
+from source.persister import WriteBehindPersister
+from source.profiles import ProfileAggregator
+from source.record import PlayerRecord, record_file_title_row, record_file_row
+from source.pvp import PvpServer
+from source.renderer import LineRenderer, FrameRenderer, AnsiRenderer, Status
+from source.score_io import import_scores, export_scores, export_npy, export_binary
+from source.score_mmap import BinaryScoreFile
+from source.score_stats import ScoreStatsStore
+from source.score_store import ShardedScoreStore, default_score_store
+from source.spectators import SpectatorHub
+from source.strategies import EnemyStrategy, load_enemy_strategy, save_enemy_strategy
+from source.validations import is_valid_input_mode, is_valid_input_menu, is_valid_input_attack, validate_mode, \
+    validated_score_row_size, is_valid_input_score_menu
 
 __version__ = '1'
 
+IMPORT_ERRORS = {
+    IncorrectFileFormatError: 'the format or the columns of the file are not supported',
+    IncorrectScoreError: 'scores must be non-negative integers',
+    WhiteSpaceInputError: 'names must not contain whitespace',
+    EmptyInputError: 'names must not be empty',
+    IncorrectModeError: 'unknown mode',
+    ValueError: 'the file is not valid',
+}
+
 
 class Game:
     """
     The game class to start game
     """
-    _level: int = 0
+    __slots__ = ('_level', 'mode', 'player', 'enemy', 'store', 'persister', 'profiles', 'events', 'headless',
+                 'battle', 'rng', 'renderer', 'enemy_strategy', 'difficulty', '_table', 'stats')
+    _level: int
     mode: str
     player: Player
     enemy: Enemy
-    game_record: GameRecord
+    store: Optional[ShardedScoreStore]
+    persister: Optional[WriteBehindPersister]
+    profiles: Optional[ProfileAggregator]
+    events: Optional[EventBus]
+    headless: bool
+    battle: Optional[Battle]
+    rng: Optional[Random]
+    renderer: LineRenderer
+    enemy_strategy: Optional[EnemyStrategy]
+    difficulty: Difficulty
+    _table: Optional[DifficultyTable]
+    stats: Optional[ScoreStatsStore]
 
-    def __init__(self):
+    def __init__(self, persister: Optional[WriteBehindPersister] = None,
+                 profiles: Optional[ProfileAggregator] = None, events: Optional[EventBus] = None,
+                 headless: bool = False, name: Optional[str] = None, mode: Optional[str] = None,
+                 rng: Optional[Random] = None, renderer: Optional[LineRenderer] = None,
+                 enemy_strategy: Optional[EnemyStrategy] = None, difficulty: Optional[Difficulty] = None,
+                 stats: Optional[ScoreStatsStore] = None, store: Optional[ShardedScoreStore] = None):
         """
         Initialize the game
+        :param persister: - saves the score in background if set
+        :param profiles: - collects player statistics if set
+        :param events: - receives game events if set
+        :param headless: - play without printing game status and round results
+        :param name: - player's name, asked from user if not set
+        :param mode: - mode of the game, asked from user if not set
+        :param rng: - random generator of this game, needed to run games on several threads
+        :param renderer: - output of the game, line by line printing if not set
+        :param enemy_strategy: - strategy of the enemies, strategy of the difficulty level if not set
+        :param difficulty: - curves of enemy lives, points and strategies, lives of level or level * multiplier
+                             if not set
+        :param stats: - counts the final score of every game if set
+        :param store: - score store of the game, shards of this process if not set
         """
-        self.player = Player()
-        self.input_mode()
+        self.persister = persister
+        self.store = store
+        self.stats = stats
+        self.enemy_strategy = enemy_strategy
+        self.difficulty = difficulty or DEFAULT_DIFFICULTY
+        self._table = None
+        self.profiles = profiles
+        self.events = events
+        self.headless = headless
+        self.rng = rng
+        self.renderer = renderer or LineRenderer()
+        self.battle = None
+        self._level = 0
+        self.player = Player(name)
+        if mode is None:
+            self.input_mode()
+        else:
+            validate_mode(mode)
+            self.mode = mode
+        self.player.lives = mode_profile(self.mode).player_lives
 
     def input_mode(self) -> None:
         """
@@ -39,68 +125,245 @@ class Game:
 
     def new_enemy(self) -> None:
         """
-        Create new enemy with new level
+        Create new enemy with new level, lives and points come from the difficulty table of the mode
         """
-        self._level += 1
-        self.enemy = Enemy(mode=self.mode, level=self._level)
+        if self._table is None:
+            self._table = self.difficulty.table(self.mode)
+        self._level += self._table.level_step if self._level else 1
+        self.enemy = self._table.spawn(self._level, self.rng, self.enemy_strategy)
+        if self.battle is not None:
+            self.battle.enemy = self.enemy
+            self.battle.points_for_killing = self._table.killing_points(self._level)
 
     def print_status(self) -> None:
         """
         Prints the current game status to console
         """
-        print(f"\nPlayer: {self.player.name}."
-              f"\tMode: {self.mode}."
-              f"\tPlayer Lives: {self.player.lives}."
-              f"\tScore: {self.player.score}."
-              f"\tLevel: {self.enemy.level}"
-              f"\tEnemy's lives: {self.enemy.lives}")
+        if self.headless:
+            return
+        self.renderer.status(Status(self.player.name, self.mode, self.player.lives, self.player.score,
+                                    self.enemy.level, self.enemy.lives))
 
     def save_score(self) -> None:
         """
-        Saves score to board file
+        Saves score to the shard of this process, a score below the threshold of the full shard is skipped,
+        the score statistics and the metrics, if enabled, count every game
         """
-        self.game_record = GameRecord(self.mode)
+        if self.stats is not None:
+            self.stats.add(self.mode, self.player.score)
+        if not METRICS.enabled:
+            self._save_score()
+            return
+        metrics = METRICS.shard()
+        metrics.games_over[self.mode] += 1
+        start = time.perf_counter()
+        try:
+            self._save_score()
+        finally:
+            metrics.observe_save(time.perf_counter() - start)
+
+    def _save_score(self) -> None:
+        store = self.store or default_score_store()
+        record = PlayerRecord.from_player(self.player, self.mode)
+        if not store.admits(record):
+            return
+        if self.persister is not None:
+            self.persister.submit(record, None if self.events is None else self._record_saved)
+            return
         try:
-            self.game_record.add_record_from_player(self.player)
-            self.game_record.save_to_file()
+            store.save_record(record)
         except RecordInRecordsError:
-            print('Record is already in list')
+            if not self.headless:
+                self.renderer.line('Record is already in list')
+            return
+        if self.events is not None:
+            self._record_saved(record)
+
+    def _record_saved(self, record: PlayerRecord) -> None:
+        self.events.emit(RecordSavedEvent(record))
+
+    def begin(self) -> None:
+        """
+        Create the first enemy and the battle of the game
+        """
+        self.new_enemy()
+        self.battle = Battle(self.player, self.enemy, self.mode, self.profiles, self.events, self.headless,
+                             self.renderer)
+        self.battle.points_for_killing = self._table.killing_points(self._level)
+
+    def after_round(self, result: FightResult) -> bool:
+        """
+        Handle the outcome of the round
+        :return: True if the game is over
+        """
+        if result.outcome == FightOutcome.ENEMY_DOWN:
+            self.battle.count_fights()
+            self.new_enemy()
+            if not self.headless:
+                self.renderer.line("\nNew enemy comes.")
+        elif result.outcome == FightOutcome.GAME_OVER:
+            self.battle.count_fights()
+            self.on_game_over()
+            return True
+        return False
 
     def start_game(self) -> None:
         """
         Start game method
         """
-        self.new_enemy()
+        self.begin()
+        metrics = METRICS.shard()
+        metrics.active += 1
         try:
             while True:
                 self.print_status()
-                battle = Battle(self.player, self.enemy, self.mode)
-                try:
-                    battle.fight()
-                except EnemyDown:
-                    self.new_enemy()
-                    print("\nNew enemy comes.")
-        except GameOver:
-            print('You lose!')
-            self.save_score()
+                if self.after_round(self.battle.fight_round()):
+                    break
         finally:
+            metrics.active -= 1
+            self.battle.count_fights()
             self.print_status()
+            self.renderer.flush()
 
+    def play_attacks(self, attacks: Iterable[str]) -> bool:
+        """
+        Play rounds with attack inputs from the stream instead of asking user
+        :param attacks: - attack inputs, '0' quits the game
+        :return: True if the game is over, False if attacks ended first
+        """
+        if self.battle is None:
+            self.begin()
+        try:
+            for attack_input in attacks:
+                if not is_valid_input_attack(attack_input):
+                    if not self.headless:
+                        self.renderer.line('Incorrect input.')
+                    continue
+                if attack_input == '0':
+                    raise QuitApp
+                if self.after_round(self.battle.fight_with(ALLOWED_ATTACKS[attack_input])):
+                    return True
+            return False
+        finally:
+            self.battle.count_fights()
 
-def play() -> None:
+    def on_game_over(self) -> None:
+        """
+        Finish the lost game
+        """
+        if not self.headless:
+            self.renderer.line('You lose!')
+        if self.profiles is not None:
+            self.profiles.on_game_over(self.player.name, self.player.score)
+        if self.events is not None:
+            self.events.emit(GameOverEvent(self.player.name, self.mode, self.player.score))
+        self.save_score()
+
+
+def play(renderer: Optional[LineRenderer] = None, events: Optional[EventBus] = None,
+         enemy_strategy: Optional[EnemyStrategy] = None, difficulty: Optional[Difficulty] = None,
+         stats: Optional[ScoreStatsStore] = None, profiles: Optional[ProfileAggregator] = None) -> None:
     """
     Runs the main game
+    :param renderer: - output of the game
+    :param events: - bus for events of the game
+    :param enemy_strategy: - strategy of the enemies, strategy of the difficulty level if not set
+    :param difficulty: - curves of the enemies, default curves if not set
+    :param stats: - counts the score of the game if set
+    :param profiles: - collects statistics of the player if set
     """
-    game = Game()
+    game = Game(renderer=renderer, events=events, enemy_strategy=enemy_strategy, difficulty=difficulty, stats=stats,
+                profiles=profiles)
     game.start_game()
 
 
-def print_score() -> None:
+def score_table(rows: list[tuple[str, str, int]]) -> str:
+    """
+    Score table of (name, mode, score) rows with the name column fitting the longest name
+    """
+    name_column_size = validated_score_row_size(max((len(row[0]) for row in rows), default=0) + NAME_ADDITIONAL_SPACES)
+    return record_file_title_row(name_column_size) + ''.join(record_file_row(*row, name_column_size) for row in rows)
+
+
+def print_score(store: Optional[ShardedScoreStore] = None) -> None:
+    """
+    Prints the best scores of all modes
+    :param store: - score store, default score store if not set
+    """
+    print(score_table((store or default_score_store()).top_rows()))
+
+
+def print_leaderboard(path: str, n: int = MAX_RECORDS_NUMBER) -> None:
     """
-    Reads score from file and prints it
+    Prints the best scores of every mode from a binary score file, reading only the printed records
+    :param path: - path to the binary score file
+    :param n: - records of every mode
     """
-    with open(SCORE_FILE) as file:
-        print(file.read())
+    with BinaryScoreFile(path) as score_file:
+        for mode in score_file.sections:
+            print(score_table(score_file.top(n, mode)))
+
+
+def print_score_stats(store: Optional[ScoreStatsStore] = None) -> None:
+    """
+    Prints games, mean, best and percentiles of the scores of every mode from the statistics of all writers
+    :param store: - store of this writer, default store if not set
+    """
+    stats = (store or ScoreStatsStore()).merged()
+    print(f'{"Mode":<{MODE_NAME_MAX_SIZE}}{"Games":>12}{"Mean":>10}'
+          + ''.join(f'{f"p{q:g}":>10}' for q in SCORE_STATS_PERCENTILES) + f'{"Best":>10}')
+    for mode in MODES.values():
+        histogram = stats.histogram(mode)
+        if not histogram.count:
+            continue
+        print(f'{mode:<{MODE_NAME_MAX_SIZE}}{histogram.count:>12}{histogram.mean:>10.2f}'
+              + ''.join(f'{histogram.percentile(q):>10}' for q in SCORE_STATS_PERCENTILES) + f'{histogram.max:>10}')
+
+
+def print_profile(name: str, profiles: Optional[ProfileAggregator] = None) -> None:
+    """
+    Prints the statistics of the player collected by the console games
+    :param name: - name of the player
+    :param profiles: - profiles, saved profiles if not set
+    """
+    profile = (profiles or ProfileAggregator.load()).get(name)
+    if profile is None:
+        print('No player found.')
+        return
+    print(f'Player: {profile.name}. Games: {profile.games}. Rounds: {profile.rounds}. '
+          f'Wins: {profile.win_ratio:.0%}. Draws: {profile.draw_ratio:.0%}. Losses: {profile.loss_ratio:.0%}.\n'
+          f'Favourite attack: {profile.favourite_attack or "-"}. '
+          f'Best streak: {profile.best_streak}. Best score: {profile.best_score}.')
+
+
+def print_name_search(prefix: str, store: Optional[ShardedScoreStore] = None) -> None:
+    """
+    Prints the best score per mode of the players whose name starts with the prefix
+    :param prefix: - beginning of the name
+    :param store: - score store, default_score_store() with the score file of earlier versions if not set
+    """
+    store = store or default_score_store()
+    index = store.name_index()
+    rows = [(name, mode, score) for name, scores in index.search(prefix) for mode, score in sorted(scores.items())]
+    if not rows:
+        print('No players found.')
+        return
+    print(score_table(rows))
+
+
+def score_menu() -> None:
+    """
+    Displays the score menu
+    """
+    while True:
+        menu_choice = input(InputGenerator("score_menu").text)
+        if is_valid_input_score_menu(menu_choice):
+            break
+        print('Incorrect input.')
+    if menu_choice == '1':
+        print_score()
+    elif menu_choice == '2':
+        print_name_search(input('Name prefix: '))
 
 
 def main_menu_input() -> str:
@@ -114,27 +377,244 @@ def main_menu_input() -> str:
         print('Incorrect input.')
 
 
-def main_menu() -> None:
+def main_menu(renderer: Optional[LineRenderer] = None, events: Optional[EventBus] = None,
+              enemy_strategy: Optional[EnemyStrategy] = None, difficulty: Optional[Difficulty] = None,
+              stats: Optional[ScoreStatsStore] = None, profiles: Optional[ProfileAggregator] = None) -> None:
     """
     Displays the main menu of the game
+    :param renderer: - output of the game
+    :param events: - bus for events of the games
+    :param enemy_strategy: - strategy of the enemies, strategy of the difficulty level if not set
+    :param difficulty: - curves of the enemies, default curves if not set
+    :param stats: - counts the scores of the games if set
+    :param profiles: - collects statistics of the players if set
     """
     menu_choice = main_menu_input()
     if menu_choice == '1':
-        play()
+        play(renderer, events, enemy_strategy, difficulty, stats, profiles)
     elif menu_choice == '2':
-        print_score()
-        main_menu()
+        score_menu()
+        main_menu(renderer, events, enemy_strategy, difficulty, stats, profiles)
     elif menu_choice == '3':
         raise QuitApp
 
 
-def main():
+def play_script_game(line: str, persister: WriteBehindPersister, full_output: bool,
+                     stats: Optional[ScoreStatsStore] = None) -> str:
+    """
+    Plays one game of the script
+    :param line: - name, mode option and attack inputs separated by whitespaces,
+                   attack inputs may also be written without separators
+    :param persister: - saves scores of finished games
+    :param full_output: - return full game output instead of one summary line
+    :param stats: - counts scores of finished games if set
+    :return: - output of the game
+    """
+    name, mode_input, *attacks = line.split()
+    if not is_valid_input_mode(mode_input):
+        return f'{name}\tIncorrect mode: {mode_input}\n'
+    attack_inputs = ''.join(attacks)
+    if full_output:
+        buffer = io.StringIO()
+        with redirect_stdout(buffer):
+            game = Game(persister=persister, name=name, mode=MODES[mode_input], stats=stats)
+            try:
+                game.play_attacks(attack_inputs)
+            except QuitApp:
+                pass
+            game.print_status()
+        return buffer.getvalue()
+    game = Game(persister=persister, headless=True, name=name, mode=MODES[mode_input], stats=stats)
+    try:
+        result = 'Lose' if game.play_attacks(attack_inputs) else 'Unfinished'
+    except QuitApp:
+        result = 'Quit'
+    return f'{name}\t{game.mode}\t{game.player.score}\t{game.enemy.level}\t{result}\n'
+
+
+def play_script(lines: Iterable[str], out: TextIO, full_output: bool = False,
+                stats: Optional[ScoreStatsStore] = None) -> int:
+    """
+    Plays games from the script without prompts, output is written once
+    :param lines: - one game per line, see play_script_game
+    :param out: - stream for the output
+    :param full_output: - full game output instead of one summary line per game
+    :param stats: - counts scores of finished games and is flushed after the script if set
+    :return: - number of played games
+    """
+    output = []
+    with WriteBehindPersister() as persister:
+        for line in lines:
+            if len(line.split(maxsplit=2)) < 2:
+                continue
+            output.append(play_script_game(line, persister, full_output, stats))
+    if stats is not None:
+        stats.flush()
+    out.write(''.join(output))
+    return len(output)
+
+
+def evolve_enemy(path: str) -> None:
+    """
+    Evolves an enemy strategy, saves it and prints how it compares to equally likely attacks
+    :param path: - file of the strategy
+    """
+    evolution = EnemyEvolution()
+    strategy = evolution.run()
+    save_enemy_strategy(path, strategy)
+    check_seed = evolution.seed + 1
+    print(f'Mean player score by generation: {" ".join(f"{score:.2f}" for score in evolution.best_scores)}')
+    print(f'Mean player score on new games: random enemy {player_score(None, seed=check_seed):.2f}, '
+          f'evolved enemy {player_score(strategy.genome(), seed=check_seed):.2f}')
+    print(f'Saved to {path}')
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """
+    Command line arguments
+    """
+    parser = argparse.ArgumentParser(description='Console game "Paper Stone Scissors".')
+    script = parser.add_mutually_exclusive_group()
+    script.add_argument('--script', metavar='FILE',
+                        help='play games from the file, one game per line: name, mode option, attack inputs')
+    script.add_argument('--stdin-batch', action='store_true', help='play games from standard input like --script')
+    script.add_argument('--import-scores', metavar='FILE', help='import scores from a .csv or .jsonl file')
+    script.add_argument('--export-scores', metavar='FILE', help='export scores to a .csv or .jsonl file')
+    script.add_argument('--export-npy', metavar='DIR', help='export names and scores of every mode as .npy files')
+    script.add_argument('--export-binary', metavar='FILE', help='export scores to a binary score file')
+    script.add_argument('--score-stats', action='store_true',
+                        help='show score percentiles of every mode over all played games')
+    script.add_argument('--profile', metavar='NAME', help='show the statistics of the player')
+    script.add_argument('--leaderboard', metavar='FILE', help='show the best scores of a binary score file')
+    script.add_argument('--serve-leaderboard', metavar='PORT', type=int, nargs='?', const=LEADERBOARD_PORT,
+                        help=f'serve the best scores as JSON over HTTP, port {LEADERBOARD_PORT} by default')
+    script.add_argument('--serve-pvp', metavar='PORT', type=int, nargs='?', const=PVP_PORT,
+                        help=f'match players over TCP and play player versus player games, port {PVP_PORT} by default')
+    script.add_argument('--serve-bots', metavar='PORT', type=int, nargs='?', const=BOT_PORT,
+                        help=f'play games of bots sending batches of attacks over TCP, port {BOT_PORT} by default')
+    script.add_argument('--evolve-enemy', metavar='FILE', nargs='?', const=ENEMY_STRATEGY_FILE,
+                        help=f'evolve a hard enemy strategy and save it, to {ENEMY_STRATEGY_FILE} by default')
+    parser.add_argument('--max-sessions', metavar='N', type=int, default=BOT_MAX_SESSIONS,
+                        help=f'bots playing at once with --serve-bots, {BOT_MAX_SESSIONS} by default')
+    parser.add_argument('--idle-timeout', metavar='SECONDS', type=float, default=SESSION_IDLE_TIMEOUT,
+                        help=f'close bot connections idle for so long, {SESSION_IDLE_TIMEOUT:g} seconds by default')
+    parser.add_argument('--enemy-strategy', metavar='FILE', help='play against enemies with the saved strategy')
+    parser.add_argument('--difficulty', metavar='FILE',
+                        help='JSON curves of enemy lives, killing points and strategies by level for every mode')
+    parser.add_argument('--full-output', action='store_true',
+                        help='print full output of scripted games instead of one summary line per game')
+    parser.add_argument('--spectators', metavar='PORT', type=int, nargs='?', const=SPECTATOR_PORT,
+                        help=f'push the leaderboard to spectators over TCP, port {SPECTATOR_PORT} by default')
+    parser.add_argument('--metrics', metavar='PORT', type=int, nargs='?', const=METRICS_PORT,
+                        help=f'serve Prometheus metrics of the process over HTTP, port {METRICS_PORT} by default')
+    parser.add_argument('--ansi', action='store_true',
+                        help='keep the game status in the first terminal row and redraw only changed fields')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None):
     """
     Main game loop
+    :param argv: - command line arguments, sys.argv by default
     """
+    args = parse_args(argv)
+    if args.metrics is not None:
+        METRICS.enabled = True
+        metrics_server = MetricsServer(port=args.metrics)
+        metrics_server.start()
+        print(f'Metrics: http://{metrics_server.host}:{metrics_server.port}{METRICS_PATH}')
+    if args.script:
+        with open(args.script) as script:
+            play_script(script, sys.stdout, args.full_output, ScoreStatsStore())
+        return
+    if args.stdin_batch:
+        play_script(sys.stdin, sys.stdout, args.full_output, ScoreStatsStore())
+        return
+    if args.score_stats:
+        print_score_stats()
+        return
+    if args.import_scores:
+        try:
+            result = import_scores(args.import_scores)
+        except tuple(IMPORT_ERRORS) as error:
+            message = next(message for error_type, message in IMPORT_ERRORS.items() if isinstance(error, error_type))
+            print(f'Not imported: {message}.')
+            return
+        print(f'Rows: {result.rows}. Imported: {result.imported}. Duplicates: {result.duplicates}.')
+        return
+    if args.export_scores:
+        print(f'Exported: {export_scores(args.export_scores)}.')
+        return
+    if args.export_npy:
+        print('\n'.join(export_npy(args.export_npy)))
+        return
+    if args.export_binary:
+        export_binary(args.export_binary)
+        return
+    if args.profile:
+        print_profile(args.profile)
+        return
+    if args.leaderboard:
+        print_leaderboard(args.leaderboard)
+        return
+    if args.serve_leaderboard is not None:
+        server = LeaderboardServer(port=args.serve_leaderboard)
+        print(f'Leaderboard: http://{server.host}:{server.port}{LEADERBOARD_PATH}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print('Good buy!')
+        return
+    if args.serve_pvp is not None:
+        pvp_server = PvpServer(port=args.serve_pvp)
+        print(f'Player versus player: {pvp_server.host}:{pvp_server.port}')
+        try:
+            pvp_server.serve_forever()
+        except KeyboardInterrupt:
+            print('Good buy!')
+        return
+    if args.serve_bots is not None:
+        from source.bot_server import BotServer  # the bot server plays Game, import it only when needed
+        from source.session_manager import SessionManager
+        with WriteBehindPersister() as persister:
+            METRICS.gauge('rps_persister_queue_depth', 'Records waiting to be saved.', lambda: persister.pending)
+            METRICS.gauge('rps_persister_failed_records', 'Records of failed commits.', lambda: persister.failed)
+            sessions = SessionManager(args.max_sessions, args.idle_timeout)
+            METRICS.gauge('rps_bot_connections', 'Admitted bot connections.', lambda: len(sessions))
+            enemy_strategy = load_enemy_strategy(args.enemy_strategy) if args.enemy_strategy else None
+            difficulty = load_difficulty(args.difficulty) if args.difficulty else None
+            bot_server = BotServer(port=args.serve_bots, persister=persister, sessions=sessions,
+                                   enemy_strategy=enemy_strategy, difficulty=difficulty, stats=ScoreStatsStore())
+            print(f'Bots: {bot_server.host}:{bot_server.port}')
+            try:
+                bot_server.serve_forever()
+            except KeyboardInterrupt:
+                print('Good buy!')
+        return
+    if args.evolve_enemy:
+        evolve_enemy(args.evolve_enemy)
+        return
+    renderer = AnsiRenderer() if args.ansi else FrameRenderer()
+    stats = ScoreStatsStore()
+    profiles = ProfileAggregator.load()
+    events = None
+    hub = None
+    if args.spectators is not None:
+        events = EventBus()
+        hub = SpectatorHub()
+        hub.attach(events)
+        hub.start(port=args.spectators)
     try:
-        main_menu()
+        main_menu(renderer, events, load_enemy_strategy(args.enemy_strategy) if args.enemy_strategy else None,
+                  load_difficulty(args.difficulty) if args.difficulty else None, stats, profiles)
     except QuitApp:
         print('Good buy!')
     except KeyboardInterrupt:
         print('Good buy!')
+    finally:
+        if args.ansi:
+            renderer.reset()
+        stats.flush()
+        profiles.save()
+        if hub is not None:
+            hub.stop()
@@ -1,8 +1,48 @@
 import json
 import os
+from functools import lru_cache
 
 from settings import INPUT_ASSETS_PATH, ASSETS_FORMAT, INPUT_BASIC_TEXT, BASIC_OPTION_TEXTS, ROOT_DIR
 from source.exceptions import IncorrectInputTypeError
+from source.modes import MODE_REGISTRY
+
+# inputs whose options come from a registry instead of an asset
+GENERATED_INPUTS = {'mode': MODE_REGISTRY.menu_options}
+
+
+@lru_cache(maxsize=None)
+def load_input_options(type_of_input: str) -> dict[str, str]:
+    """
+    Options of the input from its asset or registry, loaded once per type
+    :param type_of_input: main menu, mode or attack
+    """
+    if type_of_input in GENERATED_INPUTS:
+        return GENERATED_INPUTS[type_of_input]()
+    with open(f"{ROOT_DIR}/{INPUT_ASSETS_PATH}{type_of_input}{ASSETS_FORMAT}") as asset:
+        return json.load(asset)
+
+
+@lru_cache(maxsize=None)
+def render_input_text(type_of_input: str) -> str:
+    """
+    Build text for the input from its asset, built once per type
+    :param type_of_input: main menu, mode or attack
+    """
+    options = load_input_options(type_of_input)
+    final_text = INPUT_BASIC_TEXT
+    final_text += f"{BASIC_OPTION_TEXTS[type_of_input]}\n"
+    for option, text in options.items():
+        final_text += f"{option} - {text}\n"
+    return final_text
+
+
+@lru_cache(maxsize=None)
+def list_input_types() -> tuple[str, ...]:
+    """
+    Types of inputs having an asset or a registry, listed once
+    """
+    return tuple(filename[:-len(ASSETS_FORMAT)] for filename in os.listdir(f"{ROOT_DIR}/{INPUT_ASSETS_PATH}")) \
+        + tuple(GENERATED_INPUTS)
 
 
 class InputGenerator:
@@ -24,13 +64,7 @@ class InputGenerator:
 
     @property
     def text(self) -> str:
-        with open(f"{ROOT_DIR}/{INPUT_ASSETS_PATH}{self.type_of_input}{ASSETS_FORMAT}") as asset:
-            options = json.load(asset)
-            final_text = INPUT_BASIC_TEXT
-            final_text += f"{BASIC_OPTION_TEXTS[self.type_of_input]}\n"
-            for option, text in options.items():
-                final_text += f"{option} - {text}\n"
-            return final_text
+        return render_input_text(self.type_of_input)
 
     def validate_type_of_input(self, type_of_input: str) -> None:
         if type_of_input not in self.get_list_of_possible_types():
@@ -38,4 +72,4 @@ class InputGenerator:
 
     @staticmethod
     def get_list_of_possible_types() -> list[str]:
-        return [filename[:-len(ASSETS_FORMAT)] for filename in os.listdir(f"{ROOT_DIR}/{INPUT_ASSETS_PATH}")]
+        return list(list_input_types())
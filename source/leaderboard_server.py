@@ -0,0 +1,179 @@
+""" Read-only HTTP leaderboard served from an in-memory snapshot of the score store """
+import asyncio
+import hashlib
+import json
+import time
+from typing import Optional
+
+from settings import MODES, MAX_RECORDS_NUMBER, LEADERBOARD_HOST, LEADERBOARD_PORT, LEADERBOARD_CHECK_INTERVAL
+from source.score_store import ShardedScoreStore, default_score_store
+
+LEADERBOARD_PATH = '/leaderboard'
+MAX_REQUEST_SIZE = 8192
+_NOT_FOUND = b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n'
+_NOT_ALLOWED = b'HTTP/1.1 405 Method Not Allowed\r\nAllow: GET, HEAD\r\nContent-Length: 0\r\n\r\n'
+_BAD_REQUEST = b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n'
+
+
+class Response:
+    """
+    Pre-rendered responses of one path of the snapshot
+    """
+    __slots__ = ('etag', 'ok', 'head', 'not_modified')
+
+    def __init__(self, body: bytes) -> None:
+        self.etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'.encode()
+        headers = (b'Content-Type: application/json\r\nCache-Control: no-cache\r\nETag: ' + self.etag +
+                   b'\r\nContent-Length: ' + str(len(body)).encode() + b'\r\n\r\n')
+        self.head = b'HTTP/1.1 200 OK\r\n' + headers
+        self.ok = self.head + body
+        self.not_modified = b'HTTP/1.1 304 Not Modified\r\nETag: ' + self.etag + b'\r\n\r\n'
+
+
+class LeaderboardSnapshot:
+    """
+    Top-n of every mode rendered to responses.
+    Rendered again only when the store version changes, checked at most once per interval.
+    """
+    store: ShardedScoreStore
+    top_n: int
+    check_interval: float
+    responses: dict[str, Response]
+
+    def __init__(self, store: Optional[ShardedScoreStore] = None, top_n: int = MAX_RECORDS_NUMBER,
+                 check_interval: float = LEADERBOARD_CHECK_INTERVAL) -> None:
+        """
+        Initialize the snapshot
+        :param store: - score store, default_score_store() written by the games if not set
+        :param top_n: - records of every mode
+        :param check_interval: - seconds between checks of the store version
+        """
+        self.store = store or default_score_store()
+        self.top_n = top_n
+        self.check_interval = check_interval
+        self.version = None
+        self.checked_at = float('-inf')
+        self.responses = {}
+
+    def current(self) -> dict[str, Response]:
+        """
+        Responses by path, rendered again if the store changed
+        """
+        now = time.monotonic()
+        if now - self.checked_at >= self.check_interval:
+            self.checked_at = now
+            version = self.store.version()
+            if version != self.version:
+                self.version = version
+                self.responses = self.render()
+        return self.responses
+
+    def render(self) -> dict[str, Response]:
+        """
+        Render responses of all paths
+        """
+        tops = {mode: [{'name': name, 'score': score} for name, _, score in self.store.top_rows(self.top_n, mode)]
+                for mode in MODES.values()}
+        responses = {LEADERBOARD_PATH: Response(json.dumps(tops).encode())}
+        for mode, top in tops.items():
+            responses[f'{LEADERBOARD_PATH}/{mode}'] = Response(json.dumps({'mode': mode, 'top': top}).encode())
+        return responses
+
+
+class LeaderboardProtocol(asyncio.Protocol):
+    """
+    Minimal HTTP/1.1 handling of GET and HEAD with keep-alive and pipelining
+    """
+
+    def __init__(self, snapshot: LeaderboardSnapshot) -> None:
+        self.snapshot = snapshot
+        self.transport = None
+        self.buffer = b''
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.transport = transport
+
+    def data_received(self, data: bytes) -> None:
+        self.buffer += data
+        replies = []
+        close = False
+        while not close:
+            end = self.buffer.find(b'\r\n\r\n')
+            if end < 0:
+                if len(self.buffer) > MAX_REQUEST_SIZE:
+                    replies.append(_BAD_REQUEST)
+                    close = True
+                break
+            request, self.buffer = self.buffer[:end], self.buffer[end + 4:]
+            reply, close = self.respond(request)
+            replies.append(reply)
+        if replies:
+            self.transport.write(b''.join(replies))
+        if close:
+            self.transport.close()
+
+    def respond(self, request: bytes) -> tuple[bytes, bool]:
+        """
+        Response to one request and whether to close the connection after it
+        """
+        lines = request.split(b'\r\n')
+        try:
+            method, target, version = lines[0].split(b' ')
+        except ValueError:
+            return _BAD_REQUEST, True
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(b':')
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get(b'connection', b'').lower()
+        close = connection == b'close' or (version == b'HTTP/1.0' and connection != b'keep-alive')
+        if method not in (b'GET', b'HEAD'):
+            return _NOT_ALLOWED, close
+        response = self.snapshot.current().get(target.partition(b'?')[0].decode('latin1'))
+        if response is None:
+            return _NOT_FOUND, close
+        if headers.get(b'if-none-match') == response.etag:
+            return response.not_modified, close
+        return (response.ok if method == b'GET' else response.head), close
+
+
+class LeaderboardServer:
+    """
+    HTTP server of the leaderboard
+    """
+
+    def __init__(self, store: Optional[ShardedScoreStore] = None, host: str = LEADERBOARD_HOST,
+                 port: int = LEADERBOARD_PORT, top_n: int = MAX_RECORDS_NUMBER) -> None:
+        """
+        Initialize the server
+        :param store: - score store, default_score_store() written by the games if not set
+        :param host: - host to listen on
+        :param port: - port to listen on, 0 for any free port
+        :param top_n: - records of every mode
+        """
+        self.snapshot = LeaderboardSnapshot(store, top_n)
+        self.host = host
+        self.port = port
+
+    async def start(self) -> asyncio.AbstractServer:
+        """
+        Start listening, the bound port is saved to port
+        """
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(lambda: LeaderboardProtocol(self.snapshot), self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+
+    async def serve(self) -> None:
+        """
+        Serve until cancelled
+        """
+        server = await self.start()
+        async with server:
+            await server.serve_forever()
+
+    def serve_forever(self) -> None:
+        """
+        Run the server in a new event loop
+        """
+        asyncio.run(self.serve())
@@ -0,0 +1,231 @@
+""" Operational metrics of the game process in per-thread shards, served as Prometheus text over HTTP """
+import asyncio
+import threading
+from bisect import bisect_left
+from typing import Callable, Optional
+
+from settings import WIN, DRAW, LOSE, LEADERBOARD_HOST, METRICS_PORT, METRICS_SAVE_BUCKETS
+from source.modes import MODE_REGISTRY
+
+METRICS_PATH = '/metrics'
+FIGHT_LABELS = {WIN: 'win', DRAW: 'draw', LOSE: 'lose'}
+MAX_REQUEST_SIZE = 8192
+_NOT_FOUND = b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n'
+
+
+class MetricsShard:
+    """
+    Counters of one thread. Only the owning thread writes them, so increments need no lock;
+    every key exists from the start, so the collector may read them while they are written.
+    """
+    __slots__ = ('fights', 'games_over', 'active', 'save_buckets', 'save_sum')
+    fights: list[int]
+    games_over: dict[str, int]
+    active: int
+    save_buckets: list[int]
+    save_sum: float
+
+    def __init__(self) -> None:
+        # indexed by the fight result: DRAW 0, WIN 1, LOSE -1
+        self.fights = [0] * len(FIGHT_LABELS)
+        self.games_over = dict.fromkeys(MODE_REGISTRY.names, 0)
+        self.active = 0
+        self.save_buckets = [0] * (len(METRICS_SAVE_BUCKETS) + 1)
+        self.save_sum = 0.0
+
+    def observe_save(self, seconds: float) -> None:
+        """
+        Count the latency of one score save
+        """
+        self.save_buckets[bisect_left(METRICS_SAVE_BUCKETS, seconds)] += 1
+        self.save_sum += seconds
+
+    def add(self, other: "MetricsShard") -> None:
+        self.fights = [total + count for total, count in zip(self.fights, other.fights)]
+        for mode, count in list(other.games_over.items()):
+            self.games_over[mode] += count
+        self.active += other.active
+        self.save_buckets = [total + count for total, count in zip(self.save_buckets, other.save_buckets)]
+        self.save_sum += other.save_sum
+
+
+class MetricsRegistry:
+    """
+    Shards of all threads that recorded metrics and gauges read on collection.
+    Writing a shard on every round would cost about a tenth of the round, so battles tally their rounds
+    and add them to the shard per batch or per game.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._local = threading.local()
+        self._shards: list[MetricsShard] = []
+        self._gauges: dict[str, tuple[str, Callable[[], float]]] = {}
+        self._lock = threading.Lock()
+
+    def shard(self) -> MetricsShard:
+        """
+        Shard of the current thread, objects keep it for the metrics of the thread playing them
+        """
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = MetricsShard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def gauge(self, name: str, description: str, function: Callable[[], float]) -> None:
+        """
+        Register a gauge read by the function on every collection, e.g. a queue depth
+        """
+        with self._lock:
+            self._gauges[name] = (description, function)
+
+    def remove_gauge(self, name: str) -> None:
+        with self._lock:
+            self._gauges.pop(name, None)
+
+    def totals(self) -> MetricsShard:
+        """
+        Sum of the shards of all threads
+        """
+        totals = MetricsShard()
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            totals.add(shard)
+        return totals
+
+    def render(self) -> bytes:
+        """
+        Metrics in the Prometheus text format
+        """
+        totals = self.totals()
+        lines = ['# HELP rps_active_sessions Games and sessions being played.',
+                 '# TYPE rps_active_sessions gauge',
+                 f'rps_active_sessions {totals.active}',
+                 '# HELP rps_rounds_total Resolved rounds of all battles.',
+                 '# TYPE rps_rounds_total counter',
+                 f'rps_rounds_total {sum(totals.fights)}',
+                 '# HELP rps_fights_total Resolved rounds by result for the player.',
+                 '# TYPE rps_fights_total counter']
+        lines += [f'rps_fights_total{{result="{label}"}} {totals.fights[result]}'
+                  for result, label in FIGHT_LABELS.items()]
+        lines += ['# HELP rps_games_over_total Finished games by mode.', '# TYPE rps_games_over_total counter']
+        lines += [f'rps_games_over_total{{mode="{mode}"}} {totals.games_over[mode]}'
+                  for mode in sorted(totals.games_over)]
+        lines += ['# HELP rps_score_save_seconds Latency of saving the score of a finished game.',
+                  '# TYPE rps_score_save_seconds histogram']
+        cumulative = 0
+        for bound, count in zip(METRICS_SAVE_BUCKETS + ('+Inf',), totals.save_buckets):
+            cumulative += count
+            lines.append(f'rps_score_save_seconds_bucket{{le="{bound}"}} {cumulative}')
+        lines += [f'rps_score_save_seconds_sum {totals.save_sum}', f'rps_score_save_seconds_count {cumulative}']
+        with self._lock:
+            gauges = list(self._gauges.items())
+        for name, (description, function) in gauges:
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} gauge', f'{name} {function()}']
+        return ('\n'.join(lines) + '\n').encode()
+
+
+METRICS = MetricsRegistry()
+
+
+class MetricsProtocol(asyncio.Protocol):
+    """
+    One scrape per connection: GET or HEAD of the metrics path
+    """
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.registry = registry
+        self.transport = None
+        self.buffer = b''
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.transport = transport
+
+    def data_received(self, data: bytes) -> None:
+        self.buffer += data
+        end = self.buffer.find(b'\r\n\r\n')
+        if end < 0:
+            if len(self.buffer) > MAX_REQUEST_SIZE:
+                self.transport.close()
+            return
+        self.transport.write(self.respond(self.buffer[:end]))
+        self.transport.close()
+
+    def respond(self, request: bytes) -> bytes:
+        method, _, rest = request.partition(b' ')
+        target = rest.partition(b' ')[0].partition(b'?')[0]
+        if method not in (b'GET', b'HEAD') or target != METRICS_PATH.encode():
+            return _NOT_FOUND
+        body = self.registry.render()
+        head = (b'HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n'
+                b'Content-Length: ' + str(len(body)).encode() + b'\r\nConnection: close\r\n\r\n')
+        return head + body if method == b'GET' else head
+
+
+class MetricsServer:
+    """
+    HTTP endpoint of the metrics on a background thread with its own event loop
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None, host: str = LEADERBOARD_HOST,
+                 port: int = METRICS_PORT) -> None:
+        """
+        Initialize the server
+        :param registry: - metrics to serve, process metrics if not set
+        :param host: - host to listen on
+        :param port: - port to listen on, 0 for any free port
+        """
+        self.registry = registry or METRICS
+        self.host = host
+        self.port = port
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[OSError] = None
+
+    async def serve(self, started: Optional[threading.Event] = None) -> None:
+        """
+        Serve until stop()
+        :param started: - set when the server is listening
+        """
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._stopped = asyncio.Event()
+        server = await loop.create_server(lambda: MetricsProtocol(self.registry), self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        if started is not None:
+            started.set()
+        async with server:
+            await self._stopped.wait()
+
+    def start(self) -> None:
+        """
+        Serve on a background thread, returns when the server is listening
+        """
+        started = threading.Event()
+
+        def run() -> None:
+            try:
+                asyncio.run(self.serve(started))
+            except OSError as error:
+                self._error = error
+                started.set()
+
+        self._thread = threading.Thread(target=run, name='metrics-server', daemon=True)
+        self._thread.start()
+        started.wait()
+        if self._error is not None:
+            raise self._error
+
+    def stop(self) -> None:
+        """
+        Stop serving
+        """
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -1,51 +1,173 @@
 """ module contains Enemy Class and Player Class"""
 
-from random import randint
+from enum import IntEnum
+from random import randint, random, Random
+from typing import NamedTuple, Optional, TYPE_CHECKING
 
 from source.exceptions import GameOver, EnemyDown, QuitApp, WhiteSpaceInputError, EmptyInputError
+from source.events import EventBus, RoundResolvedEvent, EnemyDownEvent
 from source.input_generator import InputGenerator
-from source.validations import is_valid_input_attack, validate_name, validate_mode, validate_level, \
-    validate_fight_result
+from source.metrics import METRICS
+from source.modes import mode_profile
+from source.profiles import ProfileAggregator
+from source.renderer import LineRenderer
+from source.validations import is_valid_input_attack, validate_name, validate_level, validate_fight_result
 from settings import (
     ALLOWED_ATTACKS,
-    MODE_NORMAL,
     PLAYER_LIVES,
-    POINTS_FOR_FIGHT,
-    POINTS_FOR_KILLING,
-    HARD_MODE_MULTIPLIER,
-    ATTACK_PAIRS_OUTCOME
+    ATTACK_PAIRS_OUTCOME,
+    WIN,
+    DRAW,
+    LOSE
 )
 
+if TYPE_CHECKING:
+    from source.strategies import EnemyStrategy
+
+
+class FightOutcome(IntEnum):
+    """
+    Outcome of one round for the fight engine
+    """
+    DRAW = 0
+    PLAYER_HIT = 1
+    PLAYER_MISSED = 2
+    ENEMY_DOWN = 3
+    GAME_OVER = 4
+
+
+class FightResult(NamedTuple):
+    """
+    Outcome of one round and the state after it
+    """
+    outcome: FightOutcome
+    player_lives: int
+    enemy_lives: int
+    score: int
+
+
+ENEMY_ATTACKS = {int(option): attack for option, attack in ALLOWED_ATTACKS.items() if option != '0'}
+ATTACK_CODES = b''.join(str(option).encode() for option in ENEMY_ATTACKS)
+CODE_ATTACKS = {code: ENEMY_ATTACKS[int(chr(code))] for code in ATTACK_CODES}
+
+# attack code pairs are added as numbers of one byte: 3 * player index + enemy index
+_PLAYER_CODE_INDEX = bytes.maketrans(ATTACK_CODES, bytes(range(0, 3 * len(ATTACK_CODES), 3)))
+_ENEMY_CODE_INDEX = bytes.maketrans(ATTACK_CODES, bytes(range(len(ATTACK_CODES))))
+_WIN_CODE, _DRAW_CODE, _LOSE_CODE = b'W', b'D', b'L'
+_FIRST_CODES_WINDOW = 64
+_PAIR_CODE_RESULTS = bytes.maketrans(
+    bytes(3 * first + second for first in range(len(ATTACK_CODES)) for second in range(len(ATTACK_CODES))),
+    b''.join({WIN: _WIN_CODE, LOSE: _LOSE_CODE}.get(ATTACK_PAIRS_OUTCOME[(CODE_ATTACKS[first], CODE_ATTACKS[second])],
+                                                    _DRAW_CODE)
+             for first in ATTACK_CODES for second in ATTACK_CODES))
+# random bytes 0..254 are spread evenly over the codes, 255 is dropped
+_RANDOM_BYTE_CODES = bytes.maketrans(bytes(range(255)), bytes(ATTACK_CODES[value % len(ATTACK_CODES)]
+                                                             for value in range(255)))
+
+
+def enemy_attack_codes(rng: Random, count: int) -> bytes:
+    """
+    Random enemy attacks as attack option codes, every code is equally likely
+    :param rng: - random generator of the session
+    :param count: - number of attacks
+    """
+    codes = b''
+    while len(codes) < count:
+        codes += rng.randbytes(count - len(codes) + 8).translate(_RANDOM_BYTE_CODES, b'\xff')
+    return codes[:count]
+
+
+def _nth(results: bytes, code: bytes, number: int) -> int:
+    """
+    Index of the round with the number-th result code, length of results if there are fewer
+    """
+    if number > len(results):
+        return len(results)
+    index = -1
+    for _ in range(number):
+        index = results.find(code, index + 1)
+        if index < 0:
+            return len(results)
+    return index
+
+
+def fight_points(mode: str) -> int:
+    """
+    Points for a successful fight in the mode
+    """
+    return mode_profile(mode).fight_points
+
+
+def killing_points(mode: str) -> int:
+    """
+    Points for killing an enemy in the mode
+    """
+    return mode_profile(mode).killing_points
+
 
 class Enemy:
     """
     Class represents the enemy bot player
     """
+    __slots__ = ('lives', 'level', 'rng', 'strategy', 'last_player_attack')
     lives: int
     level: int
+    rng: Optional[Random]
+    strategy: Optional["EnemyStrategy"]
+    last_player_attack: Optional[str]
 
-    def __init__(self, mode: str, level: int):
+    def __init__(self, mode: str, level: int, rng: Optional[Random] = None,
+                 strategy: Optional["EnemyStrategy"] = None):
         """
         Initializes the enemy instance
+        :param rng: - random generator of the session, shared module generator if not set
+        :param strategy: - chooses attacks by the last player attack, equally likely attacks if not set
         """
-        validate_mode(mode)
+        multiplier = mode_profile(mode).enemy_lives_multiplier
         validate_level(level)
         self.level = level
-        self.lives = self.level if mode == MODE_NORMAL else self.level * HARD_MODE_MULTIPLIER
+        self.lives = self.level * multiplier
+        self.rng = rng
+        self.strategy = strategy
+        self.last_player_attack = None
 
-    @staticmethod
-    def attack() -> str:
+    @classmethod
+    def spawn(cls, level: int, lives: int, rng: Optional[Random] = None,
+              strategy: Optional["EnemyStrategy"] = None) -> "Enemy":
+        """
+        Enemy with lives taken from a compiled difficulty table, no validation
+        """
+        enemy = cls.__new__(cls)
+        enemy.level = level
+        enemy.lives = lives
+        enemy.rng = rng
+        enemy.strategy = strategy
+        enemy.last_player_attack = None
+        return enemy
+
+    def attack(self) -> str:
         """
         Randomly returns one of possible enemy's attack
         """
-        return ALLOWED_ATTACKS[str(randint(1, 3))]
+        if self.strategy is not None:
+            return self.strategy.attack(random if self.rng is None else self.rng.random, self.last_player_attack)
+        if self.rng is None:
+            return ENEMY_ATTACKS[randint(1, 3)]
+        return ENEMY_ATTACKS[self.rng.randint(1, 3)]
 
-    def on_lose_fight(self) -> None:
+    def lose_fight(self) -> bool:
         """
         Decrease enemy's lives
+        :return: True if enemy is down
         """
         self.lives -= 1
-        if self.lives == 0:
+        return self.lives == 0
+
+    def on_lose_fight(self) -> None:
+        """
+        Decrease enemy's lives, raise EnemyDown if enemy is down
+        """
+        if self.lose_fight():
             raise EnemyDown
 
 
@@ -53,14 +175,22 @@ class Player:
     """
     Class describes user's player
     """
+    __slots__ = ('name', 'lives', 'score')
     name: str
-    score: int = 0
+    lives: int
+    score: int
 
-    def __init__(self):
+    def __init__(self, name: Optional[str] = None):
         """
         Initializes the player instance
+        :param name: - name of the player, asked from user if not set
         """
-        self.input_name()
+        self.score = 0
+        if name is None:
+            self.input_name()
+        else:
+            validate_name(name)
+            self.name = name
         self.lives = PLAYER_LIVES
 
     def input_name(self) -> None:
@@ -79,84 +209,278 @@ class Player:
                 print('Name cannot be empty.')
 
     @staticmethod
-    def attack() -> str:
+    def attack(prompt: bool = True, renderer: Optional[LineRenderer] = None) -> str:
         """
         Asks for user attack input
+        :param prompt: - show the attack menu
+        :param renderer: - output of the game, plain input and print if not set
         """
         while True:
-            attack_input = input(InputGenerator('attacks').text)
+            text = InputGenerator('attacks').text if prompt else ''
+            attack_input = renderer.prompt(text) if renderer is not None else input(text)
             if is_valid_input_attack(attack_input):
                 if attack_input == '0':
                     raise QuitApp
                 return ALLOWED_ATTACKS[attack_input]
-            print('Incorrect input.')
+            if renderer is not None:
+                renderer.line('Incorrect input.')
+            else:
+                print('Incorrect input.')
 
-    def on_lose_fight(self) -> None:
+    def lose_fight(self) -> bool:
         """
         Decreases player's lives
+        :return: True if player has no lives left
         """
         self.lives -= 1
-        if self.lives == 0:
+        return self.lives == 0
+
+    def on_lose_fight(self) -> None:
+        """
+        Decreases player's lives, raise GameOver if player has no lives left
+        """
+        if self.lose_fight():
             raise GameOver
 
     def on_win_fight(self, mode) -> None:
         """
         Adds score in case successful fight
         """
-        validate_mode(mode)
-        self.score += POINTS_FOR_FIGHT if mode == MODE_NORMAL else POINTS_FOR_FIGHT * HARD_MODE_MULTIPLIER
+        self.score += fight_points(mode)
+
+    def add_enemy_down_score(self, mode) -> None:
+        """
+        Adds score on enemy down without messages
+        """
+        self.score += killing_points(mode)
 
     def on_enemy_down(self, mode):
         """
         Adds score on enemy down
         """
         print("Congratulation! Enemy down.")
-        validate_mode(mode)
-        self.score += POINTS_FOR_KILLING if mode == MODE_NORMAL else POINTS_FOR_KILLING * HARD_MODE_MULTIPLIER
+        self.add_enemy_down_score(mode)
 
 
 class Battle:
     """
-    Battle class with methods to fight
+    Battle class with methods to fight.
+    One battle lives for the whole game, mode is validated and points are computed once.
+    Rounds are tallied in wins, draws and losses of the battle and added to the metrics shard of the thread
+    playing it by count_fights(), once per batch of codes or per enemy of a game.
     """
+    __slots__ = ('player', 'enemy', 'mode', 'profiles', 'events', 'headless', 'renderer', 'points_for_fight',
+                 'points_for_killing', 'wins', 'draws', 'losses')
     player: Player
     enemy: Enemy
     mode: str
+    profiles: Optional[ProfileAggregator]
+    events: Optional[EventBus]
+    headless: bool
+    renderer: LineRenderer
+    points_for_fight: int
+    points_for_killing: int
+    wins: int
+    draws: int
+    losses: int
 
-    def __init__(self, player: Player, enemy: Enemy, mode: str) -> None:
+    def __init__(self, player: Player, enemy: Enemy, mode: str, profiles: Optional[ProfileAggregator] = None,
+                 events: Optional[EventBus] = None, headless: bool = False,
+                 renderer: Optional[LineRenderer] = None) -> None:
         """
         Initializes battle
+        :param profiles: - collects player statistics if set
+        :param events: - receives round events if set
+        :param headless: - do not print anything
+        :param renderer: - output of the battle, line by line printing if not set
         """
         self.player = player
         self.enemy = enemy
-        validate_mode(mode)
+        profile = mode_profile(mode)
         self.mode = mode
+        self.profiles = profiles
+        self.events = events
+        self.headless = headless
+        self.renderer = renderer or LineRenderer()
+        self.points_for_fight = profile.fight_points
+        self.points_for_killing = profile.killing_points
+        self.wins = self.draws = self.losses = 0
+
+    def fight_round(self) -> FightResult:
+        """
+        Resolves player's attack vs enemy's attack and prints the result
+        """
+        return self.fight_with(self.player.attack(prompt=not self.headless, renderer=self.renderer))
+
+    def fight_with(self, player_attack: str) -> FightResult:
+        """
+        Resolves given player's attack vs enemy's attack and prints the result
+        """
+        enemy_attack = self.enemy.attack()
+        if self.headless:
+            return self.play_round(player_attack, enemy_attack)
+        self.renderer.line(f"Your attack: {player_attack}.  Enemy's attack: {enemy_attack}")
+        result = self.play_round(player_attack, enemy_attack)
+        self.print_fight_result(result)
+        return result
+
+    def play_round(self, player_attack: str, enemy_attack: str) -> FightResult:
+        """
+        Resolves given attacks, no input and no output
+        """
+        self.enemy.last_player_attack = player_attack
+        return self._resolve(ATTACK_PAIRS_OUTCOME[(player_attack, enemy_attack)], player_attack, enemy_attack)
 
     def fight(self) -> None:
         """
         Resolves player's attack vs enemy's attack
         """
-        enemy_attack = self.enemy.attack()
-        player_attack = self.player.attack()
-        print(f"Your attack: {player_attack}.  Enemy's attack: {enemy_attack}")
-        fight_result = ATTACK_PAIRS_OUTCOME[(player_attack, enemy_attack)]
-        self.handle_fight_result(fight_result)
+        self.raise_on_end(self.fight_round())
 
-    def handle_fight_result(self, fight_result: int) -> None:
+    def resolve(self, fight_result: int, player_attack: Optional[str] = None,
+                enemy_attack: Optional[str] = None) -> FightResult:
         """
-        Handles results of the fight
+        Applies the fight result to player and enemy, no output and no exceptions
+        :param fight_result: - one of WIN, DRAW, LOSE
+        :return: outcome of the round and the state after it
         """
         validate_fight_result(fight_result)
-        if fight_result == 1:
-            print('You attacked successfully!')
-            self.player.on_win_fight(self.mode)
-            try:
-                self.enemy.on_lose_fight()
-            except EnemyDown:
-                self.player.on_enemy_down(self.mode)
-                raise
-        elif fight_result == -1:
-            print("You missed!")
-            self.player.on_lose_fight()
-        elif fight_result == 0:
-            print("It's a draw!")
+        return self._resolve(fight_result, player_attack, enemy_attack)
+
+    def _resolve(self, fight_result: int, player_attack: Optional[str], enemy_attack: Optional[str]) -> FightResult:
+        # results of the attack pairs table need no validation
+        if self.profiles is not None:
+            self.profiles.on_fight(self.player.name, fight_result, player_attack)
+        if self.events is not None:
+            self.events.emit(RoundResolvedEvent(self.player.name, self.mode, fight_result, player_attack,
+                                                enemy_attack))
+        if fight_result == WIN:
+            self.wins += 1
+            self.player.score += self.points_for_fight
+            if self.enemy.lose_fight():
+                self.player.score += self.points_for_killing
+                if self.events is not None:
+                    self.events.emit(EnemyDownEvent(self.player.name, self.mode, self.enemy.level,
+                                                    self.player.score))
+                outcome = FightOutcome.ENEMY_DOWN
+            else:
+                outcome = FightOutcome.PLAYER_HIT
+        elif fight_result == LOSE:
+            self.losses += 1
+            outcome = FightOutcome.GAME_OVER if self.player.lose_fight() else FightOutcome.PLAYER_MISSED
+        else:
+            self.draws += 1
+            outcome = FightOutcome.DRAW
+        return FightResult(outcome, self.player.lives, self.enemy.lives, self.player.score)
+
+    def print_fight_result(self, result: FightResult) -> None:
+        """
+        Prints messages for the outcome of the round
+        """
+        if result.outcome in (FightOutcome.PLAYER_HIT, FightOutcome.ENEMY_DOWN):
+            self.renderer.line('You attacked successfully!')
+            if result.outcome == FightOutcome.ENEMY_DOWN:
+                self.renderer.line("Congratulation! Enemy down.")
+        elif result.outcome in (FightOutcome.PLAYER_MISSED, FightOutcome.GAME_OVER):
+            self.renderer.line("You missed!")
+        else:
+            self.renderer.line("It's a draw!")
+
+    @staticmethod
+    def raise_on_end(result: FightResult) -> None:
+        """
+        Raises EnemyDown or GameOver for the exception based interface
+        """
+        if result.outcome == FightOutcome.ENEMY_DOWN:
+            raise EnemyDown
+        if result.outcome == FightOutcome.GAME_OVER:
+            raise GameOver
+
+    def resolve_codes(self, player_codes: bytes, enemy_codes: Optional[bytes] = None) -> tuple[int, FightOutcome]:
+        """
+        Resolves rounds given as attack option codes until the enemy is down, the game is over
+        or the codes end. Rounds without profiles and events are resolved in bulk, no output.
+        An enemy with a strategy answers the previous attack of the player, so it attacks round by round
+        with enemy.attack() and the enemy codes are not used.
+        :param player_codes: - attack options of the player, b'1', b'2' or b'3' per round
+        :param enemy_codes: - attack options of the enemy, at least as many as of the player,
+                              enemy.attack() every round if not set
+        :return: number of resolved rounds and the outcome of the last one
+        """
+        if not player_codes:
+            return 0, FightOutcome.DRAW
+        if self.enemy.strategy is not None or enemy_codes is None:
+            result = self._resolve_codes_by_round(player_codes)
+        elif self.profiles is not None or self.events is not None:
+            result = self._resolve_codes_by_round(player_codes, enemy_codes)
+        else:
+            result = self._resolve_codes_bulk(player_codes, enemy_codes)
+        self.count_fights()
+        return result
+
+    def _resolve_codes_bulk(self, player_codes: bytes, enemy_codes: bytes) -> tuple[int, FightOutcome]:
+        # windows grow from a short one, so a batch ending early does not pay for resolving all of its codes
+        start, size = 0, _FIRST_CODES_WINDOW
+        while True:
+            end = start + size
+            rounds, outcome = self._resolve_codes_window(player_codes[start:end], enemy_codes[start:end])
+            start += rounds
+            if outcome in (FightOutcome.ENEMY_DOWN, FightOutcome.GAME_OVER) or start >= len(player_codes):
+                return start, outcome
+            size *= 2
+
+    def _resolve_codes_window(self, player_codes: bytes, enemy_codes: bytes) -> tuple[int, FightOutcome]:
+        rounds = len(player_codes)
+        results = (int.from_bytes(player_codes.translate(_PLAYER_CODE_INDEX), 'big') +
+                   int.from_bytes(enemy_codes.translate(_ENEMY_CODE_INDEX), 'big')
+                   ).to_bytes(rounds, 'big').translate(_PAIR_CODE_RESULTS)
+        enemy_down = _nth(results, _WIN_CODE, self.enemy.lives)
+        game_over = _nth(results, _LOSE_CODE, self.player.lives)
+        if enemy_down < rounds and enemy_down < game_over:
+            rounds = enemy_down + 1
+            outcome = FightOutcome.ENEMY_DOWN
+            self.player.score += self.points_for_killing
+        elif game_over < rounds:
+            rounds = game_over + 1
+            outcome = FightOutcome.GAME_OVER
+        else:
+            outcome = {_WIN_CODE[0]: FightOutcome.PLAYER_HIT, _LOSE_CODE[0]: FightOutcome.PLAYER_MISSED}.get(
+                results[-1], FightOutcome.DRAW)
+        wins = results.count(_WIN_CODE, 0, rounds)
+        losses = results.count(_LOSE_CODE, 0, rounds)
+        self.player.score += wins * self.points_for_fight
+        self.enemy.lives -= wins
+        self.player.lives -= losses
+        self.wins += wins
+        self.losses += losses
+        self.draws += rounds - wins - losses
+        return rounds, outcome
+
+    def _resolve_codes_by_round(self, player_codes: bytes,
+                                enemy_codes: Optional[bytes] = None) -> tuple[int, FightOutcome]:
+        for rounds, player_code in enumerate(player_codes, 1):
+            enemy_attack = self.enemy.attack() if enemy_codes is None else CODE_ATTACKS[enemy_codes[rounds - 1]]
+            outcome = self.play_round(CODE_ATTACKS[player_code], enemy_attack).outcome
+            if outcome in (FightOutcome.ENEMY_DOWN, FightOutcome.GAME_OVER):
+                break
+        return rounds, outcome
+
+    def count_fights(self) -> None:
+        """
+        Add the rounds tallied since the last call to the metrics of the current thread if they are enabled
+        """
+        if METRICS.enabled:
+            fights = METRICS.shard().fights
+            fights[WIN] += self.wins
+            fights[DRAW] += self.draws
+            fights[LOSE] += self.losses
+        self.wins = self.draws = self.losses = 0
+
+    def handle_fight_result(self, fight_result: int, player_attack: Optional[str] = None,
+                            enemy_attack: Optional[str] = None) -> None:
+        """
+        Handles results of the fight, compatibility wrapper around resolve()
+        """
+        result = self.resolve(fight_result, player_attack, enemy_attack)
+        self.print_fight_result(result)
+        self.raise_on_end(result)
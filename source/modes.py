@@ -0,0 +1,103 @@
+""" Registry of the game modes compiled from the modes config """
+import json
+from typing import NamedTuple
+
+from settings import MODE_CONFIG, MODE_NAME_MAX_SIZE, POINTS_FOR_FIGHT, POINTS_FOR_KILLING, PLAYER_LIVES
+from source.exceptions import IncorrectModeError, IncorrectModeConfigError
+
+
+class ModeProfile(NamedTuple):
+    """
+    Frozen scoring and lives profile of one mode
+    """
+    name: str
+    option: str
+    title: str
+    fight_points: int
+    killing_points: int
+    enemy_lives_multiplier: int
+    player_lives: int
+
+
+def compile_mode(spec: dict) -> ModeProfile:
+    """
+    Profile of one mode of the config, e.g. {"option": "3", "name": "Nightmare", "multiplier": 3},
+    fight_points, killing_points, enemy_lives_multiplier and player_lives default to the basic values
+    times the multiplier (player lives are not multiplied), title defaults to the name
+    """
+    try:
+        name = spec['name']
+        option = str(spec['option'])
+        multiplier = int(spec.get('multiplier', 1))
+        profile = ModeProfile(name, option, str(spec.get('title', name)),
+                              int(spec.get('fight_points', POINTS_FOR_FIGHT * multiplier)),
+                              int(spec.get('killing_points', POINTS_FOR_KILLING * multiplier)),
+                              int(spec.get('enemy_lives_multiplier', multiplier)),
+                              int(spec.get('player_lives', PLAYER_LIVES)))
+    except (KeyError, TypeError, ValueError, AttributeError) as error:
+        raise IncorrectModeConfigError from error
+    # names are columns of the score files and parts of the shard file names
+    if not isinstance(name, str) or not name or name != ''.join(name.split()) or '.' in name \
+            or len(name.encode()) > MODE_NAME_MAX_SIZE or not option or option != ''.join(option.split()):
+        raise IncorrectModeConfigError(name)
+    if min(profile.fight_points, profile.killing_points) < 0 \
+            or min(profile.enemy_lives_multiplier, profile.player_lives) < 1:
+        raise IncorrectModeConfigError(name)
+    return profile
+
+
+class ModeRegistry:
+    """
+    Modes of the game, every mode compiled once to a frozen profile
+    """
+
+    def __init__(self, config: list[dict]) -> None:
+        """
+        Compile the modes
+        :param config: - list of the modes, see compile_mode
+        """
+        if not isinstance(config, list) or not config:
+            raise IncorrectModeConfigError
+        profiles = [compile_mode(spec) for spec in config]
+        self.profiles = {profile.name: profile for profile in profiles}
+        self.options = {profile.option: profile.name for profile in profiles}
+        if len(self.profiles) != len(profiles) or len(self.options) != len(profiles):
+            raise IncorrectModeConfigError
+        self.names = frozenset(self.profiles)
+
+    def __iter__(self):
+        return iter(self.profiles.values())
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def profile(self, mode: str) -> ModeProfile:
+        """
+        Profile of the mode
+        """
+        try:
+            return self.profiles[mode]
+        except KeyError:
+            raise IncorrectModeError(mode) from None
+
+    def menu_options(self) -> dict[str, str]:
+        """
+        Options of the mode input: title of every mode by its option
+        """
+        return {profile.option: profile.title for profile in self.profiles.values()}
+
+
+def load_modes(path: str) -> ModeRegistry:
+    """
+    Registry of the JSON config file
+    """
+    with open(path) as file:
+        try:
+            config = json.load(file)
+        except ValueError as error:
+            raise IncorrectModeConfigError from error
+    return ModeRegistry(config)
+
+
+MODE_REGISTRY = ModeRegistry(MODE_CONFIG)
+mode_profile = MODE_REGISTRY.profile
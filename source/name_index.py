@@ -0,0 +1,66 @@
+""" Index of player names for prefix search """
+from bisect import bisect_left, insort
+from typing import Iterable, Optional
+
+MAX_CHAR = chr(0x10FFFF)
+
+
+class NameIndex:
+    """
+    Sorted array of names with the best score of every name per mode.
+    A prefix query is two binary searches plus the matches.
+    """
+    names: list[str]
+    best: dict[str, dict[str, int]]
+
+    def __init__(self, rows: Iterable[tuple[str, str, int]] = ()) -> None:
+        """
+        Build the index
+        :param rows: - (name, mode, score) rows
+        """
+        self.best = {}
+        self.names = []
+        self.add_rows(rows)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, name: str, mode: str, score: int) -> None:
+        """
+        Add one score
+        """
+        scores = self.best.get(name)
+        if scores is None:
+            self.best[name] = {mode: score}
+            insort(self.names, name)
+        elif score > scores.get(mode, -1):
+            scores[mode] = score
+
+    def add_rows(self, rows: Iterable[tuple[str, str, int]]) -> None:
+        """
+        Add many scores, new names are sorted once
+        :param rows: - (name, mode, score) rows
+        """
+        best = self.best
+        known = len(best)
+        for name, mode, score in rows:
+            scores = best.get(name)
+            if scores is None:
+                best[name] = {mode: score}
+            elif score > scores.get(mode, -1):
+                scores[mode] = score
+        if len(best) != known:
+            self.names = sorted(best)
+
+    def search(self, prefix: str, limit: Optional[int] = None) -> list[tuple[str, dict[str, int]]]:
+        """
+        Names starting with the prefix, in alphabetical order, with their best score per mode
+        :param prefix: - beginning of the name
+        :param limit: - max number of names, all if not set
+        """
+        start = bisect_left(self.names, prefix)
+        end = bisect_left(self.names, prefix + MAX_CHAR, start)
+        if limit is not None:
+            end = min(end, start + limit)
+        best = self.best
+        return [(name, best[name]) for name in self.names[start:end]]
@@ -0,0 +1,144 @@
+""" Write-behind persistence of finished games' records """
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+from settings import PERSISTER_BATCH_SIZE, PERSISTER_FLUSH_INTERVAL
+from source.exceptions import ScoreSaveError
+from source.record import PlayerRecord
+from source.score_store import save_records_to_store
+
+_STOP = object()
+
+
+class WriteBehindPersister:
+    """
+    Queues player records and saves them on a background thread in batches.
+    Every batch is one commit: one rewrite and one fsync of every changed shard and one fsync of their directory.
+    Records of failed commits are kept and committed once more on close(), which raises ScoreSaveError
+    if they still can't be saved. A record may come with a callback called once its batch is committed.
+    """
+    commit: Callable[[list[PlayerRecord]], None]
+    batch_size: int
+    flush_interval: float
+    committed: int
+    failed_records: list[PlayerRecord]
+    failures: int
+    error: Optional[Exception]
+
+    def __init__(self, commit: Callable[[list[PlayerRecord]], None] = save_records_to_store,
+                 batch_size: int = PERSISTER_BATCH_SIZE, flush_interval: float = PERSISTER_FLUSH_INTERVAL) -> None:
+        """
+        Initialize the persister
+        :param commit: - saves a batch of records to the store, shards of this process by default
+        :param batch_size: - max records in one commit
+        :param flush_interval: - max seconds a record waits for its batch to fill
+        """
+        self.commit = commit
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.committed = 0
+        self.failed_records = []
+        self._failed_callbacks: list[Optional[Callable[[PlayerRecord], None]]] = []
+        self.failures = 0
+        self.error = None
+        self._queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "WriteBehindPersister":
+        """
+        Start the background worker
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='score-persister', daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, record: PlayerRecord, on_commit: Optional[Callable[[PlayerRecord], None]] = None) -> None:
+        """
+        Queue a record to save, returns immediately
+        :param record: - record to save
+        :param on_commit: - called with the record on the worker thread after its batch is committed
+        """
+        if self._thread is None:
+            self.start()
+        self._queue.put((record, on_commit))
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of records waiting in the queue
+        """
+        return self._queue.qsize()
+
+    @property
+    def failed(self) -> int:
+        """
+        Number of records of failed commits not saved yet
+        """
+        return len(self.failed_records)
+
+    def close(self) -> None:
+        """
+        Save all pending records, retry the records of failed commits once and stop the worker
+        """
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        if self.failed_records:
+            batch = list(zip(self.failed_records, self._failed_callbacks))
+            self.failed_records, self._failed_callbacks = [], []
+            self._commit_batch(batch)
+        if self.failed_records:
+            raise ScoreSaveError(self.failed) from self.error
+
+    def __enter__(self) -> "WriteBehindPersister":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        """
+        Worker loop: wait for a record, fill the batch, commit it
+        """
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch: list[tuple[PlayerRecord, Optional[Callable[[PlayerRecord], None]]]]) -> None:
+        """
+        Commit one batch and call the callbacks of its records, keep its records and the error if the commit fails
+        :param batch: - records to save with their callbacks
+        """
+        records = [record for record, _ in batch]
+        try:
+            self.commit(records)
+        except Exception as error:
+            self.failures += 1
+            self.error = error
+            self.failed_records.extend(records)
+            self._failed_callbacks.extend(on_commit for _, on_commit in batch)
+            return
+        self.committed += len(records)
+        for record, on_commit in batch:
+            if on_commit is not None:
+                on_commit(record)
@@ -0,0 +1,174 @@
+""" Per-player statistics updated incrementally on game events """
+import json
+from typing import Optional
+
+from settings import ROOT_DIR, PROFILES_FILE, PAPER, STONE, SCISSORS, WIN, DRAW
+from source.validations import validate_fight_result
+
+PROFILE_ATTACKS = (PAPER, STONE, SCISSORS)
+
+
+def get_profiles_file_path() -> str:
+    """
+    Get profiles file path
+    """
+    return f'{ROOT_DIR}/{PROFILES_FILE}'
+
+
+class PlayerProfile:
+    """
+    Counters of one player, every event updates them in O(1)
+    """
+    __slots__ = ('name', 'games', 'rounds', 'wins', 'draws', 'losses', 'attacks', 'streak', 'best_streak',
+                 'best_score')
+    name: str
+    games: int
+    rounds: int
+    wins: int
+    draws: int
+    losses: int
+    attacks: list[int]
+    streak: int
+    best_streak: int
+    best_score: int
+
+    def __init__(self, name: str) -> None:
+        """
+        Initialize empty profile
+        :param name: - name of the player
+        """
+        self.name = name
+        self.games = self.rounds = self.wins = self.draws = self.losses = 0
+        self.attacks = [0] * len(PROFILE_ATTACKS)
+        self.streak = self.best_streak = self.best_score = 0
+
+    def on_fight(self, fight_result: int, attack: Optional[str] = None) -> None:
+        """
+        Count one round
+        :param fight_result: - one of WIN, DRAW, LOSE
+        :param attack: - player's attack if known
+        """
+        self.rounds += 1
+        if fight_result == WIN:
+            self.wins += 1
+            self.streak += 1
+            if self.streak > self.best_streak:
+                self.best_streak = self.streak
+        else:
+            self.streak = 0
+            if fight_result == DRAW:
+                self.draws += 1
+            else:
+                self.losses += 1
+        if attack in PROFILE_ATTACKS:
+            self.attacks[PROFILE_ATTACKS.index(attack)] += 1
+
+    def on_game_over(self, score: int) -> None:
+        """
+        Count finished game
+        :param score: - final score of the game
+        """
+        self.games += 1
+        self.streak = 0
+        if score > self.best_score:
+            self.best_score = score
+
+    def _ratio(self, count: int) -> float:
+        return count / self.rounds if self.rounds else 0.0
+
+    @property
+    def win_ratio(self) -> float:
+        return self._ratio(self.wins)
+
+    @property
+    def draw_ratio(self) -> float:
+        return self._ratio(self.draws)
+
+    @property
+    def loss_ratio(self) -> float:
+        return self._ratio(self.losses)
+
+    @property
+    def favourite_attack(self) -> Optional[str]:
+        """
+        Most used attack, None if player has not attacked yet
+        """
+        count = max(self.attacks)
+        return PROFILE_ATTACKS[self.attacks.index(count)] if count else None
+
+    def as_row(self) -> list[int]:
+        """
+        Compact representation to save
+        """
+        return [self.games, self.rounds, self.wins, self.draws, self.losses, *self.attacks, self.best_streak,
+                self.best_score]
+
+    @classmethod
+    def from_row(cls, name: str, row: list[int]) -> "PlayerProfile":
+        profile = cls(name)
+        profile.games, profile.rounds, profile.wins, profile.draws, profile.losses = row[:5]
+        attacks_end = 5 + len(PROFILE_ATTACKS)
+        profile.attacks = list(row[5:attacks_end])
+        profile.best_streak, profile.best_score = row[attacks_end:]
+        return profile
+
+
+class ProfileAggregator:
+    """
+    Profiles of all players indexed by name
+    """
+    profiles: dict[str, PlayerProfile]
+
+    def __init__(self) -> None:
+        self.profiles = {}
+
+    def get(self, name: str) -> Optional[PlayerProfile]:
+        """
+        Profile of the player, None if player is unknown
+        """
+        return self.profiles.get(name)
+
+    def _profile(self, name: str) -> PlayerProfile:
+        profile = self.profiles.get(name)
+        if profile is None:
+            profile = self.profiles[name] = PlayerProfile(name)
+        return profile
+
+    def on_fight(self, name: str, fight_result: int, attack: Optional[str] = None) -> None:
+        """
+        Count round of the player
+        """
+        validate_fight_result(fight_result)
+        self._profile(name).on_fight(fight_result, attack)
+
+    def on_game_over(self, name: str, score: int) -> None:
+        """
+        Count finished game of the player
+        """
+        self._profile(name).on_game_over(score)
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Save all profiles to the file
+        :param path: - profiles file, project profiles file by default
+        """
+        rows = {name: profile.as_row() for name, profile in self.profiles.items()}
+        with open(path or get_profiles_file_path(), 'w') as file:
+            json.dump(rows, file, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "ProfileAggregator":
+        """
+        Load profiles from the file, empty aggregator if there is no file
+        :param path: - profiles file, project profiles file by default
+        """
+        aggregator = cls()
+        try:
+            with open(path or get_profiles_file_path()) as file:
+                rows = json.load(file)
+        except FileNotFoundError:
+            return aggregator
+        for name, row in rows.items():
+            aggregator.profiles[name] = PlayerProfile.from_row(name, row)
+        return aggregator
+
@@ -0,0 +1,341 @@
+""" Player versus player games over the network """
+import asyncio
+import json
+from collections import deque
+from typing import NamedTuple, Optional
+
+from settings import ALLOWED_ATTACKS, ATTACK_PAIRS_OUTCOME, WIN, LOSE, LEADERBOARD_HOST, PVP_PORT, PVP_SCORE_WINDOW
+from source.events import EventBus, GameOverEvent
+from source.exceptions import WhiteSpaceInputError, EmptyInputError, IncorrectModeError, RecordInRecordsError, \
+    IncorrectInputTypeError
+from source.models import Player
+from source.modes import mode_profile
+from source.name_index import NameIndex
+from source.record import PlayerRecord
+from source.score_store import ShardedScoreStore, default_score_store
+from source.validations import validate_name, validate_mode, is_valid_input_attack
+
+
+class PvpResult(NamedTuple):
+    """
+    Outcome of one round for the first player and the state after it
+    """
+    fight_result: int
+    first_lives: int
+    second_lives: int
+    first_score: int
+    second_score: int
+    finished: bool
+
+
+class PvpBattle:
+    """
+    Battle of two players with the rules of the game against the enemy:
+    both players start with the lives of the mode, the winner of a round gets the fight points,
+    the loser loses a life, and the player who takes the last life gets the killing points.
+    """
+    __slots__ = ('first', 'second', 'mode', 'points_for_fight', 'points_for_killing')
+    first: Player
+    second: Player
+    mode: str
+    points_for_fight: int
+    points_for_killing: int
+
+    def __init__(self, first: Player, second: Player, mode: str) -> None:
+        profile = mode_profile(mode)
+        first.lives = second.lives = profile.player_lives
+        self.first = first
+        self.second = second
+        self.mode = mode
+        self.points_for_fight = profile.fight_points
+        self.points_for_killing = profile.killing_points
+
+    def play_round(self, first_attack: str, second_attack: str) -> PvpResult:
+        """
+        Resolves the attacks of both players
+        """
+        fight_result = ATTACK_PAIRS_OUTCOME[(first_attack, second_attack)]
+        finished = False
+        if fight_result != 0:
+            winner, loser = (self.first, self.second) if fight_result == WIN else (self.second, self.first)
+            winner.score += self.points_for_fight
+            if loser.lose_fight():
+                winner.score += self.points_for_killing
+                finished = True
+        return PvpResult(fight_result, self.first.lives, self.second.lives, self.first.score, self.second.score,
+                         finished)
+
+
+class Ticket:
+    """
+    Player waiting for an opponent
+    """
+    __slots__ = ('name', 'mode', 'rating', 'opponent', 'cancelled')
+
+    def __init__(self, name: str, mode: str, rating: int = 0) -> None:
+        """
+        Initialize the ticket
+        :param rating: - best score of the player in the mode
+        """
+        self.name = name
+        self.mode = mode
+        self.rating = rating
+        self.opponent: Optional["Ticket"] = None
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """
+        Leave the queue, the ticket is skipped when it is reached
+        """
+        self.cancelled = True
+
+
+class Matchmaker:
+    """
+    Pairs waiting players of the same mode.
+    Players are queued in buckets of score_window points, so an arrival looks at the oldest
+    players of three buckets only and pairs in constant time however long the queue is.
+    """
+
+    def __init__(self, score_window: Optional[int] = PVP_SCORE_WINDOW) -> None:
+        """
+        Initialize the matchmaker
+        :param score_window: - max difference of the best scores of paired players, any scores if not set
+        """
+        self.score_window = score_window
+        self._buckets: dict[tuple[str, int], deque[Ticket]] = {}
+        self.waiting = 0
+
+    def _bucket(self, rating: int) -> int:
+        return 0 if self.score_window is None else rating // (self.score_window + 1)
+
+    def join(self, ticket: Ticket) -> Optional[Ticket]:
+        """
+        Pair the ticket with the oldest suitable waiting player or queue it
+        :return: the opponent, None if the ticket was queued
+        """
+        bucket = self._bucket(ticket.rating)
+        candidates = (bucket,) if self.score_window is None else (bucket, bucket - 1, bucket + 1)
+        for key in candidates:
+            queue = self._buckets.get((ticket.mode, key))
+            if not queue:
+                continue
+            while queue and queue[0].cancelled:
+                queue.popleft()
+                self.waiting -= 1
+            if queue and (self.score_window is None or abs(queue[0].rating - ticket.rating) <= self.score_window):
+                opponent = queue.popleft()
+                self.waiting -= 1
+                opponent.opponent, ticket.opponent = ticket, opponent
+                return opponent
+        self._buckets.setdefault((ticket.mode, bucket), deque()).append(ticket)
+        self.waiting += 1
+        return None
+
+
+class PvpServer:
+    """
+    TCP server of player versus player games, every message is a JSON line.
+    A client sends {"name": ..., "mode": ...}, waits for {"type": "matched", ...}
+    and then sends {"attack": "1" | "2" | "3"} every round until {"type": "game_over", ...}.
+    An incorrect attack is answered with {"type": "error", ...} and read again, "0" leaves the game.
+    A player who disconnects while queued leaves the queue.
+    """
+
+    def __init__(self, store: Optional[ShardedScoreStore] = None, host: str = LEADERBOARD_HOST,
+                 port: int = PVP_PORT, score_window: Optional[int] = PVP_SCORE_WINDOW,
+                 events: Optional[EventBus] = None) -> None:
+        """
+        Initialize the server
+        :param store: - score store for ratings and results, default_score_store() if not set
+        :param host: - host to listen on
+        :param port: - port to listen on, 0 for any free port
+        :param score_window: - max difference of the best scores of paired players, any scores if not set
+        :param events: - receives game over events of both players if set
+        """
+        self.store = store or default_score_store()
+        self.ratings: Optional[NameIndex] = None
+        self.host = host
+        self.port = port
+        self.matchmaker = Matchmaker(score_window)
+        self.events = events
+        self._waiting: dict[Ticket, tuple[asyncio.StreamReader, asyncio.StreamWriter, asyncio.Future,
+                                          asyncio.Future]] = {}
+
+    def rating(self, name: str, mode: str) -> int:
+        """
+        Best score of the player in the mode, the index of the store is read once and updated with the results
+        """
+        if self.ratings is None:
+            self.ratings = NameIndex(self.store.iter_top_rows())
+        return self.ratings.best.get(name, {}).get(mode, 0)
+
+    async def start(self) -> asyncio.AbstractServer:
+        """
+        Start listening, the bound port is saved to port
+        """
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+
+    async def serve(self) -> None:
+        """
+        Serve until cancelled
+        """
+        server = await self.start()
+        async with server:
+            await server.serve_forever()
+
+    def serve_forever(self) -> None:
+        """
+        Run the server in a new event loop
+        """
+        asyncio.run(self.serve())
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Queue the connected player and play the game when it is matched
+        """
+        try:
+            ticket = await self._hello(reader, writer)
+            if ticket is None:
+                return
+            opponent = self.matchmaker.join(ticket)
+            if opponent is None:
+                await self._wait(ticket, reader, writer)
+                return
+            opponent_reader, opponent_writer, finished, first_line = self._waiting[opponent]
+            try:
+                await self._play(opponent, ticket, opponent_reader, opponent_writer, reader, writer, first_line)
+            finally:
+                if not finished.done():
+                    finished.set_result(None)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _wait(self, ticket: Ticket, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Wait until the game of the queued player ends. The first line of the player is read while waiting,
+        so the ticket is cancelled as soon as the player disconnects or sends before being matched.
+        """
+        finished = asyncio.get_running_loop().create_future()
+        first_line = asyncio.ensure_future(reader.readline())
+        self._waiting[ticket] = (reader, writer, finished, first_line)
+        try:
+            await asyncio.wait((finished, first_line), return_when=asyncio.FIRST_COMPLETED)
+            if ticket.opponent is None:
+                if first_line.result():
+                    await self._send(writer, {'type': 'error', 'message': 'Wait for the opponent.'})
+                return
+            await finished
+        finally:
+            del self._waiting[ticket]
+            ticket.cancel()
+            first_line.cancel()
+
+    async def _hello(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Optional[Ticket]:
+        try:
+            hello = json.loads(await reader.readline())
+            name, mode = hello['name'], hello['mode']
+            if not isinstance(name, str):
+                raise IncorrectInputTypeError
+            validate_name(name)
+            validate_mode(mode)
+        except (ValueError, KeyError, TypeError, IncorrectInputTypeError, WhiteSpaceInputError, EmptyInputError,
+                IncorrectModeError):
+            await self._send(writer, {'type': 'error', 'message': 'Expected {"name": ..., "mode": ...}.'})
+            return None
+        ticket = Ticket(name, mode, self.rating(name, mode))
+        await self._send(writer, {'type': 'queued', 'rating': ticket.rating})
+        return ticket
+
+    async def _play(self, first: Ticket, second: Ticket, first_reader: asyncio.StreamReader,
+                    first_writer: asyncio.StreamWriter, second_reader: asyncio.StreamReader,
+                    second_writer: asyncio.StreamWriter, first_line: Optional[asyncio.Future] = None) -> None:
+        battle = PvpBattle(Player(first.name), Player(second.name), first.mode)
+        await asyncio.gather(
+            self._send(first_writer, {'type': 'matched', 'opponent': second.name, 'mode': first.mode}),
+            self._send(second_writer, {'type': 'matched', 'opponent': first.name, 'mode': first.mode}))
+        try:
+            while True:
+                first_attack, second_attack = await asyncio.gather(
+                    self._attack(first_reader, first_writer, first_line), self._attack(second_reader, second_writer))
+                first_line = None
+                if first_attack is None or second_attack is None:
+                    message = {'type': 'game_over', 'winner': None}
+                    await asyncio.gather(self._send(first_writer, message), self._send(second_writer, message))
+                    return
+                result = battle.play_round(first_attack, second_attack)
+                await asyncio.gather(
+                    self._send(first_writer, self._round(result.fight_result, first_attack, second_attack,
+                                                         result.first_lives, result.second_lives,
+                                                         result.first_score)),
+                    self._send(second_writer, self._round(-result.fight_result, second_attack, first_attack,
+                                                          result.second_lives, result.first_lives,
+                                                          result.second_score)))
+                if result.finished:
+                    winner = battle.first if result.first_lives else battle.second
+                    message = {'type': 'game_over', 'winner': winner.name}
+                    await asyncio.gather(self._send(first_writer, message), self._send(second_writer, message))
+                    return
+        finally:
+            await self._save(battle)
+
+    @staticmethod
+    def _round(fight_result: int, attack: str, opponent_attack: str, lives: int, opponent_lives: int,
+               score: int) -> dict:
+        return {'type': 'round', 'result': {WIN: 'win', LOSE: 'lose'}.get(fight_result, 'draw'), 'attack': attack,
+                'opponent_attack': opponent_attack, 'lives': lives, 'opponent_lives': opponent_lives,
+                'score': score}
+
+    async def _attack(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                      first_line: Optional[asyncio.Future] = None) -> Optional[str]:
+        """
+        Next attack of the player, incorrect input is answered with an error and read again
+        :param first_line: - line already being read from the player, read from the reader if not set
+        :return: the attack, None if the player left or quit
+        """
+        while True:
+            line = await (reader.readline() if first_line is None else first_line)
+            first_line = None
+            if not line:
+                return None
+            try:
+                attack_input = str(json.loads(line)['attack'])
+            except (ValueError, KeyError, TypeError):
+                attack_input = None
+            if attack_input == '0':
+                return None
+            if attack_input is not None and is_valid_input_attack(attack_input):
+                return ALLOWED_ATTACKS[attack_input]
+            await self._send(writer, {'type': 'error', 'message': 'Incorrect input.'})
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, message: dict) -> None:
+        writer.write(json.dumps(message).encode() + b'\n')
+        await writer.drain()
+
+    async def _save(self, battle: PvpBattle) -> None:
+        """
+        Update the ratings and save the scores of both players on the default executor,
+        the event loop keeps serving other games while the store writes
+        """
+        players = (battle.first, battle.second)
+        records = [PlayerRecord.from_player(player, battle.mode) for player in players if player.score]
+        if self.ratings is not None:
+            for record in records:
+                self.ratings.add(record.name, record.mode, record.score)
+        if records:
+            await asyncio.get_running_loop().run_in_executor(None, self._save_records, records)
+        if self.events is not None:
+            for player in players:
+                self.events.emit(GameOverEvent(player.name, battle.mode, player.score))
+
+    def _save_records(self, records: list[PlayerRecord]) -> None:
+        for record in records:
+            try:
+                self.store.save_record(record)
+            except RecordInRecordsError:
+                pass
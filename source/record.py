@@ -1,3 +1,6 @@
+import os
+from typing import Iterator, Optional
+
 from source.exceptions import RecordInRecordsError
 from source.models import Player
 from settings import SCORE_FILE, MAX_RECORDS_NUMBER, NAME_ADDITIONAL_SPACES, ROOT_DIR
@@ -13,6 +16,17 @@ def record_file_title_row(name_column_size: int = 0) -> str:
     return f'{"NAME".ljust(name_column_size)}{"MODE".ljust(10)}SCORE\n'
 
 
+def record_file_row(name: str, mode: str, score: int, name_column_size: int) -> str:
+    """
+    Create one row of a score file
+    :param name: - name of the player
+    :param mode: - mode of the game
+    :param score: - score of the player
+    :param name_column_size: - size of the column for name, already validated
+    """
+    return f'{name.ljust(name_column_size)}{mode.ljust(10)}{score}\n'
+
+
 def get_score_file_path() -> str:
     """
     Get score file path
@@ -20,6 +34,36 @@ def get_score_file_path() -> str:
     return f'{ROOT_DIR}/{SCORE_FILE}'
 
 
+def score_file_stamp(path: Optional[str] = None, file_stat: Optional[os.stat_result] = None) -> Optional[tuple]:
+    """
+    Version stamp of the score file, changed by every rewrite of any process
+    :param path: - path to the score file, current score file if not set
+    :param file_stat: - stat of the file if already known
+    :return: - None if there is no file
+    """
+    path = path or get_score_file_path()
+    try:
+        file_stat = file_stat or os.stat(path)
+    except FileNotFoundError:
+        return None
+    return path, file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size
+
+
+def iter_score_file_rows(path: Optional[str] = None) -> Iterator[tuple[str, str, int]]:
+    """
+    Stream (name, mode, score) rows of the score file, nothing if there is no file
+    :param path: - path to the score file, current score file if not set
+    """
+    try:
+        with open(path or get_score_file_path(), 'r') as file:
+            next(file, None)  # skip table title
+            for line in file:
+                name, mode, score = line.split()
+                yield name, mode, int(score)
+    except FileNotFoundError:
+        return
+
+
 class PlayerRecord:
     """
     Class for one player record in score table
@@ -68,7 +112,13 @@ class PlayerRecord:
         :param name_column_size: - size of the column for name
         """
         name_column_size = validated_score_row_size(name_column_size)
-        return f'{self.name.ljust(name_column_size)}{self.mode.ljust(10)}{self.score}\n'
+        return record_file_row(self.name, self.mode, self.score, name_column_size)
+
+    def as_row(self) -> tuple[str, str, int]:
+        """
+        Record as a (name, mode, score) row
+        """
+        return self.name, self.mode, self.score
 
     @classmethod
     def from_player(cls, player: Player, mode: str) -> "PlayerRecord":
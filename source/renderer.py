@@ -0,0 +1,149 @@
+""" Renderers of the game output """
+import shutil
+import sys
+from typing import NamedTuple, Optional, TextIO
+
+
+class Status(NamedTuple):
+    """
+    Fields of the game status line
+    """
+    name: str
+    mode: str
+    lives: int
+    score: int
+    level: int
+    enemy_lives: int
+
+
+def format_status(status: Status) -> str:
+    """
+    Text of the game status line
+    """
+    return (f"\nPlayer: {status.name}."
+            f"\tMode: {status.mode}."
+            f"\tPlayer Lives: {status.lives}."
+            f"\tScore: {status.score}."
+            f"\tLevel: {status.level}"
+            f"\tEnemy's lives: {status.enemy_lives}")
+
+
+class LineRenderer:
+    """
+    Writes every line at once, like print
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        """
+        Initialize the renderer
+        :param stream: - output stream, current sys.stdout if not set
+        """
+        self._stream = stream
+
+    @property
+    def stream(self) -> TextIO:
+        return self._stream or sys.stdout
+
+    def line(self, text: str = '') -> None:
+        """
+        Output one line
+        """
+        print(text, file=self.stream)
+
+    def status(self, status: Status) -> None:
+        """
+        Output the game status
+        """
+        self.line(format_status(status))
+
+    def prompt(self, text: str) -> str:
+        """
+        Show text and read user input
+        """
+        self.flush()
+        return input(text)
+
+    def flush(self) -> None:
+        """
+        Write buffered output
+        """
+
+
+class FrameRenderer(LineRenderer):
+    """
+    Collects output of a round into one frame and writes it with one call before asking for input
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        super().__init__(stream)
+        self.frame = []
+
+    def line(self, text: str = '') -> None:
+        self.frame.append(text)
+        self.frame.append('\n')
+
+    def prompt(self, text: str) -> str:
+        self.frame.append(text)
+        self.flush()
+        return input()
+
+    def flush(self) -> None:
+        if self.frame:
+            stream = self.stream
+            stream.write(''.join(self.frame))
+            stream.flush()
+            self.frame.clear()
+
+
+class AnsiRenderer(FrameRenderer):
+    """
+    Frame renderer keeping the status in the first terminal row.
+    Only changed status fields are redrawn, the rest of the output scrolls below.
+    Every field is clipped to FIELD_WIDTH, a longer value ends with an ellipsis.
+    """
+    FIELD_WIDTH = 16
+    LABELS = ('Player', 'Mode', 'Lives', 'Score', 'Level', 'Enemy')
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        super().__init__(stream)
+        self.shown: Optional[Status] = None
+
+    def _column(self, index: int) -> int:
+        return index * self.FIELD_WIDTH + len(self.LABELS[index]) + 3
+
+    def _value(self, index: int, value) -> str:
+        """
+        Value of the field padded to its width, one column is kept free before the next field
+        :param index: - index of the field
+        :param value: - value of the field
+        """
+        width = self.FIELD_WIDTH - len(self.LABELS[index]) - 2
+        text = str(value)
+        if len(text) >= width:
+            text = text[:width - 2] + '\u2026'
+        return text.ljust(width)
+
+    def status(self, status: Status) -> None:
+        if self.shown is None:
+            rows = shutil.get_terminal_size().lines
+            self.frame.append('\033[2J\033[1;1H')
+            for index, label in enumerate(self.LABELS):
+                self.frame.append(f'{label}: {self._value(index, status[index])}')
+            self.frame.append(f'\033[2;{rows}r\033[2;1H')
+        else:
+            changed = [index for index, value in enumerate(status) if value != self.shown[index]]
+            if changed:
+                self.frame.append('\0337')
+                for index in changed:
+                    self.frame.append(f'\033[1;{self._column(index)}H{self._value(index, status[index])}')
+                self.frame.append('\0338')
+        self.shown = status
+
+    def reset(self) -> None:
+        """
+        Give the whole terminal back
+        """
+        if self.shown is not None:
+            self.frame.append('\033[r')
+            self.shown = None
+        self.flush()
@@ -0,0 +1,34 @@
+""" Input schema compiled once from settings and input assets """
+from typing import NamedTuple
+
+from settings import MAIN_MENU_OPTIONS, SCORE_MENU_OPTIONS, ALLOWED_ATTACKS, ATTACK_PAIRS_OUTCOME
+from source.exceptions import InputSchemaError
+from source.input_generator import load_input_options
+from source.modes import MODE_REGISTRY
+
+
+class InputSchema(NamedTuple):
+    """
+    Compiled options of one input
+    """
+    options: frozenset[str]
+    values: dict[str, str]
+
+
+def compile_input_schema(type_of_input: str, settings_options: dict[str, str]) -> InputSchema:
+    """
+    Compile options of the input, the asset shown to the user must offer the same options as settings
+    :param type_of_input: - main menu, mode or attack
+    :param settings_options: - dict of the options from settings
+    """
+    if load_input_options(type_of_input).keys() != settings_options.keys():
+        raise InputSchemaError(type_of_input)
+    return InputSchema(frozenset(settings_options), dict(settings_options))
+
+
+MODE_SCHEMA = compile_input_schema('mode', MODE_REGISTRY.options)
+MENU_SCHEMA = compile_input_schema('main_menu', MAIN_MENU_OPTIONS)
+SCORE_MENU_SCHEMA = compile_input_schema('score_menu', SCORE_MENU_OPTIONS)
+ATTACK_SCHEMA = compile_input_schema('attacks', ALLOWED_ATTACKS)
+MODE_NAMES = MODE_REGISTRY.names
+FIGHT_RESULTS = frozenset(ATTACK_PAIRS_OUTCOME.values())
@@ -0,0 +1,240 @@
+""" Streaming import and export of scores """
+import csv
+import heapq
+import json
+import os
+import struct
+import sys
+from array import array
+from collections import defaultdict
+from itertools import islice, compress, repeat
+from operator import itemgetter
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from settings import SCORE_CSV_FORMAT, SCORE_JSONL_FORMAT, SCORE_NPY_FORMAT, SCORE_FIELDS, SCORE_IO_CHUNK_SIZE, \
+    SCORE_IMPORT_WRITER
+from source.exceptions import IncorrectFileFormatError, IncorrectScoreError
+from source.score_mmap import write_binary_scores
+from source.record import get_score_file_path
+from source.score_store import ShardedScoreStore, Row, default_score_store
+from source.validations import validate_record_rows
+
+SCORE_FORMATS = (SCORE_CSV_FORMAT, SCORE_JSONL_FORMAT)
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+
+_NAME, _MODE, _SCORE = itemgetter(0), itemgetter(1), itemgetter(2)
+_JSON_FIELDS = itemgetter(*SCORE_FIELDS)
+
+
+class ImportResult(NamedTuple):
+    """
+    Rows read from the file, rows new to the store and skipped duplicates.
+    A store keeping only the best records keeps only the best of the new rows.
+    """
+    rows: int
+    imported: int
+    duplicates: int
+
+
+def score_file_format(path: str) -> str:
+    """
+    Format of the score file by its extension
+    :param path: - path to the file
+    """
+    file_format = os.path.splitext(path)[1]
+    if file_format not in SCORE_FORMATS:
+        raise IncorrectFileFormatError(file_format)
+    return file_format
+
+
+def _rows_from_columns(names: Iterable[str], modes: Iterable[str], scores: Iterable[str]) -> list[Row]:
+    try:
+        return list(zip(names, modes, map(int, scores)))
+    except ValueError:
+        raise IncorrectScoreError
+
+
+def _csv_rows(lines: list[str]) -> list[Row]:
+    """
+    Rows of CSV lines, blank lines are skipped.
+    Lines without quoting and with three fields each are split as one string, the others go through the csv module.
+    """
+    lines = list(filter(str.strip, lines))
+    if not lines:
+        return []
+    text = ''.join(lines)
+    separators = len(SCORE_FIELDS) - 1
+    if '"' not in text and text.count(',') == separators * len(lines) \
+            and min(map(str.count, lines, repeat(','))) == separators:
+        if '\r' in text:
+            text = text.replace('\r\n', '\n')
+        fields = text.replace('\n', ',').split(',')
+        if not fields[-1]:
+            fields.pop()
+        return _rows_from_columns(fields[0::3], fields[1::3], fields[2::3])
+    rows = list(csv.reader(lines))
+    if set(map(len, rows)) != {len(SCORE_FIELDS)}:
+        raise IncorrectFileFormatError(SCORE_CSV_FORMAT)
+    return _rows_from_columns(map(_NAME, rows), map(_MODE, rows), map(_SCORE, rows))
+
+
+def _jsonl_rows(lines: list[str]) -> list[Row]:
+    """
+    Rows of JSON Lines, the whole chunk is parsed as one JSON array.
+    Names and modes must be strings and scores integers, a float score is not cut to an integer.
+    """
+    objects = json.loads(f"[{','.join(filter(str.strip, lines))}]")
+    try:
+        rows = list(map(_JSON_FIELDS, objects))
+    except (KeyError, TypeError):
+        raise IncorrectFileFormatError(SCORE_JSONL_FORMAT)
+    if not {str}.issuperset(map(type, map(_NAME, rows))) or not {str}.issuperset(map(type, map(_MODE, rows))):
+        raise IncorrectFileFormatError(SCORE_JSONL_FORMAT)
+    if not {int}.issuperset(map(type, map(_SCORE, rows))):
+        raise IncorrectScoreError
+    return rows
+
+
+def read_rows(path: str, chunk_size: int = SCORE_IO_CHUNK_SIZE) -> Iterator[list[Row]]:
+    """
+    Stream (name, mode, score) rows of a CSV or JSON Lines file by chunks
+    :param path: - path to the file
+    :param chunk_size: - lines in one chunk
+    """
+    file_format = score_file_format(path)
+    parse = _csv_rows if file_format == SCORE_CSV_FORMAT else _jsonl_rows
+    with open(path, 'r', newline='') as file:
+        if file_format == SCORE_CSV_FORMAT:
+            next(file, None)  # skip header
+        while lines := list(islice(file, chunk_size)):
+            yield parse(lines)
+
+
+def write_rows(path: str, rows: Iterable[Row], chunk_size: int = SCORE_IO_CHUNK_SIZE) -> int:
+    """
+    Write (name, mode, score) rows to a CSV or JSON Lines file by chunks
+    :param path: - path to the file
+    :param rows: - rows to write
+    :param chunk_size: - rows in one write
+    :return: number of written rows
+    """
+    file_format = score_file_format(path)
+    rows = iter(rows)
+    written = 0
+    with open(path, 'w', newline='') as file:
+        if file_format == SCORE_CSV_FORMAT:
+            writer = csv.writer(file)
+            writer.writerow(SCORE_FIELDS)
+        while chunk := list(islice(rows, chunk_size)):
+            if file_format == SCORE_CSV_FORMAT:
+                writer.writerows(chunk)
+            else:
+                file.write(''.join(json.dumps(dict(zip(SCORE_FIELDS, row))) + '\n' for row in chunk))
+            written += len(chunk)
+    return written
+
+
+def import_scores(path: str, store: Optional[ShardedScoreStore] = None,
+                  chunk_size: int = SCORE_IO_CHUNK_SIZE) -> ImportResult:
+    """
+    Import scores from a CSV or JSON Lines file into the writer's shards of the store.
+    Rows already in the store or repeated in the file are skipped.
+    :param path: - path to the file
+    :param store: - score store, import_score_store() if not set
+    :param chunk_size: - rows validated and deduplicated at once
+    """
+    store = store or import_score_store()
+    seen = set(store.iter_top_rows())
+    new_rows = defaultdict(list)
+    total = imported = 0
+    for chunk in read_rows(path, chunk_size):
+        validate_record_rows(chunk, chunk_size)
+        total += len(chunk)
+        fresh = dict.fromkeys(chunk)
+        for row in seen.intersection(fresh):
+            del fresh[row]
+        seen.update(fresh)
+        imported += len(fresh)
+        modes = set(map(_MODE, fresh))
+        for mode in modes:
+            rows = new_rows[mode]
+            rows.extend(fresh if len(modes) == 1 else compress(fresh, map(mode.__eq__, map(_MODE, fresh))))
+            if store.max_records is not None and len(rows) > store.max_records:
+                rows[:] = heapq.nlargest(store.max_records, rows, key=_SCORE)
+    for mode, rows in new_rows.items():
+        store.merge_rows(mode, rows)
+    return ImportResult(total, imported, total - imported)
+
+
+def import_score_store() -> ShardedScoreStore:
+    """
+    Store keeping all imported scores in shards of an import writer of this process,
+    games never rewrite these shards, so imported rows are not cut to the best records
+    """
+    return ShardedScoreStore(writer=f'{SCORE_IMPORT_WRITER}{os.getpid()}', max_records=None,
+                             score_file=get_score_file_path())
+
+
+def export_scores(path: str, store: Optional[ShardedScoreStore] = None, mode: Optional[str] = None) -> int:
+    """
+    Export scores of the store from the best to the worst to a CSV or JSON Lines file
+    :param path: - path to the file
+    :param store: - score store, default_score_store() with the score file of earlier versions if not set
+    :param mode: - only this mode if set
+    :return: number of exported rows
+    """
+    store = store or default_score_store()
+    return write_rows(path, store.iter_top_rows(mode))
+
+
+def export_binary(path: str, store: Optional[ShardedScoreStore] = None) -> None:
+    """
+    Export scores of the store to the binary score file read with BinaryScoreFile
+    :param path: - path to the file
+    :param store: - score store, default_score_store() with the score file of earlier versions if not set
+    """
+    store = store or default_score_store()
+    write_binary_scores(path, store.iter_top_rows())
+
+
+def npy_bytes(descr: str, length: int, data: bytes) -> bytes:
+    """
+    Content of a one-dimensional .npy file (format version 1.0)
+    :param descr: - numpy dtype string of the array
+    :param length: - number of items
+    :param data: - raw little-endian items
+    """
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({length},), }}"
+    padding = -(len(NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header = header + ' ' * padding + '\n'
+    return NPY_MAGIC + struct.pack('<H', len(header)) + header.encode('latin1') + data
+
+
+def export_npy(directory: str, store: Optional[ShardedScoreStore] = None) -> list[str]:
+    """
+    Export scores of every mode as columns: {mode}.names.npy (unicode) and {mode}.scores.npy (int64).
+    Files are written without numpy and are loaded with numpy.load.
+    :param directory: - directory for the files
+    :param store: - score store, default_score_store() with the score file of earlier versions if not set
+    :return: paths of the written files
+    """
+    store = store or default_score_store()
+    columns = defaultdict(lambda: ([], array('q')))
+    for name, mode, score in store.iter_top_rows():
+        names, scores = columns[mode]
+        names.append(name)
+        scores.append(score)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for mode, (names, scores) in columns.items():
+        if sys.byteorder != 'little':
+            scores.byteswap()
+        width = max(map(len, names))
+        names_data = ''.join(name.ljust(width, '\0') for name in names).encode('utf-32-le')
+        for column, content in (('names', npy_bytes(f'<U{width}', len(names), names_data)),
+                                ('scores', npy_bytes('<i8', len(scores), scores.tobytes()))):
+            path = f'{directory}/{mode}.{column}{SCORE_NPY_FORMAT}'
+            with open(path, 'wb') as file:
+                file.write(content)
+            paths.append(path)
+    return paths
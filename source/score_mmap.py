@@ -0,0 +1,211 @@
+""" Fixed-width binary score file read through mmap.
+
+Layout, little-endian:
+    header: magic, version, number of modes
+    one section entry per mode: mode name, offset, number of records
+    sections: scores column (int64, from the best to the worst), then names column (fixed-width utf-8)
+Top-N of a mode reads only the first N items of its two columns.
+"""
+import heapq
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import islice
+from operator import itemgetter
+from typing import Iterable, Iterator, Optional
+
+from settings import ROOT_DIR, SCORE_BINARY_FILE, SCORE_BINARY_NAME_SIZE, MAX_RECORDS_NUMBER, SCORE_IO_CHUNK_SIZE, \
+    MODE_NAME_MAX_SIZE
+from source.exceptions import IncorrectScoreFileError, IncorrectModeError
+from source.score_store import Row
+
+MAGIC = b'PSSB'
+VERSION = 1
+HEADER = struct.Struct('<4sHH')
+SECTION = struct.Struct(f'<{MODE_NAME_MAX_SIZE}sQQ')
+SCORE_SIZE = 8
+
+_SCORE = itemgetter(2)
+
+
+def get_binary_score_file_path() -> str:
+    """
+    Get binary score file path
+    """
+    return f'{ROOT_DIR}/{SCORE_BINARY_FILE}'
+
+
+def _encode_names(names: Iterable[str]) -> Iterator[bytes]:
+    for name in names:
+        encoded = name.encode()
+        if len(encoded) > SCORE_BINARY_NAME_SIZE:
+            # cut on a character boundary, so the name stays valid utf-8
+            encoded = encoded[:SCORE_BINARY_NAME_SIZE].decode(errors='ignore').encode()
+        yield encoded.ljust(SCORE_BINARY_NAME_SIZE, b'\0')
+
+
+def write_score_columns(path: str, columns: dict[str, tuple[Iterable[str], array]]) -> None:
+    """
+    Write the binary score file from columns.
+    File is replaced at once, so readers keep their mapping of the previous version.
+    Names longer than the name column are cut to fit it.
+    :param path: - path to the file
+    :param columns: - mode to (names, scores), scores are int64 ('q') sorted from the best to the worst
+    """
+    header_size = HEADER.size + SECTION.size * len(columns)
+    offset = header_size + -header_size % SCORE_SIZE
+    sections = []
+    for mode, (_, scores) in columns.items():
+        sections.append(SECTION.pack(mode.encode(), offset, len(scores)))
+        offset += len(scores) * (SCORE_SIZE + SCORE_BINARY_NAME_SIZE)
+        offset += -offset % SCORE_SIZE
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(columns)) + b''.join(sections))
+            for names, scores in columns.values():
+                file.write(b'\0' * (-file.tell() % SCORE_SIZE))
+                if sys.byteorder != 'little':
+                    scores = array('q', scores)
+                    scores.byteswap()
+                file.write(scores.tobytes())
+                encoded = _encode_names(names)
+                while chunk := b''.join(islice(encoded, SCORE_IO_CHUNK_SIZE)):
+                    file.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_binary_scores(path: str, rows: Iterable[Row]) -> None:
+    """
+    Write (name, mode, score) rows to the binary score file
+    :param path: - path to the file
+    :param rows: - rows in any order
+    """
+    by_mode = {}
+    for row in rows:
+        by_mode.setdefault(row[1], []).append(row)
+    columns = {}
+    for mode, mode_rows in by_mode.items():
+        mode_rows.sort(key=_SCORE, reverse=True)
+        columns[mode] = ([row[0] for row in mode_rows], array('q', map(_SCORE, mode_rows)))
+    write_score_columns(path, columns)
+
+
+class BinaryScoreFile:
+    """
+    Read-only view of the binary score file.
+    The file is mapped, not read: processes share its pages in the page cache
+    and a query decodes only the records it returns.
+    """
+    path: str
+    sections: dict[str, tuple[int, int]]
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        Map the file
+        :param path: - path to the file, project binary score file by default
+        """
+        self.path = path or get_binary_score_file_path()
+        with open(self.path, 'rb') as file:
+            try:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise IncorrectScoreFileError(self.path)
+        self._view = memoryview(self._mmap)
+        magic, version, modes = HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise IncorrectScoreFileError(self.path)
+        self.sections = {}
+        for index in range(modes):
+            mode, offset, count = SECTION.unpack_from(self._view, HEADER.size + index * SECTION.size)
+            self.sections[mode.rstrip(b'\0').decode()] = (offset, count)
+
+    def _section(self, mode: str) -> tuple[int, int]:
+        try:
+            return self.sections[mode]
+        except KeyError:
+            raise IncorrectModeError
+
+    def count(self, mode: str) -> int:
+        """
+        Number of records of the mode
+        """
+        return self._section(mode)[1]
+
+    def scores(self, mode: str) -> memoryview:
+        """
+        Scores of the mode from the best to the worst, without copying.
+        Release the view before close().
+        """
+        offset, count = self._section(mode)
+        scores = self._view[offset:offset + count * SCORE_SIZE].cast('q')
+        if sys.byteorder != 'little':
+            swapped = array('q', scores)
+            swapped.byteswap()
+            return memoryview(swapped)
+        return scores
+
+    def names(self, mode: str) -> memoryview:
+        """
+        Fixed-width utf-8 names of the mode in the order of scores, without copying.
+        Release the view before close().
+        """
+        offset, count = self._section(mode)
+        offset += count * SCORE_SIZE
+        return self._view[offset:offset + count * SCORE_BINARY_NAME_SIZE]
+
+    def iter_rows(self, mode: str) -> Iterator[Row]:
+        """
+        Stream (name, mode, score) rows of the mode from the best to the worst
+        """
+        scores = self.scores(mode)
+        names = self.names(mode)
+        for index, score in enumerate(scores):
+            start = index * SCORE_BINARY_NAME_SIZE
+            name = bytes(names[start:start + SCORE_BINARY_NAME_SIZE]).rstrip(b'\0').decode()
+            yield name, mode, score
+
+    def top(self, n: int = MAX_RECORDS_NUMBER, mode: Optional[str] = None) -> list[Row]:
+        """
+        Best n rows, decoding only the rows returned
+        :param n: - number of rows
+        :param mode: - only this mode if set
+        """
+        modes = [mode] if mode is not None else list(self.sections)
+        runs = [self.iter_rows(mode) for mode in modes]
+        return list(islice(heapq.merge(*runs, key=_SCORE, reverse=True), n))
+
+    def as_arrays(self, mode: str):
+        """
+        numpy arrays of names and scores of the mode sharing memory with the mapping.
+        numpy is an optional dependency needed only for this view.
+        """
+        import numpy
+
+        offset, count = self._section(mode)
+        scores = numpy.frombuffer(self._mmap, dtype='<i8', count=count, offset=offset)
+        names = numpy.frombuffer(self._mmap, dtype=f'S{SCORE_BINARY_NAME_SIZE}', count=count,
+                                 offset=offset + count * SCORE_SIZE)
+        return names, scores
+
+    def close(self) -> None:
+        """
+        Release the mapping
+        """
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "BinaryScoreFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,299 @@
+""" Streaming score distribution of every mode in mergeable log histograms """
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from math import ceil
+from typing import Optional
+
+from settings import ROOT_DIR, SCORE_STATS_DIR, SCORE_STATS_FORMAT, SCORE_STATS_PRECISION, MODE_NAME_MAX_SIZE
+from source.exceptions import IncorrectScoreError, IncorrectScoreFileError, IncorrectPercentileError
+from source.modes import MODE_REGISTRY
+from source.score_store import default_writer_id
+from source.validations import validate_mode
+
+MAGIC = b'PSSD'
+VERSION = 1
+HEADER = struct.Struct('<4sHHH')
+SECTION = struct.Struct(f'<{MODE_NAME_MAX_SIZE}sQQQ16sI')
+BUCKET_SIZE = 4
+COUNT_SIZE = 8
+
+_EXACT = 1 << SCORE_STATS_PRECISION
+_HALF = _EXACT >> 1
+
+
+def get_score_stats_dir_path() -> str:
+    """
+    Get directory with score statistics of every writer
+    """
+    return f'{ROOT_DIR}/{SCORE_STATS_DIR}'
+
+
+def score_bucket(score: int) -> int:
+    """
+    Bucket of the score: the score itself below 2 ** SCORE_STATS_PRECISION,
+    then 2 ** (SCORE_STATS_PRECISION - 1) buckets of equal width per power of two
+    """
+    if score < _EXACT:
+        return score
+    shift = score.bit_length() - SCORE_STATS_PRECISION
+    return shift * _HALF + (score >> shift)
+
+
+def bucket_bounds(bucket: int) -> tuple[int, int]:
+    """
+    Lowest and highest score of the bucket
+    """
+    if bucket < _EXACT:
+        return bucket, bucket
+    shift = bucket // _HALF - 1
+    mantissa = bucket - shift * _HALF
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+
+def _replace_file(path: str, data: bytes) -> None:
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+
+class ScoreHistogram:
+    """
+    Counts of the scores by bucket. Adding a score is O(1), the size depends on the number of distinct buckets,
+    not of scores, and a percentile is off by less than 1 / 2 ** SCORE_STATS_PRECISION of the score.
+    """
+    __slots__ = ('counts', 'count', 'total', 'min', 'max', '_ranks')
+    counts: dict[int, int]
+    count: int
+    total: int
+    min: int
+    max: int
+
+    def __init__(self) -> None:
+        self.counts = {}
+        self.count = self.total = self.min = self.max = 0
+        self._ranks = None
+
+    def add(self, score: int) -> None:
+        """
+        Count the score of one game
+        """
+        if score < 0:
+            raise IncorrectScoreError(score)
+        bucket = score_bucket(score)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        if not self.count or score < self.min:
+            self.min = score
+        if score > self.max:
+            self.max = score
+        self.count += 1
+        self.total += score
+        self._ranks = None
+
+    def merge(self, other: "ScoreHistogram") -> None:
+        """
+        Add the counts of the other histogram
+        """
+        if not other.count:
+            return
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.min = min(self.min, other.min) if self.count else other.min
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+        self._ranks = None
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def _cumulative(self) -> tuple[list[int], list[int]]:
+        if self._ranks is None:
+            buckets = sorted(self.counts)
+            self._ranks = (buckets, list(accumulate(map(self.counts.__getitem__, buckets))))
+        return self._ranks
+
+    def percentile(self, q: float) -> Optional[int]:
+        """
+        Score below or equal to which q percent of the scores are, None if there are no scores.
+        Buckets are ranked once after the last change, so queries cost a binary search.
+        :param q: - percent from 0 to 100
+        """
+        if not 0 <= q <= 100:
+            raise IncorrectPercentileError(q)
+        if not self.count:
+            return None
+        buckets, ranks = self._cumulative()
+        low, high = bucket_bounds(buckets[bisect_left(ranks, max(1, ceil(self.count * q / 100)))])
+        return min(max((low + high) // 2, self.min), self.max)
+
+
+class ScoreStats:
+    """
+    Score histograms of every mode, mergeable across processes and shards
+    """
+    histograms: dict[str, ScoreHistogram]
+
+    def __init__(self) -> None:
+        self.histograms = {}
+
+    def add(self, mode: str, score: int) -> None:
+        """
+        Count the score of one game of the mode
+        """
+        histogram = self.histograms.get(mode)
+        if histogram is None:
+            validate_mode(mode)
+            histogram = self.histograms[mode] = ScoreHistogram()
+        histogram.add(score)
+
+    def histogram(self, mode: str) -> ScoreHistogram:
+        """
+        Histogram of the mode, empty if there are no scores
+        """
+        validate_mode(mode)
+        return self.histograms.get(mode) or ScoreHistogram()
+
+    def percentile(self, mode: str, q: float) -> Optional[int]:
+        return self.histogram(mode).percentile(q)
+
+    def merge(self, other: "ScoreStats") -> None:
+        """
+        Add the counts of the other statistics
+        """
+        for mode, histogram in other.histograms.items():
+            self.histograms.setdefault(mode, ScoreHistogram()).merge(histogram)
+
+    def to_bytes(self) -> bytes:
+        """
+        Compact binary form: header, then per mode a section and the buckets and counts as arrays
+        """
+        parts = [HEADER.pack(MAGIC, VERSION, SCORE_STATS_PRECISION, len(self.histograms))]
+        for mode, histogram in self.histograms.items():
+            buckets = array('I', sorted(histogram.counts))
+            counts = array('Q', map(histogram.counts.__getitem__, buckets))
+            if sys.byteorder != 'little':
+                buckets.byteswap()
+                counts.byteswap()
+            parts.append(SECTION.pack(mode.encode(), histogram.count, histogram.min, histogram.max,
+                                      histogram.total.to_bytes(16, 'little'), len(buckets)))
+            parts += [buckets.tobytes(), counts.tobytes()]
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ScoreStats":
+        """
+        Statistics of the binary form, modes removed from the modes config are skipped
+        """
+        stats = cls()
+        try:
+            magic, version, precision, modes = HEADER.unpack_from(data)
+            if magic != MAGIC or version != VERSION or precision != SCORE_STATS_PRECISION:
+                raise IncorrectScoreFileError
+            offset = HEADER.size
+            for _ in range(modes):
+                mode, count, low, high, total, size = SECTION.unpack_from(data, offset)
+                offset += SECTION.size
+                buckets, counts = array('I'), array('Q')
+                buckets.frombytes(data[offset:offset + size * BUCKET_SIZE])
+                offset += size * BUCKET_SIZE
+                counts.frombytes(data[offset:offset + size * COUNT_SIZE])
+                offset += size * COUNT_SIZE
+                if sys.byteorder != 'little':
+                    buckets.byteswap()
+                    counts.byteswap()
+                mode = mode.rstrip(b'\0').decode()
+                if len(buckets) != size or len(counts) != size:
+                    raise IncorrectScoreFileError
+                if mode not in MODE_REGISTRY.names:
+                    continue
+                histogram = stats.histograms[mode] = ScoreHistogram()
+                histogram.counts = dict(zip(buckets, counts))
+                histogram.count, histogram.min, histogram.max = count, low, high
+                histogram.total = int.from_bytes(total, 'little')
+        except (struct.error, UnicodeDecodeError, ValueError) as error:
+            raise IncorrectScoreFileError from error
+        return stats
+
+    def save(self, path: str) -> None:
+        """
+        Write the statistics to the file, the file is replaced at once
+        """
+        _replace_file(path, self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "ScoreStats":
+        with open(path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+
+class ScoreStatsStore:
+    """
+    Statistics of this writer kept in memory and flushed to its own file,
+    statistics of all writers are merged on read
+    """
+
+    def __init__(self, directory: Optional[str] = None, writer: Optional[str] = None) -> None:
+        """
+        Initialize the store, statistics already flushed by the writer are loaded
+        :param directory: - directory with the files of every writer, project score stats dir by default
+        :param writer: - id of this writer, process id by default
+        """
+        self.directory = directory or get_score_stats_dir_path()
+        self.writer = writer or default_writer_id()
+        self.path = os.path.join(self.directory, f'{self.writer}{SCORE_STATS_FORMAT}')
+        try:
+            self.stats = ScoreStats.load(self.path)
+        except FileNotFoundError:
+            self.stats = ScoreStats()
+        self.changed = False
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def add(self, mode: str, score: int) -> None:
+        """
+        Count the score of one game, O(1)
+        """
+        with self._lock:
+            self.stats.add(mode, score)
+            self.changed = True
+
+    def flush(self) -> None:
+        """
+        Write the statistics of this writer to its file if they changed since the last flush, changed is cleared.
+        One flush writes at a time, games keep adding scores while the file is written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self.changed:
+                    return
+                data = self.stats.to_bytes()
+                self.changed = False
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                _replace_file(self.path, data)
+            except OSError:
+                self.changed = True
+                raise
+
+    def merged(self) -> ScoreStats:
+        """
+        Statistics of all writers, this writer's from memory
+        """
+        merged = ScoreStats()
+        try:
+            filenames = sorted(os.listdir(self.directory))
+        except FileNotFoundError:
+            filenames = []
+        for filename in filenames:
+            if filename.endswith(SCORE_STATS_FORMAT) and filename != os.path.basename(self.path):
+                merged.merge(ScoreStats.load(os.path.join(self.directory, filename)))
+        with self._lock:
+            merged.merge(self.stats)
+        return merged
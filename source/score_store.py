@@ -0,0 +1,371 @@
+""" Sharded score storage: one sorted file per mode and writer """
+import heapq
+import os
+import threading
+from itertools import islice, starmap
+from operator import itemgetter
+from typing import Iterator, Optional
+
+from settings import ROOT_DIR, SCORE_SHARDS_DIR, SCORE_SHARD_FORMAT, MAX_RECORDS_NUMBER, NAME_ADDITIONAL_SPACES
+from source.exceptions import RecordInRecordsError, IncorrectModeError
+from source.modes import MODE_REGISTRY
+from source.name_index import NameIndex
+from source.record import PlayerRecord, record_file_title_row, record_file_row, get_score_file_path, \
+    iter_score_file_rows, score_file_stamp
+from source.validations import validate_mode, validated_score_row_size
+
+Row = tuple[str, str, int]
+_SCORE = itemgetter(2)
+
+
+def get_shards_dir_path() -> str:
+    """
+    Get directory with score shards
+    """
+    return f'{ROOT_DIR}/{SCORE_SHARDS_DIR}'
+
+
+def default_writer_id() -> str:
+    """
+    Writer id of the current process
+    """
+    return str(os.getpid())
+
+
+def sync_directory(path: str) -> None:
+    """
+    Fsync the directory, so the files replaced in it survive a crash
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class ScoreShard:
+    """
+    Score file of one writer for one mode, kept sorted by score
+    """
+    directory: str
+    mode: str
+    writer: str
+    max_records: Optional[int]
+
+    def __init__(self, directory: str, mode: str, writer: str, max_records: Optional[int] = MAX_RECORDS_NUMBER):
+        """
+        Initialize the shard
+        :param directory: - directory with shards
+        :param mode: - mode of the game
+        :param writer: - id of the writer owning the shard
+        :param max_records: - how many best records to keep, None to keep all
+        """
+        validate_mode(mode)
+        self.directory = directory
+        self.mode = mode
+        self.writer = writer
+        self.max_records = max_records
+
+    @property
+    def path(self) -> str:
+        return f'{self.directory}/{self.mode}.{self.writer}{SCORE_SHARD_FORMAT}'
+
+    def iter_rows(self) -> Iterator[Row]:
+        """
+        Stream (name, mode, score) rows of the shard from the best to the worst
+        """
+        try:
+            with open(self.path, 'r') as file:
+                next(file, None)  # skip table title
+                for line in file:
+                    name, mode, score = line.split()
+                    yield name, mode, int(score)
+        except FileNotFoundError:
+            return
+
+    def iter_records(self) -> Iterator[PlayerRecord]:
+        """
+        Stream records of the shard from the best to the worst
+        """
+        return starmap(PlayerRecord, self.iter_rows())
+
+    def add_record(self, record: PlayerRecord) -> list[Row]:
+        """
+        Add a record keeping the shard sorted
+        :param record: - record to add
+        :return: - rows kept in the shard
+        """
+        return self.add_records([record])
+
+    def add_records(self, records: list[PlayerRecord], skip_duplicates: bool = False,
+                    sync: bool = False) -> list[Row]:
+        """
+        Add several records with one rewrite of the shard
+        :param records: - records to add
+        :param skip_duplicates: - skip records already in the shard instead of raising RecordInRecordsError
+        :param sync: - fsync the new content before it replaces the shard
+        :return: - rows kept in the shard, nothing is written if no record is added
+        """
+        current = list(self.iter_rows())
+        seen = set(current)
+        added = False
+        for record in records:
+            if record.mode != self.mode:
+                raise IncorrectModeError
+            row = record.as_row()
+            if row in seen:
+                if skip_duplicates:
+                    continue
+                raise RecordInRecordsError
+            seen.add(row)
+            current.append(row)
+            added = True
+        return self._write(current, sync) if added else current
+
+    def merge_rows(self, rows: list[Row]) -> list[Row]:
+        """
+        Add rows of this mode already checked for duplicates, with one rewrite of the shard
+        :param rows: - (name, mode, score) rows
+        :return: - rows kept in the shard
+        """
+        return self._write(list(self.iter_rows()) + rows)
+
+    def _write(self, rows: list[Row], sync: bool = False) -> list[Row]:
+        """
+        Sort, keep the best rows and replace shard content at once,
+        so a reader merging the shards sees either the previous or the new version
+        :param rows: - (name, mode, score) rows
+        :param sync: - fsync the new content before it replaces the shard, the directory is synced by the caller
+        :return: - rows kept in the shard
+        """
+        if self.max_records is None:
+            rows.sort(key=_SCORE, reverse=True)
+        else:
+            rows = heapq.nlargest(self.max_records, rows, key=_SCORE)
+        name_column_size = max((len(row[0]) for row in rows), default=0) + NAME_ADDITIONAL_SPACES
+        name_column_size = validated_score_row_size(name_column_size)
+        content = record_file_title_row(name_column_size)
+        content += ''.join(record_file_row(name, mode, score, name_column_size) for name, mode, score in rows)
+        tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            file = open(tmp_path, 'w')
+        except FileNotFoundError:
+            os.makedirs(self.directory, exist_ok=True)
+            file = open(tmp_path, 'w')
+        with file:
+            file.write(content)
+            if sync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(tmp_path, self.path)
+        return rows
+
+
+class ShardedScoreStore:
+    """
+    Score store split into shards by mode and writer.
+    Writers never share a file, readers merge sorted shards lazily.
+    The single score file of earlier versions may be read with the shards, it is never written.
+    """
+    directory: str
+    writer: str
+    max_records: Optional[int]
+    score_file: Optional[str]
+
+    def __init__(self, directory: Optional[str] = None, writer: Optional[str] = None,
+                 max_records: Optional[int] = MAX_RECORDS_NUMBER, score_file: Optional[str] = None):
+        """
+        Initialize the store
+        :param directory: - directory with shards, project scores dir by default
+        :param writer: - id of this writer, process id by default
+        :param max_records: - records kept per shard, None to keep all
+        :param score_file: - score file of earlier versions read with the shards if set
+        """
+        self.directory = directory or get_shards_dir_path()
+        self.writer = writer or default_writer_id()
+        self.max_records = max_records
+        self.score_file = score_file
+        self._name_index: Optional[NameIndex] = None
+        self._name_index_version: Optional[tuple] = None
+        self._thresholds: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def shard(self, mode: str, writer: Optional[str] = None) -> ScoreShard:
+        """
+        Get shard of the writer for the mode
+        """
+        return ScoreShard(self.directory, mode, writer or self.writer, self.max_records)
+
+    def admits(self, record: PlayerRecord) -> bool:
+        """
+        Check if the record may enter the writer's shard of its mode.
+        Only this store writes the shard, so the lowest score of a full shard is known without reading it.
+        """
+        threshold = self._thresholds.get(record.mode)
+        return threshold is None or record.score > threshold
+
+    def save_record(self, record: PlayerRecord, writer: Optional[str] = None) -> None:
+        """
+        Save record to the writer's shard
+        """
+        with self._lock:
+            index_current = self._index_current()
+            rows = self.shard(record.mode, writer).add_record(record)
+            if writer is None:
+                self._update_threshold(record.mode, rows)
+            self._index_rows([record.as_row()], index_current)
+
+    def save_records(self, records: list[PlayerRecord]) -> None:
+        """
+        Save a batch of records with one rewrite and one fsync of every changed shard and one fsync
+        of the directory, so the batch is durable on return.
+        Records below the threshold of their shard and records already in it are skipped.
+        :param records: - records to save
+        """
+        by_mode = {}
+        for record in records:
+            if self.admits(record):
+                by_mode.setdefault(record.mode, []).append(record)
+        with self._lock:
+            index_current = self._index_current()
+            for mode, mode_records in by_mode.items():
+                self._update_threshold(mode, self.shard(mode).add_records(mode_records, skip_duplicates=True,
+                                                                          sync=True))
+            if by_mode:
+                sync_directory(self.directory)
+            self._index_rows([record.as_row() for mode_records in by_mode.values() for record in mode_records],
+                             index_current)
+
+    def merge_rows(self, mode: str, rows: list[Row]) -> None:
+        """
+        Merge rows of the mode already checked for duplicates into the writer's shard
+        """
+        with self._lock:
+            index_current = self._index_current()
+            self._update_threshold(mode, self.shard(mode).merge_rows(rows))
+            self._index_rows(rows, index_current)
+
+    def _update_threshold(self, mode: str, rows: list[Row]) -> None:
+        if self.max_records is not None and len(rows) >= self.max_records:
+            self._thresholds[mode] = rows[-1][2]
+
+    def name_index(self) -> NameIndex:
+        """
+        Name index of the stored records, built again only when the version of the store on disk changes.
+        Records saved by a store keeping all records are added to its index without a rebuild.
+        """
+        version = self.version()
+        if self._name_index is None or version != self._name_index_version:
+            self._name_index = NameIndex(self.iter_top_rows())
+            self._name_index_version = version
+        return self._name_index
+
+    def _index_current(self) -> bool:
+        # cut shards may drop indexed records, such an index is built again on next use
+        return self._name_index is not None and self.max_records is None \
+            and self.version() == self._name_index_version
+
+    def _index_rows(self, rows: list[Row], index_current: bool) -> None:
+        if index_current:
+            self._name_index.add_rows(rows)
+            self._name_index_version = self.version()
+
+    def shards(self, mode: Optional[str] = None) -> list[ScoreShard]:
+        """
+        All shards of the registered modes on disk, optionally only for one mode,
+        shards of modes removed from the modes config are left on disk and skipped
+        """
+        if mode is not None:
+            validate_mode(mode)
+        try:
+            filenames = sorted(os.listdir(self.directory))
+        except FileNotFoundError:
+            return []
+        shards = []
+        for filename in filenames:
+            if not filename.endswith(SCORE_SHARD_FORMAT):
+                continue
+            shard_mode, _, writer = filename[:-len(SCORE_SHARD_FORMAT)].partition('.')
+            if shard_mode == mode or (mode is None and shard_mode in MODE_REGISTRY.names):
+                shards.append(ScoreShard(self.directory, shard_mode, writer, self.max_records))
+        return shards
+
+    def version(self) -> tuple:
+        """
+        Version of the store on disk: names, modification times and sizes of its shards and the score file stamp
+        """
+        version = []
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(SCORE_SHARD_FORMAT):
+                        stat = entry.stat()
+                        version.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            pass
+        version.sort()
+        if self.score_file is not None:
+            version.append(score_file_stamp(self.score_file))
+        return tuple(version)
+
+    def _iter_score_file_rows(self, mode: Optional[str]) -> Iterator[Row]:
+        for row in iter_score_file_rows(self.score_file):
+            if row[1] == mode or (mode is None and row[1] in MODE_REGISTRY.names):
+                yield row
+
+    def iter_top_rows(self, mode: Optional[str] = None) -> Iterator[Row]:
+        """
+        Stream (name, mode, score) rows of all shards from the best to the worst (k-way merge)
+        :param mode: - only this mode if set
+        """
+        runs = [shard.iter_rows() for shard in self.shards(mode)]
+        if self.score_file is not None:
+            runs.append(self._iter_score_file_rows(mode))
+        return heapq.merge(*runs, key=_SCORE, reverse=True)
+
+    def iter_top(self, mode: Optional[str] = None) -> Iterator[PlayerRecord]:
+        """
+        Stream records of all shards from the best to the worst (k-way merge)
+        :param mode: - only this mode if set
+        """
+        return starmap(PlayerRecord, self.iter_top_rows(mode))
+
+    def top_rows(self, n: int = MAX_RECORDS_NUMBER, mode: Optional[str] = None) -> list[Row]:
+        """
+        Global top-n (name, mode, score) rows
+        :param n: - number of rows
+        :param mode: - only this mode if set
+        """
+        return list(islice(self.iter_top_rows(mode), n))
+
+    def top(self, n: int = MAX_RECORDS_NUMBER, mode: Optional[str] = None) -> list[PlayerRecord]:
+        """
+        Global top-n records
+        :param n: - number of records
+        :param mode: - only this mode if set
+        """
+        return list(islice(self.iter_top(mode), n))
+
+
+_default_store: Optional[ShardedScoreStore] = None
+_default_store_lock = threading.Lock()
+
+
+def default_score_store() -> ShardedScoreStore:
+    """
+    Store of the project scores written by this process, shared by all its games and persisters,
+    scores of the score file of earlier versions are read with the shards
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ShardedScoreStore(score_file=get_score_file_path())
+        return _default_store
+
+
+def save_records_to_store(player_records: list[PlayerRecord]) -> None:
+    """
+    Save a batch of records to the shards of this process, see ShardedScoreStore.save_records
+    :param player_records: - records to save
+    """
+    default_score_store().save_records(player_records)
@@ -0,0 +1,121 @@
+""" Compact state of game sessions and a host running many sessions in one process """
+from concurrent.futures import Future, ThreadPoolExecutor
+from random import Random
+from typing import Iterable, Optional
+
+from settings import MODES, PLAYER_LIVES, SESSION_HOST_WORKERS
+from source.exceptions import QuitApp
+from source.game import Game
+from source.metrics import METRICS
+from source.persister import WriteBehindPersister
+from source.validations import validate_mode
+
+SHARED_MODES = {mode: mode for mode in MODES.values()}
+
+
+class SessionState:
+    """
+    State of one idle session: name, mode, level, lives and score.
+
+    Memory budget is SESSION_BYTES_BUDGET bytes per session including the name:
+    80 bytes for the slotted object with its GC header, about 50 bytes for a short name,
+    mode string is shared by all sessions and counters below 257 are cached ints.
+    """
+    __slots__ = ('name', 'mode', 'level', 'lives', 'enemy_lives', 'score')
+    name: str
+    mode: str
+    level: int
+    lives: int
+    enemy_lives: int
+    score: int
+
+    def __init__(self, name: str, mode: str, level: int = 0, lives: int = PLAYER_LIVES, enemy_lives: int = 0,
+                 score: int = 0) -> None:
+        """
+        Initialize the session state
+        :param name: - name of the player
+        :param mode: - mode of the game
+        :param level: - level of the current enemy, 0 before the first enemy
+        :param lives: - player's lives
+        :param enemy_lives: - lives of the current enemy
+        :param score: - player's score
+        """
+        validate_mode(mode)
+        self.name = name
+        self.mode = SHARED_MODES[mode]
+        self.level = level
+        self.lives = lives
+        self.enemy_lives = enemy_lives
+        self.score = score
+
+    @classmethod
+    def from_game(cls, game: Game) -> "SessionState":
+        """
+        Snapshot of the game state
+        """
+        enemy = getattr(game, 'enemy', None)
+        return cls(name=game.player.name, mode=game.mode, level=enemy.level if enemy else 0,
+                   lives=game.player.lives, enemy_lives=enemy.lives if enemy else 0, score=game.player.score)
+
+
+class SessionHost:
+    """
+    Runs headless game sessions on a thread pool.
+    Every session has its own Game and random generator, scores go to the shards of this process or the persister.
+    """
+    persister: Optional[WriteBehindPersister]
+
+    def __init__(self, workers: int = SESSION_HOST_WORKERS, persister: Optional[WriteBehindPersister] = None) -> None:
+        """
+        Initialize the host
+        :param workers: - number of threads running sessions
+        :param persister: - saves scores in background if set
+        """
+        self.persister = persister
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix='game-session')
+
+    def submit(self, name: str, mode: str, attacks: Iterable[str], seed: Optional[int] = None) -> Future:
+        """
+        Start a session
+        :param name: - player's name
+        :param mode: - mode of the game
+        :param attacks: - attack inputs of the player
+        :param seed: - seed of the session random generator
+        :return: future with the final SessionState
+        """
+        return self._pool.submit(self.play_session, name, mode, attacks, seed)
+
+    def run(self, sessions: Iterable[tuple]) -> list[SessionState]:
+        """
+        Run sessions and wait for all of them
+        :param sessions: - (name, mode, attacks, seed) tuples
+        """
+        futures = [self.submit(*session) for session in sessions]
+        return [future.result() for future in futures]
+
+    def play_session(self, name: str, mode: str, attacks: Iterable[str], seed: Optional[int] = None) -> SessionState:
+        """
+        Play one session until game over, quit or end of attacks
+        """
+        game = Game(persister=self.persister, headless=True, name=name, mode=mode, rng=Random(seed))
+        metrics = METRICS.shard()
+        metrics.active += 1
+        try:
+            game.play_attacks(attacks)
+        except QuitApp:
+            pass
+        finally:
+            metrics.active -= 1
+        return SessionState.from_game(game)
+
+    def close(self) -> None:
+        """
+        Wait for running sessions and stop the threads
+        """
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "SessionHost":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
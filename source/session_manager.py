@@ -0,0 +1,162 @@
+""" Idle timeouts and admission control of the sessions of a server """
+import asyncio
+import logging
+import time
+from math import ceil
+from typing import Callable, Hashable, Optional
+
+from settings import SESSION_IDLE_TIMEOUT, SESSION_TIMER_TICK, SESSION_TIMER_SLOTS, SESSION_SAVE_EXPIRED, \
+    BOT_MAX_SESSIONS
+from source.exceptions import SessionLimitError
+
+logger = logging.getLogger(__name__)
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel of deadlines rounded up to whole ticks.
+    Scheduling, rescheduling and cancelling a timer is O(1), advancing the wheel costs one slot per tick
+    and one step per expired timer. A timer further than one turn away waits in its slot for the remaining turns.
+    """
+
+    def __init__(self, slots: int = SESSION_TIMER_SLOTS, tick: float = SESSION_TIMER_TICK, now: float = 0.0) -> None:
+        """
+        Initialize the wheel
+        :param slots: - number of slots, one turn of the wheel is slots * tick seconds
+        :param tick: - seconds per slot
+        :param now: - current time
+        """
+        self.tick = tick
+        self._slots: list[dict[Hashable, int]] = [{} for _ in range(slots)]
+        self._where: dict[Hashable, dict[Hashable, int]] = {}
+        self._current = int(now // tick)
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """
+        Set the deadline of the timer, replacing its previous deadline
+        """
+        self.cancel(key)
+        tick = max(ceil(deadline / self.tick), self._current)
+        slot = self._slots[tick % len(self._slots)]
+        slot[key] = tick
+        self._where[key] = slot
+
+    def cancel(self, key: Hashable) -> None:
+        slot = self._where.pop(key, None)
+        if slot is not None:
+            del slot[key]
+
+    def advance(self, now: float) -> list[Hashable]:
+        """
+        Remove and return the timers with deadlines up to now
+        """
+        target = int(now // self.tick)
+        expired = []
+        for tick in range(self._current, min(target + 1, self._current + len(self._slots))):
+            slot = self._slots[tick % len(self._slots)]
+            due = [key for key, deadline in slot.items() if deadline <= target]
+            for key in due:
+                del slot[key]
+                del self._where[key]
+            expired += due
+        self._current = max(self._current, target + 1)
+        return expired
+
+
+class SessionManager:
+    """
+    Sessions of a server: at most max_sessions at once, every session expires after idle_timeout seconds
+    without activity. A session is any object with expire(save), which ends it and saves the score of its game
+    if save is set. touch() only records the time, the timer of a session that was active since it was
+    scheduled is moved on when it comes due, so a busy session costs one dict store per message.
+    """
+
+    def __init__(self, max_sessions: int = BOT_MAX_SESSIONS, idle_timeout: float = SESSION_IDLE_TIMEOUT,
+                 save_expired: bool = SESSION_SAVE_EXPIRED, tick: float = SESSION_TIMER_TICK,
+                 slots: int = SESSION_TIMER_SLOTS, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initialize the manager
+        :param max_sessions: - sessions admitted at once
+        :param idle_timeout: - seconds without activity before a session expires
+        :param save_expired: - save the scores of the games of expired sessions, discard them if not set
+        :param tick: - resolution of the timeouts in seconds
+        :param slots: - slots of the timer wheel
+        :param clock: - current time in seconds
+        """
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.save_expired = save_expired
+        self.clock = clock
+        self.wheel = TimerWheel(slots, tick, clock())
+        self._active: dict[Hashable, float] = {}
+        self.expired = 0
+        self.rejected = 0
+        self.failures = 0
+
+    def __len__(self) -> int:
+        return len(self._active)
+
+    def __contains__(self, session: Hashable) -> bool:
+        return session in self._active
+
+    def open(self, session: Hashable) -> None:
+        """
+        Admit the session
+        """
+        if len(self._active) >= self.max_sessions:
+            self.rejected += 1
+            raise SessionLimitError(self.max_sessions)
+        now = self.clock()
+        self._active[session] = now
+        self.wheel.schedule(session, now + self.idle_timeout)
+
+    def touch(self, session: Hashable) -> None:
+        """
+        Record activity of the session
+        """
+        if session in self._active:
+            self._active[session] = self.clock()
+
+    def close(self, session: Hashable) -> None:
+        """
+        Forget the session, closing an unknown or expired session does nothing
+        """
+        if self._active.pop(session, None) is not None:
+            self.wheel.cancel(session)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """
+        Expire the sessions idle for idle_timeout seconds.
+        A session failing to expire is logged and forgotten, the other sessions still expire.
+        :return: number of expired sessions
+        """
+        now = self.clock() if now is None else now
+        expired = 0
+        for session in self.wheel.advance(now):
+            deadline = self._active[session] + self.idle_timeout
+            if deadline > now:
+                self.wheel.schedule(session, deadline)
+                continue
+            del self._active[session]
+            expired += 1
+            try:
+                session.expire(self.save_expired)
+            except Exception:
+                self.failures += 1
+                logger.exception('Session %r failed to expire', session)
+        self.expired += expired
+        return expired
+
+    async def run(self) -> None:
+        """
+        Expire idle sessions every tick until cancelled
+        """
+        while True:
+            await asyncio.sleep(self.wheel.tick)
+            self.expire()
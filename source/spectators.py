@@ -0,0 +1,205 @@
+""" Live leaderboard pushed to spectators """
+import asyncio
+import heapq
+import json
+import threading
+from collections import deque
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable, Optional
+
+from settings import MODES, MAX_RECORDS_NUMBER, LEADERBOARD_HOST, SPECTATOR_PORT, SPECTATOR_TICK, \
+    SPECTATOR_BUFFER_SIZE
+from source.events import EventBus, RecordSavedEvent
+from source.record import PlayerRecord
+from source.score_store import Row, default_score_store
+
+_MODE, _SCORE = itemgetter(1), itemgetter(2)
+
+
+class SpectatorProtocol(asyncio.Protocol):
+    """
+    Connection of one spectator.
+    Its output buffer is the bounded queue: while it is over the limit, diffs are dropped
+    and the spectator gets a fresh snapshot once the buffer drains.
+    """
+
+    def __init__(self, hub: "SpectatorHub") -> None:
+        self.hub = hub
+        self.transport = None
+        self.paused = False
+        self.stale = False
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.transport = transport
+        transport.set_write_buffer_limits(high=self.hub.buffer_size)
+        self.hub.subscribers.add(self)
+        transport.write(self.hub.snapshot_message())
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.hub.subscribers.discard(self)
+
+    def pause_writing(self) -> None:
+        self.paused = True
+
+    def resume_writing(self) -> None:
+        self.paused = False
+        if self.stale:
+            self.stale = False
+            self.transport.write(self.hub.snapshot_message())
+
+    def send(self, message: bytes) -> None:
+        """
+        Write the message or drop it if the spectator does not keep up
+        """
+        if self.paused:
+            self.stale = True
+        else:
+            self.transport.write(message)
+
+
+class SpectatorHub:
+    """
+    Pushes per-mode top-n changes to spectators as JSON lines.
+    publish() only appends to a queue, so the write path never waits for spectators.
+    All records published during one tick are sent as one diff message.
+    """
+
+    def __init__(self, rows: Optional[Iterable[Row]] = None, top_n: int = MAX_RECORDS_NUMBER,
+                 tick: float = SPECTATOR_TICK, buffer_size: int = SPECTATOR_BUFFER_SIZE) -> None:
+        """
+        Initialize the hub
+        :param rows: - (name, mode, score) rows known before start, rows of the default score store if not set
+        :param top_n: - records of every mode
+        :param tick: - seconds between diffs
+        :param buffer_size: - bytes buffered for one spectator before it is considered slow
+        """
+        self.top_n = top_n
+        self.tick = tick
+        self.buffer_size = buffer_size
+        self.subscribers: set[SpectatorProtocol] = set()
+        self.version = 0
+        self.tops: dict[str, list[Row]] = {mode: [] for mode in MODES.values()}
+        self._pending = deque()
+        self._snapshot = None
+        self.port: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._error: Optional[BaseException] = None
+        self._apply(default_score_store().iter_top_rows() if rows is None else rows)
+
+    def publish(self, record: PlayerRecord) -> None:
+        """
+        Queue an accepted record, safe to call from any thread
+        """
+        self._pending.append(record.as_row())
+
+    def on_record_saved(self, event: RecordSavedEvent) -> None:
+        self.publish(event.record)
+
+    def attach(self, events: EventBus) -> None:
+        """
+        Publish every record saved by games of the event bus
+        """
+        events.subscribe(RecordSavedEvent, self.on_record_saved)
+
+    def snapshot_message(self) -> bytes:
+        """
+        Message with the tops of all modes, encoded once per version
+        """
+        if self._snapshot is None:
+            self._snapshot = self._message('snapshot', self.tops)
+        return self._snapshot
+
+    def flush(self) -> int:
+        """
+        Apply queued records and send one diff with the changed modes to every spectator
+        :return: number of spectators the diff was sent to
+        """
+        if not self._pending:
+            return 0
+        rows = []
+        while self._pending:
+            rows.append(self._pending.popleft())
+        changed = self._apply(rows)
+        if not changed:
+            return 0
+        self.version += 1
+        self._snapshot = None
+        message = self._message('diff', changed)
+        subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.send(message)
+        return len(subscribers)
+
+    def _apply(self, rows: Iterable[Row]) -> dict[str, list[Row]]:
+        changed = {}
+        for mode, mode_rows in groupby(sorted(rows, key=_MODE), key=_MODE):
+            current = self.tops.get(mode, [])
+            top = heapq.nlargest(self.top_n, dict.fromkeys(current + list(mode_rows)), key=_SCORE)
+            if top != current:
+                self.tops[mode] = changed[mode] = top
+        return changed
+
+    def _message(self, message_type: str, tops: dict[str, list[Row]]) -> bytes:
+        modes = {mode: [[name, score] for name, _, score in top] for mode, top in tops.items()}
+        return json.dumps({'type': message_type, 'version': self.version, 'modes': modes}).encode() + b'\n'
+
+    async def serve(self, host: str = LEADERBOARD_HOST, port: int = SPECTATOR_PORT, path: Optional[str] = None,
+                    started: Optional[threading.Event] = None) -> None:
+        """
+        Accept spectators and send diffs every tick until stop()
+        :param host: - host to listen on
+        :param port: - TCP port to listen on, 0 for any free port
+        :param path: - Unix socket path, used instead of host and port if set
+        :param started: - set when the hub is listening
+        """
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._stopped = asyncio.Event()
+        if path is not None:
+            server = await loop.create_unix_server(lambda: SpectatorProtocol(self), path)
+        else:
+            server = await loop.create_server(lambda: SpectatorProtocol(self), host, port)
+            self.port = server.sockets[0].getsockname()[1]
+        if started is not None:
+            started.set()
+        async with server:
+            while not self._stopped.is_set():
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), self.tick)
+                except asyncio.TimeoutError:
+                    pass
+                self.flush()
+            for subscriber in list(self.subscribers):
+                subscriber.transport.close()
+
+    def start(self, host: str = LEADERBOARD_HOST, port: int = SPECTATOR_PORT, path: Optional[str] = None) -> None:
+        """
+        Serve spectators on a background thread with its own event loop
+        """
+        started = threading.Event()
+
+        def run() -> None:
+            try:
+                asyncio.run(self.serve(host, port, path, started))
+            except OSError as error:
+                self._error = error
+                started.set()
+
+        self._thread = threading.Thread(target=run, name='spectator-hub', daemon=True)
+        self._thread.start()
+        started.wait()
+        if self._error is not None:
+            raise self._error
+
+    def stop(self) -> None:
+        """
+        Send the last diff, disconnect spectators and stop serving
+        """
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
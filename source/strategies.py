@@ -0,0 +1,180 @@
+""" Enemy strategies conditional on the last player attack, and player strategies to score them against """
+import json
+from bisect import bisect
+from itertools import accumulate
+from random import Random
+from typing import Callable, Optional
+
+from settings import PAPER, STONE, SCISSORS, ATTACK_PAIRS_OUTCOME, WIN
+from source.exceptions import IncorrectStrategyError
+
+ATTACKS = (PAPER, STONE, SCISSORS)
+START = 'start'
+CONTEXTS = (START,) + ATTACKS
+BEATS = {attack: next(other for other in ATTACKS if ATTACK_PAIRS_OUTCOME[(other, attack)] == WIN)
+         for attack in ATTACKS}
+Genome = tuple[float, ...]
+
+
+class EnemyStrategy:
+    """
+    Mixed strategy of the enemy: weights of its attacks for the first round and after every player attack
+    """
+    __slots__ = ('weights', '_cumulative')
+
+    def __init__(self, weights: dict[str, tuple[float, ...]]) -> None:
+        """
+        Initialize the strategy
+        :param weights: - weights of PAPER, STONE and SCISSORS for every context, START and the player attacks
+        """
+        if set(weights) != set(CONTEXTS) or any(len(weights[context]) != len(ATTACKS) or min(weights[context]) < 0
+                                                or sum(weights[context]) <= 0 for context in CONTEXTS):
+            raise IncorrectStrategyError
+        self.weights = {context: tuple(weights[context]) for context in CONTEXTS}
+        self._cumulative = {}
+        for context, context_weights in self.weights.items():
+            total = sum(context_weights)
+            self._cumulative[context] = [value / total for value in accumulate(context_weights)][:-1]
+        self._cumulative[None] = self._cumulative[START]
+
+    @classmethod
+    def from_genome(cls, genome: Genome) -> "EnemyStrategy":
+        """
+        Strategy of the flat weights, len(ATTACKS) weights per context in CONTEXTS order
+        """
+        size = len(ATTACKS)
+        return cls({context: genome[index * size:(index + 1) * size] for index, context in enumerate(CONTEXTS)})
+
+    def genome(self) -> Genome:
+        """
+        Flat weights of the strategy
+        """
+        return tuple(weight for context in CONTEXTS for weight in self.weights[context])
+
+    def attack(self, random: Callable[[], float], last_player_attack: Optional[str]) -> str:
+        """
+        Draw the enemy attack
+        :param random: - uniform random number generator of the enemy
+        :param last_player_attack: - attack of the player in the previous round, None in the first round
+        """
+        return ATTACKS[bisect(self._cumulative[last_player_attack], random())]
+
+
+def save_enemy_strategy(path: str, strategy: EnemyStrategy) -> None:
+    """
+    Save the strategy as JSON
+    """
+    with open(path, 'w') as file:
+        json.dump({context: list(weights) for context, weights in strategy.weights.items()}, file, indent=2)
+
+
+def load_enemy_strategy(path: str) -> EnemyStrategy:
+    """
+    Load the strategy saved by save_enemy_strategy
+    """
+    with open(path) as file:
+        try:
+            weights = json.load(file)
+            return EnemyStrategy({context: tuple(float(weight) for weight in weights[context])
+                                  for context in CONTEXTS})
+        except (ValueError, KeyError, TypeError) as error:
+            raise IncorrectStrategyError from error
+
+
+class PlayerStrategy:
+    """
+    Uniformly random player, base of the player strategies.
+    A new instance plays every game, observe() is called after every round.
+    """
+
+    def attack(self, rng: Random) -> str:
+        return ATTACKS[int(rng.random() * 3)]
+
+    def observe(self, player_attack: str, enemy_attack: str) -> None:
+        pass
+
+
+class ConstantPlayer(PlayerStrategy):
+    """
+    Always the same attack
+    """
+
+    def __init__(self, attack: str) -> None:
+        self.constant = attack
+
+    def attack(self, rng: Random) -> str:
+        return self.constant
+
+
+class CyclePlayer(PlayerStrategy):
+    """
+    PAPER, STONE, SCISSORS and again
+    """
+
+    def __init__(self) -> None:
+        self.index = -1
+
+    def attack(self, rng: Random) -> str:
+        self.index = (self.index + 1) % len(ATTACKS)
+        return ATTACKS[self.index]
+
+
+class BeatLastPlayer(PlayerStrategy):
+    """
+    Attack beating the last enemy attack
+    """
+
+    def __init__(self) -> None:
+        self.last = None
+
+    def attack(self, rng: Random) -> str:
+        return super().attack(rng) if self.last is None else BEATS[self.last]
+
+    def observe(self, player_attack: str, enemy_attack: str) -> None:
+        self.last = enemy_attack
+
+
+class FrequencyPlayer(PlayerStrategy):
+    """
+    Attack beating the most frequent enemy attack so far
+    """
+
+    def __init__(self) -> None:
+        self.counts = dict.fromkeys(ATTACKS, 0)
+
+    def attack(self, rng: Random) -> str:
+        most = max(self.counts.values())
+        if not most:
+            return super().attack(rng)
+        return BEATS[next(attack for attack in ATTACKS if self.counts[attack] == most)]
+
+    def observe(self, player_attack: str, enemy_attack: str) -> None:
+        self.counts[enemy_attack] += 1
+
+
+class WinStayPlayer(PlayerStrategy):
+    """
+    Repeats an attack that won or drew, after a loss switches to the attack that beat it
+    """
+
+    def __init__(self) -> None:
+        self.next = None
+
+    def attack(self, rng: Random) -> str:
+        return super().attack(rng) if self.next is None else self.next
+
+    def observe(self, player_attack: str, enemy_attack: str) -> None:
+        lost = BEATS[player_attack] == enemy_attack
+        self.next = BEATS[player_attack] if lost else player_attack
+
+
+PLAYER_STRATEGIES: dict[str, Callable[[], PlayerStrategy]] = {
+    'random': PlayerStrategy,
+    'paper': lambda: ConstantPlayer(PAPER),
+    'stone': lambda: ConstantPlayer(STONE),
+    'scissors': lambda: ConstantPlayer(SCISSORS),
+    'cycle': CyclePlayer,
+    'beat_last': BeatLastPlayer,
+    'frequency': FrequencyPlayer,
+    'win_stay': WinStayPlayer,
+}
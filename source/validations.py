@@ -1,6 +1,14 @@
-from settings import MODES, ALLOWED_ATTACKS, ATTACK_PAIRS_OUTCOME, MAIN_MENU_OPTIONS
+from itertools import islice
+from operator import itemgetter
+from typing import Iterable, Sequence
+
+from settings import VALIDATION_CHUNK_SIZE
+
 from source.exceptions import WhiteSpaceInputError, EmptyInputError, IncorrectModeError, IncorrectLevelError, \
-    IncorrectFightResult
+    IncorrectFightResult, IncorrectScoreError
+from source.schema import MODE_SCHEMA, MENU_SCHEMA, SCORE_MENU_SCHEMA, ATTACK_SCHEMA, MODE_NAMES, FIGHT_RESULTS
+
+_NAME, _MODE, _SCORE = itemgetter(0), itemgetter(1), itemgetter(2)
 
 
 def validate_name(name: str) -> None:
@@ -8,7 +16,7 @@ def validate_name(name: str) -> None:
     Validates user input name
     :param name: - name to validate
     """
-    if ' ' in name:
+    if any(map(str.isspace, name)):
         raise WhiteSpaceInputError
     elif not name:
         raise EmptyInputError
@@ -19,7 +27,7 @@ def validate_mode(mode: str) -> None:
     Validate mode
     :param mode: - mode to validate
     """
-    if mode not in MODES.values():
+    if mode not in MODE_NAMES:
         raise IncorrectModeError
 
 
@@ -40,7 +48,7 @@ def validate_fight_result(result: int) -> None:
     Validate result of battle
     :param result: should be one of [1, 0, -1]
     """
-    if result not in set(ATTACK_PAIRS_OUTCOME.values()):
+    if result not in FIGHT_RESULTS:
         raise IncorrectFightResult
 
 
@@ -59,7 +67,7 @@ def is_valid_input_mode(mode_input: str) -> bool:
     :param mode_input: - mode of the game
     :return: True if mode in allowed modes, False otherwise
     """
-    return mode_input in get_allowed_options(MODES)
+    return mode_input in MODE_SCHEMA.options
 
 
 def is_valid_input_menu(menu_input: str) -> bool:
@@ -68,7 +76,16 @@ def is_valid_input_menu(menu_input: str) -> bool:
     :param menu_input: - menu user input
     :return: True if menu in allowed modes, False otherwise
     """
-    return menu_input in get_allowed_options(MAIN_MENU_OPTIONS)
+    return menu_input in MENU_SCHEMA.options
+
+
+def is_valid_input_score_menu(menu_input: str) -> bool:
+    """
+    Validates score menu user input
+    :param menu_input: - score menu user input
+    :return: True if menu in allowed options, False otherwise
+    """
+    return menu_input in SCORE_MENU_SCHEMA.options
 
 
 def is_valid_input_attack(attack_input: str) -> bool:
@@ -77,7 +94,7 @@ def is_valid_input_attack(attack_input: str) -> bool:
     :param attack_input: - attack user input
     :return: True if attack_input in allowed attacks, False otherwise
     """
-    return attack_input in get_allowed_options(ALLOWED_ATTACKS)
+    return attack_input in ATTACK_SCHEMA.options
 
 
 def validated_score_row_size(row_size: int) -> int:
@@ -91,3 +108,36 @@ def validated_score_row_size(row_size: int) -> int:
         return len("NAME") + 1
     else:
         return row_size
+
+
+def validate_record_columns(names: Sequence[str], modes: Sequence[str], scores: Sequence[int]) -> None:
+    """
+    Validates records given by columns, every check runs over a whole column at once
+    :param names: - names of the players
+    :param modes: - modes of the games
+    :param scores: - scores of the players
+    """
+    if not all(names):
+        raise EmptyInputError
+    text = ''.join(names)
+    if text != ''.join(text.split()):
+        raise WhiteSpaceInputError
+    if not MODE_NAMES.issuperset(modes):
+        raise IncorrectModeError
+    if not {int}.issuperset(map(type, scores)) or (scores and min(scores) < 0):
+        raise IncorrectScoreError
+
+
+def validate_record_rows(rows: Iterable[tuple[str, str, int]], chunk_size: int = VALIDATION_CHUNK_SIZE) -> int:
+    """
+    Validates imported records by chunks small enough to keep the columns in cache
+    :param rows: - (name, mode, score) rows
+    :param chunk_size: - rows validated at once
+    :return: number of validated rows
+    """
+    rows = iter(rows)
+    validated = 0
+    while chunk := list(islice(rows, chunk_size)):
+        validate_record_columns(list(map(_NAME, chunk)), list(map(_MODE, chunk)), list(map(_SCORE, chunk)))
+        validated += len(chunk)
+    return validated
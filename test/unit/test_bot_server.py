@@ -0,0 +1,156 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from settings import MODE_NORMAL
+from source.bot_server import BotSession, BotServer, BatchResult, QUIT
+from source.score_stats import ScoreStats, ScoreStatsStore
+from source.session_manager import SessionManager
+from source.strategies import EnemyStrategy, ATTACKS, BEATS, START
+
+# the enemy opens with paper and then beats the previous attack of the player
+COUNTER = EnemyStrategy({START: (1, 0, 0), **{attack: tuple(float(other == BEATS[attack]) for other in ATTACKS)
+                                              for attack in ATTACKS}})
+
+
+class TestBotSession(unittest.TestCase):
+    def setUp(self):
+        self.persister = MagicMock()
+
+    def session(self):
+        return BotSession("Bot", MODE_NORMAL, seed=7, persister=self.persister)
+
+    def test_batching_does_not_change_results(self):
+        codes = b'123' * 200
+        whole, split = self.session(), self.session()
+        whole_results, split_results = [], []
+        rest = codes
+        while rest:
+            result = whole.play(rest)
+            whole_results.append(result)
+            rest = rest[result.rounds:]
+        rest = codes
+        while rest:
+            result = split.play(rest[:2])
+            split_results.append(result)
+            rest = rest[result.rounds:]
+        self.assertEqual(whole.games, split.games)
+        self.assertEqual([result[2:] for result in whole_results if result.outcome == 'game_over'],
+                         [result[2:] for result in split_results if result.outcome == 'game_over'])
+
+    def test_game_over_starts_new_game(self):
+        session = self.session()
+        while session.games == 1:
+            result = session.play(b'1' * 100)
+        self.assertEqual((result.outcome, result.lives), ('game_over', 0))
+        self.assertEqual(session.game.player.lives, 2)
+
+    def test_enemy_down_shows_next_enemy(self):
+        session = self.session()
+        result = session.play(b'1' * 100)
+        while result.outcome != 'enemy_down':
+            result = session.play(b'1' * 100)
+        self.assertEqual(result.enemy_lives, result.level)
+
+    def test_quit(self):
+        result = self.session().play(b'0111')
+        self.assertEqual(result, BatchResult(0, QUIT, 2, 1, 1, 0))
+
+    def test_enemy_strategy(self):
+        session = BotSession("Bot", MODE_NORMAL, seed=7, persister=self.persister, enemy_strategy=COUNTER)
+        self.assertEqual(session.play(b'1' * 100), BatchResult(3, 'game_over', 0, 1, 1, 0))
+
+
+class TestBotServer(unittest.TestCase):
+    def exchange(self, lines, sessions=None, enemy_strategy=None):
+        async def run():
+            server = BotServer(port=0, persister=MagicMock(), sessions=sessions, enemy_strategy=enemy_strategy)
+            async with await server.start():
+                reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+                writer.write(b''.join(line + b'\n' for line in lines))
+                replies = [await reader.readline() for _ in lines]
+                writer.close()
+                return replies
+
+        return asyncio.run(run())
+
+    def test_pipelined(self):
+        replies = self.exchange([b'Bot 1 7', b'1', b'2', b'abc', b'0'])
+        self.assertEqual(replies[0], b'0 ready 2 1 1 0\n')
+        self.assertEqual(replies[1].split()[0], b'1')
+        self.assertEqual(replies[3], b'error Incorrect input.\n')
+        self.assertEqual(replies[4].split()[:2], [b'0', b'quit'])
+
+    def test_enemy_strategy(self):
+        replies = self.exchange([b'Bot 1 7', b'1', b'1', b'1'], enemy_strategy=COUNTER)
+        self.assertEqual([reply.split()[:3] for reply in replies[1:]],
+                         [[b'1', b'draw', b'2'], [b'1', b'player_missed', b'1'], [b'1', b'game_over', b'0']])
+
+    def test_stats_flushed_while_serving(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            stats = ScoreStatsStore(tmp_dir, writer='w1')
+
+            async def run():
+                server = BotServer(port=0, persister=MagicMock(), enemy_strategy=COUNTER, stats=stats,
+                                   stats_flush_interval=0.01)
+                async with await server.start():
+                    reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+                    writer.write(b'Bot 1 7\n111\n')
+                    replies = [await reader.readline() for _ in range(2)]
+                    for _ in range(500):
+                        if os.path.exists(stats.path):
+                            break
+                        await asyncio.sleep(0.01)
+                    writer.close()
+                    return replies
+
+            replies = asyncio.run(run())
+            self.assertEqual(replies[1].split()[:2], [b'3', b'game_over'])
+            self.assertEqual(ScoreStats.load(stats.path).histogram(MODE_NORMAL).count, 1)
+            self.assertFalse(stats.changed)
+
+    def test_incorrect_mode(self):
+        self.assertEqual(self.exchange([b'Bot 5']), [b'error Incorrect mode: 5.\n'])
+
+    def test_server_full(self):
+        async def run():
+            server = BotServer(port=0, persister=MagicMock(), sessions=SessionManager(max_sessions=1))
+            async with await server.start():
+                first = await asyncio.open_connection('127.0.0.1', server.port)
+                first[1].write(b'Bot 1\n')
+                await first[0].readline()
+                reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+                reply = await reader.readline()
+                for stream_writer in (first[1], writer):
+                    stream_writer.close()
+                return reply
+
+        self.assertEqual(asyncio.run(run()), b'error Server is full.\n')
+
+    def test_idle_connection_expires(self):
+        for save in (True, False):
+            persister = MagicMock()
+
+            async def run():
+                sessions = SessionManager(idle_timeout=0.05, save_expired=save, tick=0.01)
+                server = BotServer(port=0, persister=persister, sessions=sessions)
+                async with await server.start():
+                    reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+                    writer.write(b'Bot 1 7\n' + b'3' * 3 + b'\n')
+                    replies = [await reader.readline() for _ in range(3)]
+                    writer.close()
+                    return replies, len(sessions)
+
+            with self.subTest(save=save):
+                replies, active = asyncio.run(run())
+                self.assertEqual((replies[2], active), (b'error Session expired.\n', 0))
+                self.assertEqual(persister.submit.called, save)
+
+    def test_rounds_per_turn(self):
+        with patch('source.bot_server.BOT_ROUNDS_PER_TURN', 4):
+            replies = self.exchange([b'Bot 1 7'] + [b'3'] * 20 + [b'0'])
+        self.assertEqual(len(replies), 22)
+        self.assertTrue(all(reply.split()[0] == b'1' for reply in replies[1:21]))
+        self.assertEqual(replies[21].split()[:2], [b'0', b'quit'])
@@ -0,0 +1,94 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from settings import MODE_NORMAL, MODE_HARD, PAPER, DIFFICULTY_MAX_LIVES
+from source.difficulty import Curve, DifficultyTable, Difficulty, DEFAULT_DIFFICULTY, load_difficulty, LINEAR, \
+    EXPONENTIAL, STEPPED, DATA
+from source.exceptions import IncorrectDifficultyError, IncorrectLevelError
+from source.game import Game
+from source.models import Enemy
+from source.strategies import CONTEXTS, ATTACKS
+
+ALWAYS_PAPER = {context: [1, 0, 0] for context in CONTEXTS}
+
+
+class TestCurve(unittest.TestCase):
+    def test_linear(self):
+        self.assertEqual(Curve(LINEAR, 2, 3).values(1, 5), [2, 5, 8, 11])
+        self.assertEqual(Curve(LINEAR, 4, 0).values(3, 5), [4, 4])
+
+    def test_exponential(self):
+        self.assertEqual(Curve(EXPONENTIAL, 1, growth=2).values(1, 6), [1, 2, 4, 8, 16])
+        self.assertEqual(Curve(EXPONENTIAL, 1, growth=2).values(100, 102), [DIFFICULTY_MAX_LIVES] * 2)
+
+    def test_stepped(self):
+        self.assertEqual(Curve(STEPPED, 1, 2, every=3).values(1, 8), [1, 1, 1, 3, 3, 3, 5])
+
+    def test_data(self):
+        self.assertEqual(Curve(DATA, data=(3, 1, 4)).values(2, 6), [1, 4, 4, 4])
+
+    def test_incorrect(self):
+        with self.assertRaises(IncorrectDifficultyError):
+            Curve('sine')
+        with self.assertRaises(IncorrectDifficultyError):
+            Curve.from_dict({'curve': DATA})
+        with self.assertRaises(IncorrectDifficultyError):
+            Curve.from_dict({'base': 1})
+
+
+class TestDifficultyTable(unittest.TestCase):
+    def test_default_same_as_enemy(self):
+        for mode in (MODE_NORMAL, MODE_HARD):
+            table = DEFAULT_DIFFICULTY.table(mode)
+            for level in (1, 2, 7, 1000):
+                self.assertEqual(table.spawn(level).lives, Enemy(mode, level).lives)
+
+    def test_extends(self):
+        table = DifficultyTable(MODE_NORMAL, Curve(LINEAR), Curve(LINEAR, 5, 0), levels=4)
+        self.assertEqual(len(table), 4)
+        self.assertEqual(table.spawn(10 ** 5).lives, 10 ** 5)
+        self.assertEqual(len(table), 10 ** 5)
+        self.assertEqual(table.killing_points(10 ** 5), 5)
+        with self.assertRaises(IncorrectLevelError):
+            table.spawn(0)
+
+    def test_strategies(self):
+        difficulty = Difficulty({MODE_HARD: {'strategies': [{'from_level': 3, 'weights': ALWAYS_PAPER}]}})
+        table = difficulty.table(MODE_HARD)
+        self.assertIsNone(table.spawn(2).strategy)
+        self.assertEqual(table.spawn(3).attack(), PAPER)
+        self.assertEqual(table.spawn(5000).attack(), PAPER)
+        self.assertIn(table.spawn(1, strategy=table.strategies[3]).attack(), ATTACKS)
+
+    def test_incorrect_config(self):
+        with self.assertRaises(IncorrectDifficultyError):
+            Difficulty({'Easy': {}})
+        with self.assertRaises(IncorrectDifficultyError):
+            Difficulty({MODE_HARD: {'strategies': [{'from_level': 3}]}}).table(MODE_HARD)
+
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'difficulty.json')
+            with open(path, 'w') as file:
+                json.dump({MODE_NORMAL: {'lives': {'curve': STEPPED, 'base': 2, 'step': 1, 'every': 2}}}, file)
+            self.assertEqual(load_difficulty(path).table(MODE_NORMAL).lives[1:5], [2, 2, 3, 3])
+            with open(path, 'w') as file:
+                file.write('[1]')
+            with self.assertRaises(IncorrectDifficultyError):
+                load_difficulty(path)
+
+
+class TestGameDifficulty(unittest.TestCase):
+    @patch("builtins.input")
+    def test_level_step_and_points(self, mock_input):
+        mock_input.side_effect = ['Vlad']
+        difficulty = Difficulty({MODE_NORMAL: {'points': {'curve': LINEAR, 'base': 10, 'step': 10},
+                                               'level_step': 5}})
+        game = Game(mode=MODE_NORMAL, difficulty=difficulty, headless=True)
+        game.begin()
+        self.assertEqual((game.enemy.level, game.battle.points_for_killing), (1, 10))
+        game.new_enemy()
+        self.assertEqual((game.enemy.level, game.enemy.lives, game.battle.points_for_killing), (6, 6, 60))
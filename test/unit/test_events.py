@@ -0,0 +1,93 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from settings import MODE_NORMAL, WIN, PAPER, STONE
+from source.events import EventBus, RoundResolvedEvent, EnemyDownEvent, GameOverEvent, THREAD, BATCH
+from source.exceptions import IncorrectDispatchTypeError, EnemyDown
+from source.game import Game
+from source.models import Player, Enemy, Battle
+
+
+class TestEventBus(unittest.TestCase):
+    def test_inline(self):
+        received = []
+        bus = EventBus()
+        bus.subscribe(GameOverEvent, received.append)
+        bus.emit(GameOverEvent("Vlad", MODE_NORMAL, 3))
+        self.assertEqual(received, [GameOverEvent("Vlad", MODE_NORMAL, 3)])
+
+    def test_other_event_type_ignored(self):
+        received = []
+        bus = EventBus()
+        bus.subscribe(GameOverEvent, received.append)
+        bus.emit(EnemyDownEvent("Vlad", MODE_NORMAL, 1, 6))
+        self.assertEqual(received, [])
+
+    def test_thread(self):
+        received = []
+        lock = threading.Lock()
+
+        def handler(event):
+            with lock:
+                received.append(event)
+
+        with EventBus() as bus:
+            bus.subscribe(GameOverEvent, handler, dispatch=THREAD)
+            for score in range(10):
+                bus.emit(GameOverEvent("Vlad", MODE_NORMAL, score))
+        self.assertEqual(sorted(event.score for event in received), list(range(10)))
+
+    def test_batch(self):
+        batches = []
+        with EventBus() as bus:
+            bus.subscribe(GameOverEvent, batches.append, dispatch=BATCH, batch_size=4, flush_interval=60)
+            for score in range(10):
+                bus.emit(GameOverEvent("Vlad", MODE_NORMAL, score))
+        self.assertEqual(sorted(len(batch) for batch in batches), [2, 4, 4])
+
+    def test_batch_flushed_after_interval(self):
+        delivered = threading.Event()
+        batches = []
+
+        def handler(batch):
+            batches.append(batch)
+            delivered.set()
+
+        with EventBus() as bus:
+            bus.subscribe(GameOverEvent, handler, dispatch=BATCH, batch_size=100, flush_interval=0.2)
+            bus.emit(GameOverEvent("Vlad", MODE_NORMAL, 1))
+            bus.emit(GameOverEvent("Vlad", MODE_NORMAL, 2))
+            self.assertTrue(delivered.wait(5))
+            self.assertEqual([len(batch) for batch in batches], [2])
+
+    def test_incorrect_dispatch(self):
+        with self.assertRaises(IncorrectDispatchTypeError):
+            EventBus().subscribe(GameOverEvent, print, dispatch='wrong')
+
+
+class TestGameEvents(unittest.TestCase):
+    @patch('builtins.input')
+    def test_battle_emits(self, mock_input):
+        mock_input.side_effect = ['Vlad']
+        received = []
+        bus = EventBus()
+        bus.subscribe(RoundResolvedEvent, received.append)
+        bus.subscribe(EnemyDownEvent, received.append)
+        battle = Battle(Player(), Enemy(mode=MODE_NORMAL, level=1), MODE_NORMAL, events=bus)
+        with self.assertRaises(EnemyDown):
+            battle.handle_fight_result(WIN, PAPER, STONE)
+        self.assertEqual(received, [RoundResolvedEvent("Vlad", MODE_NORMAL, WIN, PAPER, STONE),
+                                    EnemyDownEvent("Vlad", MODE_NORMAL, 1, 6)])
+
+    @patch("source.game.Game.save_score")
+    @patch("source.models.randint")
+    @patch("builtins.input")
+    def test_game_over_emitted(self, mock_input, mock_randint, mock_save_score):
+        mock_input.side_effect = ['Vlad', "1", "3", "2", "2"]
+        mock_randint.return_value = 1
+        received = []
+        bus = EventBus()
+        bus.subscribe(GameOverEvent, received.append)
+        Game(events=bus).start_game()
+        self.assertEqual(received, [GameOverEvent("Vlad", MODE_NORMAL, 6)])
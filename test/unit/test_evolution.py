@@ -0,0 +1,35 @@
+import unittest
+from random import Random
+
+from settings import MODE_NORMAL
+from source.evolution import EnemyEvolution, player_score, play_game, normalized
+from source.strategies import EnemyStrategy
+
+
+class TestEvolution(unittest.TestCase):
+    def test_normalized(self):
+        self.assertEqual(normalized([1, 1, 2, 0, 0, 0, -1, 3, 0]), (0.25, 0.25, 0.5, 1 / 3, 1 / 3, 1 / 3, 0, 1, 0))
+
+    def test_play_game(self):
+        always_paper = EnemyStrategy.from_genome((1, 0, 0) * 4)
+        # stone always loses to paper: two rounds and the game is over
+        self.assertEqual(play_game(always_paper, 'stone', MODE_NORMAL, Random(1), 100), 0)
+        # scissors always wins: 1 + 5 points for every enemy level
+        self.assertEqual(play_game(always_paper, 'scissors', MODE_NORMAL, Random(1), 3), 13)
+
+    def test_player_score_same_seed(self):
+        genome = normalized(Random(2).random() for _ in range(12))
+        self.assertEqual(player_score(genome, games=3, seed=4), player_score(genome, games=3, seed=4))
+
+    def test_run(self):
+        evolution = EnemyEvolution(population=8, generations=4, games=3, max_rounds=50, workers=1, seed=1)
+        strategy = evolution.run()
+        self.assertEqual(evolution.fitness[strategy.genome()], min(evolution.fitness.values()))
+        self.assertEqual(evolution.best_scores, sorted(evolution.best_scores, reverse=True))
+        self.assertLess(len(evolution.fitness), 8 * 5)
+
+    def test_process_pool(self):
+        in_process = EnemyEvolution(population=4, generations=1, games=2, max_rounds=20, workers=1, seed=3)
+        pool = EnemyEvolution(population=4, generations=1, games=2, max_rounds=20, workers=2, seed=3)
+        self.assertEqual(in_process.run().weights, pool.run().weights)
+        self.assertEqual(in_process.fitness, pool.fitness)
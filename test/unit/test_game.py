@@ -1,10 +1,15 @@
+import io
+import os
+import tempfile
 import unittest
-from contextlib import nullcontext as does_not_raise
-from unittest.mock import patch
+from contextlib import nullcontext as does_not_raise, redirect_stdout
+from unittest.mock import MagicMock, patch
 
-from settings import MODE_NORMAL, MODE_HARD, TEST_FILE_PATH
-from source.game import Game
-from source.record import GameRecord
+from settings import MODE_NORMAL, MODE_HARD
+from source.exceptions import QuitApp
+from source.game import Game, play_script, main, score_menu
+from source.record import PlayerRecord
+from source.score_store import ShardedScoreStore
 
 
 class TestGameInitAndInputMode(unittest.TestCase):
@@ -50,15 +55,35 @@ class TestGameNewEnemy(unittest.TestCase):
 
 class TestGameSaveScore(unittest.TestCase):
 
-    @patch("source.record.get_score_file_path")
     @patch("builtins.input")
-    def test_game_init(self, mock_input, mock_get_score_file_path):
+    def test_game_init(self, mock_input):
         mock_input.side_effect = ['Vlad', "1"]
-        game = Game()
-        mock_get_score_file_path.return_value = TEST_FILE_PATH
-        game.save_score()
-        new_gr = GameRecord(MODE_NORMAL)
-        self.assertEqual(new_gr.records, game.game_record.records)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = ShardedScoreStore(tmp_dir, writer='w1')
+            game = Game(store=store)
+            game.player.score = 3
+            game.save_score()
+            self.assertEqual(store.top_rows(), [('Vlad', MODE_NORMAL, 3)])
+            self.assertEqual(os.listdir(tmp_dir), ['Normal.w1.txt'])
+
+    def test_below_threshold_skipped(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = ShardedScoreStore(tmp_dir, writer='w1', max_records=1)
+            store.save_record(PlayerRecord('Ivan', MODE_NORMAL, 5))
+            game = Game(name='Vlad', mode=MODE_NORMAL, headless=True, store=store, persister=MagicMock())
+            game.player.score = 4
+            game.save_score()
+            game.persister.submit.assert_not_called()
+
+    @patch("builtins.print")
+    def test_headless_duplicate_silent(self, mock_print):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = ShardedScoreStore(tmp_dir, writer='w1')
+            store.save_record(PlayerRecord('Vlad', MODE_NORMAL, 4))
+            game = Game(name='Vlad', mode=MODE_NORMAL, headless=True, store=store)
+            game.player.score = 4
+            game.save_score()
+        mock_print.assert_not_called()
 
 
 class TestGameStartPlay(unittest.TestCase):
@@ -73,4 +98,104 @@ class TestGameStartPlay(unittest.TestCase):
             game = Game()
             game.start_game()
 
+    @patch("builtins.print")
+    @patch("source.game.Game.save_score")
+    @patch("source.models.randint")
+    @patch("builtins.input")
+    def test_start_game_headless(self, mock_input, mock_randint, mock_save_score, mock_print):
+        mock_input.side_effect = ['Vlad', "1", "3", "3", "2", "2"]
+        mock_randint.return_value = 1
+        game = Game(headless=True)
+        game.start_game()
+        mock_print.assert_not_called()
+        self.assertEqual(game.enemy.level, 2)
+        self.assertIs(game.battle.enemy, game.enemy)
+
+
+class TestGamePlayAttacks(unittest.TestCase):
+
+    @patch("source.game.Game.save_score")
+    @patch("source.models.randint")
+    def test_play_attacks_game_over(self, mock_randint, mock_save_score):
+        mock_randint.return_value = 1
+        game = Game(name='Vlad', mode=MODE_NORMAL, headless=True)
+        self.assertTrue(game.play_attacks(["3", "wrong", "3", "2", "2", "1"]))
+        self.assertEqual(game.enemy.level, 2)
+        self.assertEqual(game.player.lives, 0)
+        mock_save_score.assert_called_once()
+
+    @patch("source.models.randint")
+    def test_play_attacks_ended(self, mock_randint):
+        mock_randint.return_value = 1
+        game = Game(name='Vlad', mode=MODE_HARD, headless=True)
+        self.assertFalse(game.play_attacks(["1", "3"]))
+        self.assertEqual(game.player.score, 2)
+
+    def test_play_attacks_quit(self):
+        game = Game(name='Vlad', mode=MODE_NORMAL, headless=True)
+        with self.assertRaises(QuitApp):
+            game.play_attacks(["0"])
+
+
+class TestPlayScript(unittest.TestCase):
 
+    @patch("source.game.WriteBehindPersister")
+    @patch("source.models.randint")
+    def test_summary(self, mock_randint, mock_persister):
+        mock_randint.return_value = 1
+        out = io.StringIO()
+        games = play_script(["Vlad 1 3322\n", "\n", "Ivan 2 1 0\n", "Oleg 7 1\n"], out)
+        self.assertEqual(games, 3)
+        self.assertEqual(out.getvalue(), "Vlad\tNormal\t7\t2\tLose\n"
+                                         "Ivan\tHard\t0\t1\tQuit\n"
+                                         "Oleg\tIncorrect mode: 7\n")
+
+    @patch("source.game.WriteBehindPersister")
+    @patch("source.models.randint")
+    def test_full_output(self, mock_randint, mock_persister):
+        mock_randint.return_value = 1
+        out = io.StringIO()
+        play_script(["Vlad 1 3 2 2\n"], out, full_output=True)
+        self.assertIn("You lose!", out.getvalue())
+        self.assertIn("Player: Vlad.", out.getvalue())
+
+    @patch("source.game.play_script")
+    def test_main_script(self, mock_play_script):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt') as script:
+            main(['--script', script.name])
+        mock_play_script.assert_called_once()
+
+    @patch("source.score_io.import_score_store")
+    def test_main_import_wrong_score(self, mock_store):
+        with tempfile.TemporaryDirectory() as directory:
+            mock_store.return_value = ShardedScoreStore(directory, writer='w1', max_records=None)
+            path = os.path.join(directory, 's.csv')
+            with open(path, 'w') as file:
+                file.write('name,mode,score\nVlad,Normal,5.7\n')
+            out = io.StringIO()
+            with redirect_stdout(out):
+                main(['--import-scores', path])
+        self.assertEqual(out.getvalue(), 'Not imported: scores must be non-negative integers.\n')
+
+
+class TestScoreMenu(unittest.TestCase):
+
+    @patch("source.game.default_score_store")
+    @patch("builtins.print")
+    @patch("builtins.input")
+    def test_search(self, mock_input, mock_print, mock_store):
+        mock_input.side_effect = ["5", "2", "vl"]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = ShardedScoreStore(tmp_dir, writer='w1', score_file=f'{tmp_dir}/scores.txt')
+            store.save_record(PlayerRecord("vlad", MODE_HARD, 4))
+            store.save_record(PlayerRecord("ivan", MODE_HARD, 8))
+            mock_store.return_value = store
+            score_menu()
+        mock_print.assert_called_with("NAME    MODE      SCORE\nvlad    Hard      4\n")
+
+    @patch("builtins.print")
+    @patch("builtins.input")
+    def test_search_not_found(self, mock_input, mock_print):
+        mock_input.side_effect = ["2", "\t"]
+        score_menu()
+        mock_print.assert_called_with("No players found.")
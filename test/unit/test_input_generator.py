@@ -71,5 +71,15 @@ class InputGeneratorTexts(unittest.TestCase):
 ----Mode----
 1 - Normal
 2 - Hard
+"""
+                         )
+
+    def test_score_menu(self):
+        self.assertEqual(InputGenerator("score_menu").text,
+                         """Please select an option from the list:
+----Score----
+1 - Show all scores
+2 - Search players by name prefix
+0 - Back
 """
                          )
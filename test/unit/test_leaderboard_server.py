@@ -0,0 +1,111 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from settings import MODE_NORMAL, MODE_HARD
+from source.game import Game
+from source.leaderboard_server import LeaderboardServer, LeaderboardSnapshot
+from source.record import PlayerRecord
+from source.score_store import ShardedScoreStore
+
+
+async def request(port, raw):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(raw)
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ')[1])
+    headers = dict(line.split(b': ', 1) for line in head.split(b'\r\n')[1:] if line)
+    body = await reader.readexactly(int(headers.get(b'Content-Length', 0)))
+    writer.close()
+    return status, headers, body
+
+
+class TestLeaderboardSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = ShardedScoreStore(self.tmp_dir.name, writer='w1')
+        self.store.save_record(PlayerRecord("Vlad", MODE_NORMAL, 5))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_render(self):
+        responses = LeaderboardSnapshot(self.store).current()
+        self.assertEqual(set(responses), {'/leaderboard', '/leaderboard/Normal', '/leaderboard/Hard'})
+        self.assertTrue(responses['/leaderboard/Normal'].ok.endswith(
+            b'{"mode": "Normal", "top": [{"name": "Vlad", "score": 5}]}'))
+
+    def test_same_until_store_changes(self):
+        snapshot = LeaderboardSnapshot(self.store, check_interval=0)
+        first = snapshot.current()
+        self.assertIs(snapshot.current(), first)
+        self.store.save_record(PlayerRecord("Olga", MODE_HARD, 7))
+        second = snapshot.current()
+        self.assertIsNot(second, first)
+        self.assertNotEqual(second['/leaderboard'].etag, first['/leaderboard'].etag)
+        self.assertEqual(second['/leaderboard/Normal'].etag, first['/leaderboard/Normal'].etag)
+
+    def test_check_interval(self):
+        snapshot = LeaderboardSnapshot(self.store, check_interval=60)
+        first = snapshot.current()
+        self.store.save_record(PlayerRecord("Olga", MODE_HARD, 7))
+        self.assertIs(snapshot.current(), first)
+
+
+class TestLeaderboardServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = ShardedScoreStore(self.tmp_dir.name, writer='w1')
+        self.store.save_record(PlayerRecord("Vlad", MODE_NORMAL, 5))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_requests(self, *raw_requests):
+        async def run():
+            server = LeaderboardServer(self.store, port=0)
+            listener = await server.start()
+            try:
+                return [await request(server.port, raw) for raw in raw_requests]
+            finally:
+                listener.close()
+                await listener.wait_closed()
+        return asyncio.run(run())
+
+    def test_get(self):
+        [(status, headers, body)] = self.run_requests(b'GET /leaderboard HTTP/1.1\r\nHost: x\r\n\r\n')
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), {MODE_NORMAL: [{"name": "Vlad", "score": 5}], MODE_HARD: []})
+        self.assertIn(b'ETag', headers)
+
+    def test_not_modified(self):
+        [(_, headers, _)] = self.run_requests(b'GET /leaderboard/Normal HTTP/1.1\r\n\r\n')
+        [(status, _, body)] = self.run_requests(
+            b'GET /leaderboard/Normal HTTP/1.1\r\nIf-None-Match: ' + headers[b'ETag'] + b'\r\n\r\n')
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b'')
+
+    def test_not_found(self):
+        [(status, _, _)] = self.run_requests(b'GET /scores HTTP/1.1\r\n\r\n')
+        self.assertEqual(status, 404)
+
+    def test_not_allowed(self):
+        [(status, _, _)] = self.run_requests(b'POST /leaderboard HTTP/1.1\r\n\r\n')
+        self.assertEqual(status, 405)
+
+    @patch('source.models.randint')
+    @patch('builtins.input')
+    def test_played_game(self, mock_input, mock_randint):
+        mock_input.side_effect = ["1", "3", "2", "2"]
+        mock_randint.return_value = 1
+        store = ShardedScoreStore(self.tmp_dir.name)
+        with patch('source.score_store._default_store', store):
+            game = Game(name="Olga", mode=MODE_HARD, headless=True)
+            game.start_game()
+            self.store = None
+            [(status, _, body)] = self.run_requests(b'GET /leaderboard/Hard HTTP/1.1\r\nHost: x\r\n\r\n')
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), {'mode': MODE_HARD, 'top': [{"name": "Olga", "score": game.player.score}]})
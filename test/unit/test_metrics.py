@@ -0,0 +1,135 @@
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from unittest.mock import MagicMock
+
+from settings import MODE_NORMAL, MODE_HARD, WIN, DRAW, LOSE, PAPER, STONE, SCISSORS
+from source.exceptions import IncorrectFightResult
+from source.game import Game
+from source.metrics import MetricsRegistry, MetricsServer, METRICS, METRICS_PATH
+from source.models import Player, Enemy, Battle
+
+
+def battle() -> Battle:
+    player = Player('Vlad')
+    player.lives = 100
+    enemy = Enemy(MODE_HARD, 1)
+    enemy.lives = 100
+    return Battle(player, enemy, MODE_HARD, headless=True)
+
+
+class TestBattleMetrics(unittest.TestCase):
+    def setUp(self):
+        METRICS.enabled = True
+
+    def tearDown(self):
+        METRICS.enabled = False
+
+    def test_disabled(self):
+        METRICS.enabled = False
+        before = METRICS.totals().fights
+        fights = battle()
+        fights.play_round(PAPER, STONE)
+        fights.count_fights()
+        self.assertEqual(METRICS.totals().fights, before)
+        self.assertEqual((fights.wins, fights.draws, fights.losses), (0, 0, 0))
+
+    def test_rounds_by_result(self):
+        before = METRICS.totals().fights
+        fights = battle()
+        fights.play_round(PAPER, STONE)
+        fights.play_round(PAPER, SCISSORS)
+        fights.play_round(PAPER, PAPER)
+        self.assertEqual(METRICS.totals().fights, before)
+        fights.resolve_codes(b'1111', b'2332')
+        after = METRICS.totals().fights
+        self.assertEqual([after[result] - before[result] for result in (WIN, LOSE, DRAW)], [3, 3, 1])
+        with self.assertRaises(IncorrectFightResult):
+            fights.resolve(2)
+
+    def test_shard_of_every_thread(self):
+        registry = MetricsRegistry()
+
+        def play() -> None:
+            registry.shard().fights[WIN] += 5
+
+        threads = [threading.Thread(target=play) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(registry.totals().fights[WIN], 20)
+
+
+class TestGameMetrics(unittest.TestCase):
+    def setUp(self):
+        METRICS.enabled = True
+
+    def tearDown(self):
+        METRICS.enabled = False
+
+    def test_rounds_counted_per_game(self):
+        before = sum(METRICS.totals().fights)
+        game = Game(MagicMock(), name='Vlad', mode=MODE_NORMAL, headless=True)
+        game.begin()
+        game.player.lives = 100
+        self.assertFalse(game.play_attacks(['1', 'x', '2', '3']))
+        self.assertEqual(sum(METRICS.totals().fights) - before, 3)
+
+    def test_save_score(self):
+        before = METRICS.totals()
+        game = Game(MagicMock(), name='Vlad', mode=MODE_NORMAL, headless=True)
+        game.player.score = 0
+        game.save_score()
+        after = METRICS.totals()
+        self.assertEqual(after.games_over[MODE_NORMAL] - before.games_over[MODE_NORMAL], 1)
+        self.assertEqual(sum(after.save_buckets) - sum(before.save_buckets), 1)
+
+    def test_save_score_disabled(self):
+        METRICS.enabled = False
+        before = METRICS.totals()
+        game = Game(MagicMock(), name='Vlad', mode=MODE_NORMAL, headless=True)
+        game.player.score = 0
+        game.save_score()
+        after = METRICS.totals()
+        self.assertEqual((after.games_over, after.save_buckets), (before.games_over, before.save_buckets))
+
+
+class TestRender(unittest.TestCase):
+    def test_prometheus_text(self):
+        registry = MetricsRegistry()
+        shard = registry.shard()
+        shard.fights[WIN] += 3
+        shard.fights[LOSE] += 1
+        shard.games_over[MODE_HARD] += 2
+        shard.observe_save(0.002)
+        shard.observe_save(100)
+        registry.gauge('rps_queue_depth', 'Depth.', lambda: 7)
+        text = registry.render().decode()
+        self.assertIn('rps_rounds_total 4\n', text)
+        self.assertIn('rps_fights_total{result="win"} 3\n', text)
+        self.assertIn(f'rps_games_over_total{{mode="{MODE_HARD}"}} 2\n', text)
+        self.assertIn('rps_score_save_seconds_bucket{le="0.001"} 0\n', text)
+        self.assertIn('rps_score_save_seconds_bucket{le="0.0025"} 1\n', text)
+        self.assertIn('rps_score_save_seconds_bucket{le="+Inf"} 2\n', text)
+        self.assertIn('rps_score_save_seconds_count 2\n', text)
+        self.assertIn('# TYPE rps_queue_depth gauge\nrps_queue_depth 7\n', text)
+        registry.remove_gauge('rps_queue_depth')
+        self.assertNotIn('rps_queue_depth', registry.render().decode())
+
+
+class TestMetricsServer(unittest.TestCase):
+    def test_scrape(self):
+        registry = MetricsRegistry()
+        registry.shard().active += 1
+        server = MetricsServer(registry, port=0)
+        server.start()
+        try:
+            with urllib.request.urlopen(f'http://{server.host}:{server.port}{METRICS_PATH}') as response:
+                self.assertTrue(response.headers['Content-Type'].startswith('text/plain; version=0.0.4'))
+                self.assertIn(b'rps_active_sessions 1\n', response.read())
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(f'http://{server.host}:{server.port}/other')
+        finally:
+            server.stop()
@@ -1,10 +1,13 @@
+import tracemalloc
 import unittest
 from contextlib import nullcontext as does_not_raise
-from unittest.mock import patch
+from random import Random
+from unittest.mock import patch, MagicMock
 
 from settings import PLAYER_LIVES, ATTACK_PAIRS_OUTCOME, PAPER, STONE, SCISSORS, WIN, LOSE, DRAW
+from source import models
 from source.exceptions import IncorrectLevelError, IncorrectModeError, EnemyDown, GameOver, IncorrectFightResult
-from source.models import Enemy, Player, QuitApp, Battle
+from source.models import Enemy, Player, QuitApp, Battle, FightOutcome, FightResult, enemy_attack_codes
 
 
 class TestEnemyCreation(unittest.TestCase):
@@ -303,3 +306,119 @@ class TestAttackPairs(unittest.TestCase):
         player_attack = STONE
         enemy_attack = STONE
         self.assertEqual(ATTACK_PAIRS_OUTCOME[(player_attack, enemy_attack)], DRAW)
+
+
+class TestBattleResolve(unittest.TestCase):
+
+    @patch('builtins.input')
+    def setUp(self, mock_input):
+        mock_input.side_effect = ['Vlad']
+        player = Player()
+        enemy = Enemy(mode='Normal', level=2)
+        self.battle = Battle(player=player, enemy=enemy, mode='Normal')
+
+    def test_resolve_incorrect(self):
+        with self.assertRaises(IncorrectFightResult):
+            self.battle.resolve(2)
+
+    def test_resolve_draw(self):
+        self.assertEqual(self.battle.resolve(DRAW), FightResult(FightOutcome.DRAW, PLAYER_LIVES, 2, 0))
+
+    def test_resolve_hit_and_enemy_down(self):
+        self.assertEqual(self.battle.resolve(WIN), FightResult(FightOutcome.PLAYER_HIT, PLAYER_LIVES, 1, 1))
+        self.assertEqual(self.battle.resolve(WIN), FightResult(FightOutcome.ENEMY_DOWN, PLAYER_LIVES, 0, 7))
+
+    def test_resolve_missed_and_game_over(self):
+        self.assertEqual(self.battle.resolve(LOSE), FightResult(FightOutcome.PLAYER_MISSED, 1, 2, 0))
+        self.assertEqual(self.battle.resolve(LOSE), FightResult(FightOutcome.GAME_OVER, 0, 2, 0))
+
+    def test_lose_fight_flags(self):
+        self.assertFalse(self.battle.enemy.lose_fight())
+        self.assertTrue(self.battle.enemy.lose_fight())
+        self.assertFalse(self.battle.player.lose_fight())
+        self.assertTrue(self.battle.player.lose_fight())
+
+
+class TestBattleRoundAllocations(unittest.TestCase):
+
+    @patch('builtins.input')
+    def setUp(self, mock_input):
+        mock_input.side_effect = ['Vlad']
+        player = Player()
+        player.lives = 10 ** 6
+        enemy = Enemy(mode='Hard', level=10 ** 6)
+        self.battle = Battle(player=player, enemy=enemy, mode='Hard', headless=True)
+        self.attacks = [(PAPER, STONE), (STONE, PAPER), (SCISSORS, SCISSORS)]
+
+    def play_rounds(self, rounds):
+        for i in range(rounds):
+            self.battle.play_round(*self.attacks[i % 3])
+
+    def test_zero_net_allocations_per_round(self):
+        self.play_rounds(1000)  # score leaves the small int cache
+        tracemalloc.start()
+        try:
+            self.play_rounds(10)
+            before = tracemalloc.take_snapshot()
+            self.play_rounds(1000)
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        source_filter = [tracemalloc.Filter(True, models.__file__)]
+        diff = after.filter_traces(source_filter).compare_to(before.filter_traces(source_filter), 'filename')
+        self.assertEqual(sum(stat.size_diff for stat in diff), 0)
+
+
+class TestEnemyRng(unittest.TestCase):
+    def test_session_rng(self):
+        first = Enemy(mode='Normal', level=1, rng=Random(5))
+        second = Enemy(mode='Normal', level=1, rng=Random(5))
+        self.assertEqual([first.attack() for _ in range(20)], [second.attack() for _ in range(20)])
+        self.assertTrue(set(first.attack() for _ in range(50)) <= {PAPER, STONE, SCISSORS})
+
+
+class TestBattleResolveCodes(unittest.TestCase):
+    def battle(self, events=None):
+        return Battle(Player('Vlad'), Enemy(mode='Hard', level=3), mode='Hard', events=events)
+
+    def test_bulk_same_as_by_round(self):
+        rng = Random(3)
+        for _ in range(50):
+            player_codes = bytes(rng.choice(b'123') for _ in range(rng.randrange(1, 20)))
+            enemy_codes = enemy_attack_codes(rng, len(player_codes))
+            bulk, by_round = self.battle(), self.battle(events=MagicMock())
+            self.assertEqual(bulk.resolve_codes(player_codes, enemy_codes),
+                             by_round.resolve_codes(player_codes, enemy_codes))
+            self.assertEqual((bulk.player.lives, bulk.player.score, bulk.enemy.lives),
+                             (by_round.player.lives, by_round.player.score, by_round.enemy.lives))
+
+    def test_bulk_windows(self):
+        rng = Random(4)
+        player_codes = bytes(rng.choice(b'123') for _ in range(1000))
+        enemy_codes = enemy_attack_codes(rng, 1000)
+        bulk, by_round = self.battle(), self.battle(events=MagicMock())
+        for battle in (bulk, by_round):
+            battle.player.lives = 400
+            battle.enemy.lives = 300
+        self.assertEqual(bulk.resolve_codes(player_codes, enemy_codes),
+                         by_round.resolve_codes(player_codes, enemy_codes))
+        self.assertEqual((bulk.player.lives, bulk.player.score, bulk.enemy.lives),
+                         (by_round.player.lives, by_round.player.score, by_round.enemy.lives))
+
+    def test_stops_at_enemy_down(self):
+        battle = self.battle()
+        self.assertEqual(battle.resolve_codes(b'1111111111', b'2222222222'), (6, FightOutcome.ENEMY_DOWN))
+        self.assertEqual((battle.player.score, battle.enemy.lives), (22, 0))
+
+    def test_stops_at_game_over(self):
+        battle = self.battle()
+        self.assertEqual(battle.resolve_codes(b'21111', b'13222'), (2, FightOutcome.GAME_OVER))
+        self.assertEqual(battle.player.lives, 0)
+
+    def test_empty(self):
+        self.assertEqual(self.battle().resolve_codes(b'', b''), (0, FightOutcome.DRAW))
+
+    def test_enemy_attack_codes(self):
+        codes = enemy_attack_codes(Random(1), 3000)
+        self.assertEqual(len(codes), 3000)
+        self.assertEqual(set(codes), set(b'123'))
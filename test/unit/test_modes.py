@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+import unittest
+
+from settings import MODE_NORMAL, MODE_HARD, MODES, PLAYER_LIVES
+from source.exceptions import IncorrectModeError, IncorrectModeConfigError
+from source.input_generator import load_input_options
+from source.models import Enemy, Battle, Player, fight_points, killing_points
+from source.modes import ModeRegistry, ModeProfile, MODE_REGISTRY, compile_mode, load_modes, mode_profile
+from source.score_store import ShardedScoreStore
+
+CONFIG = [
+    {"option": "1", "name": "Normal", "multiplier": 1},
+    {"option": "2", "name": "Hard", "multiplier": 2},
+    {"option": "3", "name": "Nightmare", "multiplier": 3},
+    {"option": "4", "name": "Blitz", "title": "Blitz (one life)", "player_lives": 1, "killing_points": 10},
+]
+
+
+class TestModeRegistry(unittest.TestCase):
+    def test_default_modes(self):
+        self.assertEqual(MODE_REGISTRY.options, MODES)
+        self.assertEqual(mode_profile(MODE_NORMAL), ModeProfile(MODE_NORMAL, '1', MODE_NORMAL, 1, 5, 1, PLAYER_LIVES))
+        self.assertEqual(mode_profile(MODE_HARD), ModeProfile(MODE_HARD, '2', MODE_HARD, 2, 10, 2, PLAYER_LIVES))
+        with self.assertRaises(IncorrectModeError):
+            mode_profile('Easy')
+
+    def test_new_modes(self):
+        registry = ModeRegistry(CONFIG)
+        self.assertEqual(len(registry), 4)
+        self.assertEqual(registry.profile('Nightmare')[3:], (3, 15, 3, PLAYER_LIVES))
+        self.assertEqual(registry.profile('Blitz')[3:], (1, 10, 1, 1))
+        self.assertEqual(registry.menu_options()['4'], 'Blitz (one life)')
+        self.assertEqual([profile.name for profile in registry], ['Normal', 'Hard', 'Nightmare', 'Blitz'])
+
+    def test_profile_frozen(self):
+        with self.assertRaises(AttributeError):
+            mode_profile(MODE_HARD).fight_points = 100
+
+    def test_incorrect_config(self):
+        for config in ([], {}, [{"name": "Normal"}], CONFIG + [{"option": "5", "name": "Hard"}],
+                       CONFIG + [{"option": "1", "name": "Easy"}], [{"option": "1", "name": "Very Hard"}],
+                       [{"option": "1", "name": "Hard.2"}], [{"option": "1", "name": "x" * 17}],
+                       [{"option": "1", "name": "Easy", "player_lives": 0}],
+                       [{"option": "1", "name": "Easy", "multiplier": "many"}]):
+            with self.subTest(config=config), self.assertRaises(IncorrectModeConfigError):
+                ModeRegistry(config)
+
+    def test_compile_defaults(self):
+        self.assertEqual(compile_mode({"option": 7, "name": "Easy"}), ModeProfile('Easy', '7', 'Easy', 1, 5, 1, 2))
+
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'modes.json')
+            with open(path, 'w') as file:
+                json.dump(CONFIG, file)
+            self.assertEqual(load_modes(path).options['3'], 'Nightmare')
+            with open(path, 'w') as file:
+                file.write('{')
+            with self.assertRaises(IncorrectModeConfigError):
+                load_modes(path)
+
+
+class TestModeProfileUsage(unittest.TestCase):
+    def test_scoring(self):
+        self.assertEqual((fight_points(MODE_HARD), killing_points(MODE_HARD)), (2, 10))
+        battle = Battle(Player('Vlad'), Enemy(MODE_HARD, 3), MODE_HARD, headless=True)
+        self.assertEqual((battle.enemy.lives, battle.points_for_fight, battle.points_for_killing), (6, 2, 10))
+        with self.assertRaises(IncorrectModeError):
+            Enemy('Easy', 1)
+
+    def test_mode_input_options(self):
+        self.assertEqual(load_input_options('mode'), MODE_REGISTRY.menu_options())
+
+    def test_shards_of_removed_modes_skipped(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for filename in ('Normal.w1.txt', 'Nightmare.w1.txt'):
+                open(os.path.join(tmp_dir, filename), 'w').close()
+            self.assertEqual([shard.mode for shard in ShardedScoreStore(tmp_dir, 'w1').shards()], [MODE_NORMAL])
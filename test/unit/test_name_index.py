@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+
+from settings import MODE_NORMAL, MODE_HARD
+from source.name_index import NameIndex
+from source.record import PlayerRecord
+from source.score_store import ShardedScoreStore
+
+ROWS = [("vlad", MODE_NORMAL, 5), ("vlad", MODE_NORMAL, 9), ("vlad", MODE_HARD, 3),
+        ("valya", MODE_HARD, 12), ("ivan", MODE_NORMAL, 7), ("v", MODE_NORMAL, 1)]
+
+
+class TestNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = NameIndex(ROWS)
+
+    def test_len(self):
+        self.assertEqual(len(self.index), 4)
+
+    def test_search(self):
+        self.assertEqual(self.index.search("va"), [("valya", {MODE_HARD: 12})])
+
+    def test_best_score_per_mode(self):
+        self.assertEqual(self.index.search("vl"), [("vlad", {MODE_NORMAL: 9, MODE_HARD: 3})])
+
+    def test_search_sorted(self):
+        self.assertEqual([name for name, _ in self.index.search("v")], ["v", "valya", "vlad"])
+
+    def test_search_limit(self):
+        self.assertEqual([name for name, _ in self.index.search("v", limit=2)], ["v", "valya"])
+
+    def test_search_empty_prefix(self):
+        self.assertEqual(len(self.index.search("")), 4)
+
+    def test_search_not_found(self):
+        self.assertEqual(self.index.search("x"), [])
+
+    def test_add(self):
+        self.index.add("vasya", MODE_NORMAL, 2)
+        self.index.add("ivan", MODE_NORMAL, 1)
+        self.assertEqual(self.index.search("va"), [("valya", {MODE_HARD: 12}), ("vasya", {MODE_NORMAL: 2})])
+        self.assertEqual(self.index.search("iv"), [("ivan", {MODE_NORMAL: 7})])
+
+
+class TestStoreNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp_dir.name, 'scores')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_kept_up_to_date(self):
+        store = ShardedScoreStore(self.directory, writer='w1', max_records=None)
+        store.save_record(PlayerRecord("vlad", MODE_NORMAL, 5))
+        index = store.name_index()
+        store.save_record(PlayerRecord("valya", MODE_HARD, 12))
+        self.assertIs(store.name_index(), index)
+        self.assertEqual([name for name, _ in index.search("v")], ["valya", "vlad"])
+
+    def test_rebuilt_after_cut(self):
+        store = ShardedScoreStore(self.directory, writer='w1', max_records=1)
+        store.save_record(PlayerRecord("vlad", MODE_NORMAL, 5))
+        store.name_index()
+        store.save_record(PlayerRecord("valya", MODE_NORMAL, 12))
+        self.assertEqual(store.name_index().search("v"), [("valya", {MODE_NORMAL: 12})])
+
+    def test_reused_until_store_changes(self):
+        store = ShardedScoreStore(self.directory, writer='w1')
+        store.save_record(PlayerRecord("vlad", MODE_NORMAL, 5))
+        index = store.name_index()
+        self.assertIs(store.name_index(), index)
+        ShardedScoreStore(self.directory, writer='w2').save_record(PlayerRecord("valya", MODE_HARD, 12))
+        self.assertIsNot(store.name_index(), index)
+        self.assertEqual([name for name, _ in store.name_index().search("v")], ["valya", "vlad"])
+
+    def test_other_writer_not_missed(self):
+        store = ShardedScoreStore(self.directory, writer='w1', max_records=None)
+        store.name_index()
+        ShardedScoreStore(self.directory, writer='w2').save_record(PlayerRecord("valya", MODE_HARD, 12))
+        store.save_record(PlayerRecord("vlad", MODE_NORMAL, 5))
+        self.assertEqual([name for name, _ in store.name_index().search("v")], ["valya", "vlad"])
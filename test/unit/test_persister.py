@@ -0,0 +1,126 @@
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from settings import MODE_NORMAL
+from source.events import EventBus, RecordSavedEvent
+from source.exceptions import ScoreSaveError
+from source.game import Game
+from source.persister import WriteBehindPersister
+from source.record import PlayerRecord
+from source.score_store import ShardedScoreStore
+
+
+class TestWriteBehindPersister(unittest.TestCase):
+
+    def test_close_flushes_pending(self):
+        batches = []
+        persister = WriteBehindPersister(commit=batches.append, batch_size=4)
+        for i in range(10):
+            persister.submit(PlayerRecord(f"p{i}", MODE_NORMAL, i))
+        persister.close()
+        self.assertEqual(sum(len(batch) for batch in batches), 10)
+        self.assertEqual(persister.committed, 10)
+        self.assertTrue(all(len(batch) <= 4 for batch in batches))
+
+    def test_records_are_batched(self):
+        batches = []
+        gate = threading.Event()
+
+        def commit(batch):
+            gate.wait()
+            batches.append(batch)
+
+        persister = WriteBehindPersister(commit=commit, batch_size=100, flush_interval=0)
+        persister.submit(PlayerRecord("first", MODE_NORMAL, 0))
+        for i in range(20):
+            persister.submit(PlayerRecord(f"p{i}", MODE_NORMAL, i))
+        gate.set()
+        persister.close()
+        self.assertEqual(sum(len(batch) for batch in batches), 21)
+        self.assertLessEqual(len(batches), 2)
+
+    def test_failed_commit_keeps_records(self):
+        def commit(batch):
+            raise OSError
+
+        with self.assertRaises(ScoreSaveError) as context:
+            with WriteBehindPersister(commit=commit) as persister:
+                persister.submit(PlayerRecord("p", MODE_NORMAL, 1))
+        self.assertEqual(persister.failed_records, [PlayerRecord("p", MODE_NORMAL, 1)])
+        self.assertEqual((persister.failed, persister.failures, persister.committed), (1, 2, 0))
+        self.assertIsInstance(context.exception.__cause__, OSError)
+
+    def test_failed_commit_retried_on_close(self):
+        batches = []
+
+        def commit(batch):
+            if not batches:
+                batches.append(None)
+                raise OSError
+            batches.append(batch)
+
+        with WriteBehindPersister(commit=commit) as persister:
+            persister.submit(PlayerRecord("p", MODE_NORMAL, 1))
+        self.assertEqual(batches, [None, [PlayerRecord("p", MODE_NORMAL, 1)]])
+        self.assertEqual((persister.failed, persister.failures, persister.committed), (0, 1, 1))
+
+    def test_on_commit_after_commit(self):
+        committed = []
+        saved = []
+
+        def commit(batch):
+            if not committed:
+                committed.append(None)
+                raise OSError
+            committed.extend(batch)
+
+        with WriteBehindPersister(commit=commit) as persister:
+            persister.submit(PlayerRecord("a", MODE_NORMAL, 1), lambda r: saved.append((r.name, len(committed))))
+            persister.submit(PlayerRecord("b", MODE_NORMAL, 2))
+            persister.submit(PlayerRecord("c", MODE_NORMAL, 3), lambda r: saved.append((r.name, None)))
+        self.assertEqual(sorted(saved, key=str), [('a', 4), ('c', None)])
+
+    def test_close_without_start(self):
+        persister = WriteBehindPersister(commit=lambda batch: None)
+        persister.close()
+        self.assertEqual(persister.pending, 0)
+
+
+class TestSaveRecordsToStore(unittest.TestCase):
+
+    def test_default_commit(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = ShardedScoreStore(directory, writer='w1')
+            with patch("source.score_store._default_store", store):
+                with WriteBehindPersister() as persister:
+                    for record in (PlayerRecord("a", MODE_NORMAL, 3), PlayerRecord("b", MODE_NORMAL, 5),
+                                   PlayerRecord("a", MODE_NORMAL, 3)):
+                        persister.submit(record)
+            self.assertEqual(store.top_rows(), [("b", MODE_NORMAL, 5), ("a", MODE_NORMAL, 3)])
+            self.assertEqual(persister.failed_records, [])
+
+
+class TestGameSaveScoreWriteBehind(unittest.TestCase):
+
+    @patch("builtins.input")
+    def test_save_score_submits(self, mock_input):
+        mock_input.side_effect = ['Vlad', "1"]
+        batches = []
+        with WriteBehindPersister(commit=batches.append) as persister:
+            game = Game(persister=persister)
+            game.save_score()
+        self.assertEqual(batches, [[PlayerRecord("Vlad", MODE_NORMAL, 0)]])
+
+    @patch("builtins.input")
+    def test_record_saved_event_after_commit(self, mock_input):
+        mock_input.side_effect = ['Vlad', "1"]
+        batches = []
+        events = []
+        bus = EventBus()
+        bus.subscribe(RecordSavedEvent, lambda event: events.append((event.record, len(batches))))
+        with WriteBehindPersister(commit=batches.append) as persister:
+            game = Game(persister=persister, events=bus)
+            game.save_score()
+        self.assertEqual(events, [(PlayerRecord("Vlad", MODE_NORMAL, 0), 1)])
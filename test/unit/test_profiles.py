@@ -0,0 +1,110 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from settings import PAPER, STONE, SCISSORS, WIN, DRAW, LOSE, MODE_NORMAL
+from source.exceptions import IncorrectFightResult
+from source.game import Game, main, print_profile
+from source.models import Player, Enemy, Battle
+from source.profiles import PlayerProfile, ProfileAggregator
+
+
+class TestPlayerProfile(unittest.TestCase):
+    def test_counters(self):
+        profile = PlayerProfile("Vlad")
+        for result, attack in ((WIN, PAPER), (WIN, PAPER), (DRAW, STONE), (WIN, SCISSORS), (LOSE, PAPER)):
+            profile.on_fight(result, attack)
+        self.assertEqual(profile.rounds, 5)
+        self.assertEqual((profile.wins, profile.draws, profile.losses), (3, 1, 1))
+        self.assertEqual(profile.best_streak, 2)
+        self.assertEqual(profile.favourite_attack, PAPER)
+        self.assertAlmostEqual(profile.win_ratio, 0.6)
+
+    def test_empty_profile(self):
+        profile = PlayerProfile("Vlad")
+        self.assertIsNone(profile.favourite_attack)
+        self.assertEqual(profile.loss_ratio, 0.0)
+
+    def test_game_over(self):
+        profile = PlayerProfile("Vlad")
+        profile.on_game_over(10)
+        profile.on_game_over(4)
+        self.assertEqual(profile.games, 2)
+        self.assertEqual(profile.best_score, 10)
+
+    def test_row_roundtrip(self):
+        profile = PlayerProfile("Vlad")
+        profile.on_fight(WIN, STONE)
+        profile.on_game_over(3)
+        restored = PlayerProfile.from_row("Vlad", profile.as_row())
+        self.assertEqual(restored.as_row(), profile.as_row())
+
+
+class TestProfileAggregator(unittest.TestCase):
+    def test_unknown_player(self):
+        self.assertIsNone(ProfileAggregator().get("Vlad"))
+
+    def test_incorrect_fight_result(self):
+        with self.assertRaises(IncorrectFightResult):
+            ProfileAggregator().on_fight("Vlad", 2)
+
+    def test_save_load(self):
+        aggregator = ProfileAggregator()
+        aggregator.on_fight("Vlad", WIN, PAPER)
+        aggregator.on_game_over("Vlad", 1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'profiles.json')
+            aggregator.save(path)
+            loaded = ProfileAggregator.load(path)
+        self.assertEqual(loaded.get("Vlad").as_row(), aggregator.get("Vlad").as_row())
+
+    def test_load_missing_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual(ProfileAggregator.load(os.path.join(directory, 'missing.json')).profiles, {})
+
+
+class TestBattleFeedsProfiles(unittest.TestCase):
+    @patch('builtins.input')
+    def test_handle_fight_result(self, mock_input):
+        mock_input.side_effect = ['Vlad']
+        profiles = ProfileAggregator()
+        battle = Battle(Player(), Enemy(mode=MODE_NORMAL, level=3), MODE_NORMAL, profiles)
+        battle.handle_fight_result(WIN, PAPER)
+        battle.handle_fight_result(DRAW, STONE)
+        self.assertEqual(profiles.get("Vlad").rounds, 2)
+        self.assertEqual(profiles.get("Vlad").wins, 1)
+
+    @patch("source.game.Game.save_score")
+    @patch("source.models.randint")
+    @patch("builtins.input")
+    def test_game_feeds_profiles(self, mock_input, mock_randint, mock_save_score):
+        mock_input.side_effect = ['Vlad', "1", "3", "2", "2"]
+        mock_randint.return_value = 1
+        profiles = ProfileAggregator()
+        Game(profiles=profiles).start_game()
+        profile = profiles.get("Vlad")
+        self.assertEqual(profile.games, 1)
+        self.assertEqual((profile.wins, profile.losses), (1, 2))
+        self.assertEqual(profile.best_score, 6)
+
+
+class TestProfilesInMain(unittest.TestCase):
+    @patch("source.game.ScoreStatsStore")
+    @patch("source.game.Game.save_score")
+    @patch("source.models.randint")
+    @patch("builtins.input")
+    def test_console_games_saved(self, mock_input, mock_randint, mock_save_score, mock_stats):
+        mock_input.side_effect = ['1', 'Vlad', "1", "3", "2", "2"]
+        mock_randint.return_value = 1
+        with tempfile.TemporaryDirectory() as directory, \
+                patch("source.profiles.get_profiles_file_path", return_value=os.path.join(directory, 'p.json')):
+            with redirect_stdout(io.StringIO()):
+                main([])
+            out = io.StringIO()
+            with redirect_stdout(out):
+                print_profile("Vlad")
+        self.assertIn("Games: 1. Rounds: 3. Wins: 33%.", out.getvalue())
+        self.assertIn("Best score: 6.", out.getvalue())
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from settings import MODE_NORMAL, MODE_HARD, PAPER, STONE, SCISSORS, WIN, LOSE
+from source.models import Player
+from source.modes import mode_profile
+from source.pvp import PvpBattle, Ticket, Matchmaker, PvpServer
+from source.record import PlayerRecord
+from source.score_store import ShardedScoreStore
+
+
+class TestPvpBattle(unittest.TestCase):
+    def test_rounds(self):
+        battle = PvpBattle(Player("Vlad"), Player("Olga"), MODE_NORMAL)
+        result = battle.play_round(PAPER, STONE)
+        self.assertEqual((result.fight_result, result.first_score, result.second_lives), (WIN, 1, 1))
+        result = battle.play_round(PAPER, PAPER)
+        self.assertEqual((result.first_score, result.second_score, result.finished), (1, 0, False))
+        result = battle.play_round(PAPER, SCISSORS)
+        self.assertEqual((result.fight_result, result.first_lives, result.second_score), (LOSE, 1, 1))
+        result = battle.play_round(STONE, SCISSORS)
+        self.assertEqual((result.second_lives, result.first_score, result.finished), (0, 7, True))
+
+    def test_hard_mode_points(self):
+        battle = PvpBattle(Player("Vlad"), Player("Olga"), MODE_HARD)
+        self.assertEqual(battle.play_round(PAPER, STONE).first_score, 2)
+
+
+    @patch('source.pvp.mode_profile')
+    def test_lives_of_mode(self, mock_mode_profile):
+        mock_mode_profile.return_value = mode_profile(MODE_NORMAL)._replace(player_lives=1)
+        battle = PvpBattle(Player("Vlad"), Player("Olga"), MODE_NORMAL)
+        result = battle.play_round(PAPER, STONE)
+        self.assertEqual((result.first_lives, result.second_lives, result.finished), (1, 0, True))
+
+
+class TestMatchmaker(unittest.TestCase):
+    def test_same_mode(self):
+        matchmaker = Matchmaker()
+        self.assertIsNone(matchmaker.join(Ticket("Vlad", MODE_NORMAL)))
+        self.assertIsNone(matchmaker.join(Ticket("Olga", MODE_HARD)))
+        self.assertEqual(matchmaker.join(Ticket("Ivan", MODE_NORMAL)).name, "Vlad")
+        self.assertEqual(matchmaker.waiting, 1)
+
+    def test_score_window(self):
+        matchmaker = Matchmaker(score_window=10)
+        self.assertIsNone(matchmaker.join(Ticket("Vlad", MODE_NORMAL, 5)))
+        self.assertIsNone(matchmaker.join(Ticket("Olga", MODE_NORMAL, 30)))
+        self.assertEqual(matchmaker.join(Ticket("Ivan", MODE_NORMAL, 14)).name, "Vlad")
+        self.assertEqual(matchmaker.join(Ticket("Petr", MODE_NORMAL, 21)).name, "Olga")
+
+    def test_any_score(self):
+        matchmaker = Matchmaker(score_window=None)
+        matchmaker.join(Ticket("Vlad", MODE_NORMAL, 5))
+        self.assertEqual(matchmaker.join(Ticket("Olga", MODE_NORMAL, 500)).name, "Vlad")
+
+    def test_cancelled_skipped(self):
+        matchmaker = Matchmaker()
+        ticket = Ticket("Vlad", MODE_NORMAL)
+        matchmaker.join(ticket)
+        ticket.cancel()
+        self.assertIsNone(matchmaker.join(Ticket("Olga", MODE_NORMAL)))
+        self.assertEqual(matchmaker.waiting, 1)
+
+
+class TestPvpServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = ShardedScoreStore(self.tmp_dir.name, writer='w1')
+        self.store.save_record(PlayerRecord("Vlad", MODE_NORMAL, 3))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_game(self):
+        async def client(port, name, attacks):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(json.dumps({'name': name, 'mode': MODE_NORMAL}).encode() + b'\n')
+            messages = [json.loads(await reader.readline()), json.loads(await reader.readline())]
+            for attack in attacks:
+                writer.write(json.dumps({'attack': attack}).encode() + b'\n')
+                messages.append(json.loads(await reader.readline()))
+            messages.append(json.loads(await reader.readline()))
+            writer.close()
+            return messages
+
+        server = PvpServer(self.store, port=0)
+
+        async def run():
+            async with await server.start():
+                first = asyncio.create_task(client(server.port, "Vlad", ["1", "1"]))
+                await asyncio.sleep(0.05)
+                return await asyncio.gather(first, client(server.port, "Olga", ["2", "2"]))
+
+        vlad, olga = asyncio.run(run())
+        self.assertEqual(vlad[0], {'type': 'queued', 'rating': 3})
+        self.assertEqual(olga[1], {'type': 'matched', 'opponent': 'Vlad', 'mode': MODE_NORMAL})
+        self.assertEqual(vlad[3]['result'], 'win')
+        self.assertEqual(olga[3], {'type': 'round', 'result': 'lose', 'attack': STONE, 'opponent_attack': PAPER,
+                                   'lives': 0, 'opponent_lives': 2, 'score': 0})
+        self.assertEqual(olga[4], {'type': 'game_over', 'winner': 'Vlad'})
+        self.assertIn(("Vlad", MODE_NORMAL, 7), self.store.top_rows(mode=MODE_NORMAL))
+        self.assertEqual(server.rating("Vlad", MODE_NORMAL), 7)
+
+    def test_incorrect_attack_read_again(self):
+        async def client(port, name, lines):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(json.dumps({'name': name, 'mode': MODE_NORMAL}).encode() + b'\n')
+            messages = [json.loads(await reader.readline()), json.loads(await reader.readline())]
+            for line in lines:
+                writer.write(line + b'\n')
+                messages.append(json.loads(await reader.readline()))
+            writer.close()
+            return messages
+
+        async def run():
+            server = PvpServer(self.store, port=0)
+            async with await server.start():
+                first = asyncio.create_task(client(server.port, "Vlad", [b'{"attack": "7"}', b'oops',
+                                                                         b'{"attack": "1"}']))
+                await asyncio.sleep(0.05)
+                return await asyncio.gather(first, client(server.port, "Olga", [b'{"attack": "1"}']))
+
+        vlad, olga = asyncio.run(run())
+        self.assertEqual(vlad[2:4], [{'type': 'error', 'message': 'Incorrect input.'}] * 2)
+        self.assertEqual((vlad[4]['result'], olga[2]['result']), ('draw', 'draw'))
+
+    def test_queued_player_leaves(self):
+        async def hello(port, name):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(json.dumps({'name': name, 'mode': MODE_NORMAL}).encode() + b'\n')
+            await reader.readline()
+            return reader, writer
+
+        async def run():
+            server = PvpServer(self.store, port=0)
+            async with await server.start():
+                _, left = await hello(server.port, "Vlad")
+                left.close()
+                await asyncio.sleep(0.05)
+                _, olga = await hello(server.port, "Olga")
+                ivan_reader, ivan = await hello(server.port, "Ivan")
+                matched = json.loads(await asyncio.wait_for(ivan_reader.readline(), 5))
+                olga.close()
+                ivan.close()
+                return matched
+
+        self.assertEqual(asyncio.run(run())['opponent'], 'Olga')
+
+    def test_bad_hello(self):
+        async def run(hello):
+            server = PvpServer(self.store, port=0)
+            async with await server.start():
+                reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+                writer.write(json.dumps(hello).encode() + b'\n')
+                message = json.loads(await reader.readline())
+                writer.close()
+                return message
+
+        for hello in ({'name': 'Vlad', 'mode': 'Easy'}, {'name': 'evil\tname', 'mode': MODE_NORMAL},
+                      {'name': ['Vlad'], 'mode': MODE_NORMAL}, {'name': 5, 'mode': MODE_NORMAL}):
+            with self.subTest(hello=hello):
+                self.assertEqual(asyncio.run(run(hello))['type'], 'error')
@@ -0,0 +1,98 @@
+import io
+import unittest
+from unittest.mock import patch
+
+from settings import MODE_NORMAL
+from source.game import Game
+from source.renderer import Status, format_status, LineRenderer, FrameRenderer, AnsiRenderer
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+STATUS = Status("Vlad", MODE_NORMAL, 2, 0, 1, 1)
+
+
+class TestRenderer(unittest.TestCase):
+    def test_format_status(self):
+        self.assertEqual(format_status(STATUS),
+                         "\nPlayer: Vlad.\tMode: Normal.\tPlayer Lives: 2.\tScore: 0.\tLevel: 1\tEnemy's lives: 1")
+
+    def test_line_renderer(self):
+        stream = io.StringIO()
+        renderer = LineRenderer(stream)
+        renderer.line('You lose!')
+        self.assertEqual(stream.getvalue(), 'You lose!\n')
+
+    def test_frame_one_write(self):
+        stream = CountingStream()
+        renderer = FrameRenderer(stream)
+        renderer.status(STATUS)
+        renderer.line('Your attack: Paper')
+        renderer.line("It's a draw!")
+        self.assertEqual(stream.writes, 0)
+        renderer.flush()
+        self.assertEqual(stream.writes, 1)
+        self.assertEqual(stream.getvalue(), format_status(STATUS) + "\nYour attack: Paper\nIt's a draw!\n")
+
+    @patch('builtins.input')
+    def test_frame_prompt(self, mock_input):
+        mock_input.return_value = '1'
+        stream = CountingStream()
+        renderer = FrameRenderer(stream)
+        renderer.line('New enemy comes.')
+        self.assertEqual(renderer.prompt('Attack: '), '1')
+        self.assertEqual(stream.writes, 1)
+        self.assertEqual(stream.getvalue(), 'New enemy comes.\nAttack: ')
+
+    def test_ansi_redraws_changed_fields(self):
+        stream = io.StringIO()
+        renderer = AnsiRenderer(stream)
+        renderer.status(STATUS)
+        renderer.flush()
+        self.assertIn('Player: Vlad', stream.getvalue())
+        stream.seek(0)
+        stream.truncate()
+        renderer.status(STATUS._replace(score=1))
+        renderer.flush()
+        self.assertNotIn('Vlad', stream.getvalue())
+        self.assertIn('1', stream.getvalue())
+        stream.seek(0)
+        stream.truncate()
+        renderer.status(STATUS._replace(score=1))
+        renderer.flush()
+        self.assertEqual(stream.getvalue(), '')
+
+    def test_ansi_clips_fields(self):
+        stream = io.StringIO()
+        renderer = AnsiRenderer(stream)
+        renderer.status(STATUS._replace(name='Maximilian', score=10 ** 20))
+        renderer.flush()
+        row = stream.getvalue().split('\033[1;1H')[1].split('\033[2;')[0]
+        self.assertEqual(len(row), AnsiRenderer.FIELD_WIDTH * len(AnsiRenderer.LABELS))
+        self.assertIn('Player: Maximi\u2026 Mode: Normal', row)
+        stream.seek(0)
+        stream.truncate()
+        renderer.status(STATUS._replace(name='Maximilian', score=10 ** 21))
+        renderer.flush()
+        self.assertIn('H1000000\u2026 \0338', stream.getvalue())
+
+
+class TestGameRenderer(unittest.TestCase):
+    @patch("source.game.Game.save_score")
+    @patch("source.models.randint")
+    @patch("builtins.input")
+    def test_start_game_frames(self, mock_input, mock_randint, mock_save_score):
+        mock_input.side_effect = ['Vlad', "1", "3", "2", "2"]
+        mock_randint.return_value = 1
+        stream = CountingStream()
+        Game(renderer=FrameRenderer(stream)).start_game()
+        self.assertEqual(stream.writes, 4)
+        self.assertIn('You lose!', stream.getvalue())
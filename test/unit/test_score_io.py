@@ -0,0 +1,167 @@
+import ast
+import os
+import struct
+import tempfile
+import unittest
+from array import array
+from unittest.mock import patch
+
+from settings import MODE_NORMAL, MODE_HARD
+from source.exceptions import IncorrectFileFormatError, IncorrectModeError, IncorrectScoreError, WhiteSpaceInputError
+from source.record import PlayerRecord
+from source.score_io import read_rows, write_rows, import_scores, export_scores, export_npy
+from source.score_store import ShardedScoreStore
+
+ROWS = [("Vlad", MODE_NORMAL, 5), ("Olga", MODE_HARD, 12), ("Ivan", MODE_NORMAL, 7)]
+
+
+def read_npy(path):
+    with open(path, 'rb') as file:
+        content = file.read()
+    header_size = struct.unpack('<H', content[8:10])[0]
+    header = ast.literal_eval(content[10:10 + header_size].decode('latin1'))
+    return header, content[10 + header_size:]
+
+
+class TestReadWriteRows(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def path(self, filename):
+        return os.path.join(self.tmp_dir.name, filename)
+
+    def test_csv(self):
+        self.assertEqual(write_rows(self.path('s.csv'), ROWS), 3)
+        self.assertEqual([row for chunk in read_rows(self.path('s.csv'), 2) for row in chunk], ROWS)
+
+    def test_jsonl(self):
+        write_rows(self.path('s.jsonl'), ROWS)
+        self.assertEqual([row for chunk in read_rows(self.path('s.jsonl'), 2) for row in chunk], ROWS)
+
+    def test_csv_quoted(self):
+        with open(self.path('s.csv'), 'w') as file:
+            file.write('name,mode,score\r\n"Vlad",Normal,5\r\nOlga,Hard,12\r\n')
+        self.assertEqual(list(read_rows(self.path('s.csv'))), [[("Vlad", MODE_NORMAL, 5), ("Olga", MODE_HARD, 12)]])
+
+    def test_csv_wrong_score(self):
+        with open(self.path('s.csv'), 'w') as file:
+            file.write('name,mode,score\nVlad,Normal,five\n')
+        with self.assertRaises(IncorrectScoreError):
+            list(read_rows(self.path('s.csv')))
+
+    def test_csv_float_score(self):
+        with open(self.path('s.csv'), 'w') as file:
+            file.write('name,mode,score\nVlad,Normal,5.7\n')
+        with self.assertRaises(IncorrectScoreError):
+            list(read_rows(self.path('s.csv')))
+
+    def test_jsonl_wrong_types(self):
+        for line, error in (('{"name": "Vlad", "mode": "Normal", "score": 3.9}', IncorrectScoreError),
+                            ('{"name": "Vlad", "mode": "Normal", "score": true}', IncorrectScoreError),
+                            ('{"name": 5, "mode": "Normal", "score": 3}', IncorrectFileFormatError),
+                            ('{"name": "Vlad", "mode": ["Normal"], "score": 3}', IncorrectFileFormatError)):
+            with self.subTest(line=line):
+                with open(self.path('s.jsonl'), 'w') as file:
+                    file.write(line + '\n')
+                with self.assertRaises(error):
+                    list(read_rows(self.path('s.jsonl')))
+
+    def test_csv_blank_lines(self):
+        with open(self.path('s.csv'), 'w') as file:
+            file.write('name,mode,score\nVlad,Normal,5\n\nOlga,Hard,12\n\n')
+        self.assertEqual(list(read_rows(self.path('s.csv'))), [[("Vlad", MODE_NORMAL, 5), ("Olga", MODE_HARD, 12)]])
+
+    def test_csv_misaligned_rows(self):
+        for content in ('a,Normal,1,b\nNormal,2\n', 'a,Normal\n1,b,Normal,2\n', '"a",Normal,1,b\nNormal,2\n'):
+            with self.subTest(content=content):
+                with open(self.path('s.csv'), 'w') as file:
+                    file.write('name,mode,score\n' + content)
+                with self.assertRaises(IncorrectFileFormatError):
+                    list(read_rows(self.path('s.csv')))
+
+    def test_wrong_format(self):
+        with self.assertRaises(IncorrectFileFormatError):
+            write_rows(self.path('s.txt'), ROWS)
+
+
+class TestImportExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = ShardedScoreStore(os.path.join(self.tmp_dir.name, 'scores'), writer='w1', max_records=None)
+        self.csv_path = os.path.join(self.tmp_dir.name, 's.csv')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def path_of(self, filename):
+        return os.path.join(self.tmp_dir.name, filename)
+
+    def test_import(self):
+        write_rows(self.csv_path, ROWS + ROWS[:1])
+        result = import_scores(self.csv_path, self.store)
+        self.assertEqual(result, (4, 3, 1))
+        self.assertEqual([r.as_row() for r in self.store.iter_top()], [ROWS[1], ROWS[2], ROWS[0]])
+
+    def test_import_skips_stored(self):
+        self.store.save_record(PlayerRecord(*ROWS[0]))
+        write_rows(self.csv_path, ROWS)
+        self.assertEqual(import_scores(self.csv_path, self.store), (3, 2, 1))
+        self.assertEqual(len(list(self.store.iter_top())), 3)
+
+    def test_import_keeps_best(self):
+        store = ShardedScoreStore(self.store.directory, writer='w1', max_records=1)
+        write_rows(self.csv_path, ROWS)
+        import_scores(self.csv_path, store, chunk_size=1)
+        self.assertEqual([r.as_row() for r in store.iter_top()], [ROWS[1], ROWS[2]])
+
+    def test_import_wrong_mode(self):
+        write_rows(self.csv_path, [("Vlad", 'wrong', 5)])
+        with self.assertRaises(IncorrectModeError):
+            import_scores(self.csv_path, self.store)
+
+    def test_import_whitespace_in_name(self):
+        jsonl_path = os.path.join(self.tmp_dir.name, 's.jsonl')
+        write_rows(jsonl_path, [("Vl\tad", MODE_NORMAL, 5), ("Ol\nga", MODE_HARD, 12)])
+        with self.assertRaises(WhiteSpaceInputError):
+            import_scores(jsonl_path, self.store)
+        self.assertEqual(self.store.top_rows(), [])
+
+    def test_import_default_store_keeps_all(self):
+        rows = [(f"p{score}", MODE_NORMAL, score) for score in range(20)]
+        write_rows(self.csv_path, rows)
+        with patch('source.score_store.get_shards_dir_path', return_value=self.store.directory), \
+                patch('source.score_io.get_score_file_path', return_value=self.path_of('scores.txt')):
+            self.assertEqual(import_scores(self.csv_path), (20, 20, 0))
+        self.assertEqual(self.store.top_rows(n=None), rows[::-1])
+
+    def test_export_default_store_reads_score_file(self):
+        score_file = self.path_of('scores.txt')
+        with open(score_file, 'w') as file:
+            file.write("NAME   MODE      SCORE\nold    Hard      6\n")
+        self.store.save_record(PlayerRecord(*ROWS[0]))
+        default_store = ShardedScoreStore(self.store.directory, max_records=None, score_file=score_file)
+        with patch('source.score_store._default_store', default_store):
+            self.assertEqual(export_scores(self.csv_path), 2)
+        self.assertEqual(next(read_rows(self.csv_path)), [("old", MODE_HARD, 6), ROWS[0]])
+
+    def test_export(self):
+        write_rows(self.csv_path, ROWS)
+        import_scores(self.csv_path, self.store)
+        jsonl_path = os.path.join(self.tmp_dir.name, 'out.jsonl')
+        self.assertEqual(export_scores(jsonl_path, self.store, MODE_NORMAL), 2)
+        self.assertEqual(next(read_rows(jsonl_path)), [ROWS[2], ROWS[0]])
+
+    def test_export_npy(self):
+        write_rows(self.csv_path, ROWS)
+        import_scores(self.csv_path, self.store)
+        paths = export_npy(os.path.join(self.tmp_dir.name, 'npy'), self.store)
+        self.assertEqual(len(paths), 4)
+        header, data = read_npy(os.path.join(self.tmp_dir.name, 'npy', f'{MODE_NORMAL}.scores.npy'))
+        self.assertEqual(header, {'descr': '<i8', 'fortran_order': False, 'shape': (2,)})
+        self.assertEqual(list(array('q', data)), [7, 5])
+        header, data = read_npy(os.path.join(self.tmp_dir.name, 'npy', f'{MODE_NORMAL}.names.npy'))
+        self.assertEqual(header['descr'], '<U4')
+        self.assertEqual(data.decode('utf-32-le'), 'IvanVlad')
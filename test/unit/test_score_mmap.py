@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from array import array
+from unittest.mock import patch
+
+from settings import MODE_NORMAL, MODE_HARD
+from source.exceptions import IncorrectScoreFileError, IncorrectModeError
+from source.record import PlayerRecord
+from source.score_io import export_binary
+from source.score_mmap import BinaryScoreFile, write_binary_scores, write_score_columns
+from source.score_store import ShardedScoreStore, save_records_to_store
+
+ROWS = [("Vlad", MODE_NORMAL, 5), ("Olga", MODE_HARD, 12), ("Ivan", MODE_NORMAL, 7), ("Petr", MODE_HARD, 1)]
+
+
+class TestBinaryScoreFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'scores.bin')
+        write_binary_scores(self.path, ROWS)
+        self.score_file = BinaryScoreFile(self.path)
+
+    def tearDown(self):
+        self.score_file.close()
+        self.tmp_dir.cleanup()
+
+    def test_count(self):
+        self.assertEqual(self.score_file.count(MODE_NORMAL), 2)
+
+    def test_top_mode(self):
+        self.assertEqual(self.score_file.top(1, MODE_NORMAL), [("Ivan", MODE_NORMAL, 7)])
+
+    def test_top_all(self):
+        self.assertEqual(self.score_file.top(3), [ROWS[1], ROWS[2], ROWS[0]])
+
+    def test_scores_view(self):
+        scores = self.score_file.scores(MODE_HARD)
+        self.assertEqual(scores.tolist(), [12, 1])
+        scores.release()
+
+    def test_wrong_mode(self):
+        with self.assertRaises(IncorrectModeError):
+            self.score_file.top(1, 'wrong')
+
+    def test_replace_keeps_open_view(self):
+        write_binary_scores(self.path, [("Anna", MODE_NORMAL, 100)])
+        self.assertEqual(self.score_file.top(1, MODE_NORMAL), [("Ivan", MODE_NORMAL, 7)])
+        with BinaryScoreFile(self.path) as score_file:
+            self.assertEqual(score_file.top(1), [("Anna", MODE_NORMAL, 100)])
+
+
+class TestWriteBinaryScores(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'scores.bin')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_columns(self):
+        write_score_columns(self.path, {MODE_HARD: (iter(["a", "b"]), array('q', [3, 2]))})
+        with BinaryScoreFile(self.path) as score_file:
+            self.assertEqual(score_file.top(5), [("a", MODE_HARD, 3), ("b", MODE_HARD, 2)])
+
+    def test_name_too_long(self):
+        write_binary_scores(self.path, [("a" * 33, MODE_NORMAL, 2), ("\u0436" * 17, MODE_NORMAL, 1)])
+        with BinaryScoreFile(self.path) as score_file:
+            self.assertEqual(score_file.top(2), [("a" * 32, MODE_NORMAL, 2), ("\u0436" * 16, MODE_NORMAL, 1)])
+
+    def test_failed_write_removes_tmp_file(self):
+        def names():
+            yield "a"
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            write_score_columns(self.path, {MODE_HARD: (names(), array('q', [3, 2]))})
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+
+    def test_not_score_file(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'NAME MODE SCORE\n')
+        with self.assertRaises(IncorrectScoreFileError):
+            BinaryScoreFile(self.path)
+
+    def test_export_binary(self):
+        store = ShardedScoreStore(os.path.join(self.tmp_dir.name, 'scores'), writer='w1')
+        for row in ROWS:
+            store.save_record(PlayerRecord(*row))
+        export_binary(self.path, store)
+        with BinaryScoreFile(self.path) as score_file:
+            self.assertEqual(score_file.top(4), [ROWS[1], ROWS[2], ROWS[0], ROWS[3]])
+
+    def test_export_binary_default_store(self):
+        score_file = os.path.join(self.tmp_dir.name, 'scores.txt')
+        with open(score_file, 'w') as file:
+            file.write("NAME   MODE      SCORE\nold    Hard      6\n")
+        store = ShardedScoreStore(os.path.join(self.tmp_dir.name, 'scores'), writer='w1', score_file=score_file)
+        with patch('source.score_store._default_store', store):
+            save_records_to_store([PlayerRecord(*ROWS[0])])
+            export_binary(self.path)
+        with BinaryScoreFile(self.path) as score_file:
+            self.assertEqual(score_file.top(4), [("old", MODE_HARD, 6), ROWS[0]])
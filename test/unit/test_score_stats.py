@@ -0,0 +1,119 @@
+import os
+import tempfile
+import threading
+import unittest
+from math import ceil
+from random import Random
+from unittest.mock import MagicMock
+
+from settings import MODE_NORMAL, MODE_HARD, SCORE_STATS_PRECISION
+from source.exceptions import IncorrectModeError, IncorrectScoreError, IncorrectPercentileError, \
+    IncorrectScoreFileError
+from source.game import Game
+from source.score_stats import ScoreHistogram, ScoreStats, ScoreStatsStore, score_bucket, bucket_bounds
+
+
+class TestBuckets(unittest.TestCase):
+    def test_bounds_contain_score(self):
+        for score in list(range(1000)) + [2 ** 20 + 12345, 2 ** 62 - 1]:
+            low, high = bucket_bounds(score_bucket(score))
+            self.assertLessEqual(low, score)
+            self.assertLessEqual(score, high)
+            self.assertLessEqual(high - low, low >> (SCORE_STATS_PRECISION - 1))
+
+    def test_buckets_contiguous(self):
+        for bucket in range(1, 2000):
+            self.assertEqual(bucket_bounds(bucket)[0], bucket_bounds(bucket - 1)[1] + 1)
+
+
+class TestScoreHistogram(unittest.TestCase):
+    def test_percentiles_exact_for_small_scores(self):
+        histogram = ScoreHistogram()
+        for score in range(1, 101):
+            histogram.add(score)
+        self.assertEqual([histogram.percentile(q) for q in (0, 50, 90, 99, 100)], [1, 50, 90, 99, 100])
+        self.assertEqual((histogram.count, histogram.min, histogram.max, histogram.mean), (100, 1, 100, 50.5))
+
+    def test_relative_error(self):
+        rng = Random(1)
+        scores = sorted(int(rng.paretovariate(1.2) * 10) for _ in range(20_000))
+        histogram = ScoreHistogram()
+        for score in scores:
+            histogram.add(score)
+        for q in (10, 50, 90, 99, 99.9):
+            exact = scores[max(0, ceil(len(scores) * q / 100) - 1)]
+            self.assertAlmostEqual(histogram.percentile(q), exact, delta=exact / 2 ** SCORE_STATS_PRECISION + 1)
+
+    def test_merge_same_as_one_histogram(self):
+        whole, first, second = ScoreHistogram(), ScoreHistogram(), ScoreHistogram()
+        for score in range(0, 5000, 7):
+            whole.add(score)
+            (first if score % 2 else second).add(score)
+        first.merge(second)
+        first.merge(ScoreHistogram())
+        self.assertEqual((first.counts, first.count, first.total, first.min, first.max),
+                         (whole.counts, whole.count, whole.total, whole.min, whole.max))
+        self.assertEqual(first.percentile(99), whole.percentile(99))
+
+    def test_incorrect(self):
+        histogram = ScoreHistogram()
+        self.assertIsNone(histogram.percentile(50))
+        with self.assertRaises(IncorrectScoreError):
+            histogram.add(-1)
+        with self.assertRaises(IncorrectPercentileError):
+            histogram.percentile(101)
+
+
+class TestScoreStats(unittest.TestCase):
+    def test_bytes_round_trip(self):
+        stats = ScoreStats()
+        for score in (0, 3, 500, 2 ** 40):
+            stats.add(MODE_HARD, score)
+        stats.add(MODE_NORMAL, 7)
+        loaded = ScoreStats.from_bytes(stats.to_bytes())
+        self.assertEqual(loaded.histogram(MODE_HARD).counts, stats.histogram(MODE_HARD).counts)
+        self.assertEqual(loaded.histogram(MODE_HARD).total, 2 ** 40 + 503)
+        self.assertEqual(loaded.percentile(MODE_NORMAL, 50), 7)
+        with self.assertRaises(IncorrectScoreFileError):
+            ScoreStats.from_bytes(b'PSSB' + stats.to_bytes()[4:])
+        with self.assertRaises(IncorrectScoreFileError):
+            ScoreStats.from_bytes(stats.to_bytes()[:-3])
+
+    def test_incorrect_mode(self):
+        with self.assertRaises(IncorrectModeError):
+            ScoreStats().add('Easy', 1)
+
+
+class TestScoreStatsStore(unittest.TestCase):
+    def test_merged_across_writers(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            first, second = ScoreStatsStore(tmp_dir, 'w1'), ScoreStatsStore(tmp_dir, 'w2')
+            first.add(MODE_HARD, 10)
+            second.add(MODE_HARD, 20)
+            first.flush()
+            self.assertEqual(second.merged().histogram(MODE_HARD).count, 2)
+            self.assertEqual(sorted(os.listdir(tmp_dir)), ['w1.bin'])
+            self.assertEqual(ScoreStatsStore(tmp_dir, 'w1').stats.histogram(MODE_HARD).max, 10)
+
+    def test_flush_only_changed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = ScoreStatsStore(tmp_dir, 'w1')
+            store.flush()
+            self.assertEqual(os.listdir(tmp_dir), [])
+            store.add(MODE_HARD, 10)
+            threads = [threading.Thread(target=store.flush) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertFalse(store.changed)
+            self.assertEqual(os.listdir(tmp_dir), ['w1.bin'])
+            self.assertEqual(ScoreStatsStore(tmp_dir, 'w1').stats.histogram(MODE_HARD).count, 1)
+
+    def test_game_counts_every_score(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = ScoreStatsStore(tmp_dir, 'w1')
+            game = Game(MagicMock(), name='Vlad', mode=MODE_HARD, headless=True, stats=store)
+            game.player.score = 0
+            game.save_score()
+            self.assertEqual(store.merged().histogram(MODE_HARD).count, 1)
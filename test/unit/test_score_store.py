@@ -0,0 +1,131 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from settings import MODE_NORMAL, MODE_HARD
+from source.exceptions import RecordInRecordsError, IncorrectModeError
+from source.record import PlayerRecord
+from source.score_store import ScoreShard, ShardedScoreStore
+
+
+class TestScoreShard(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.shard = ScoreShard(self.tmp_dir.name, MODE_NORMAL, 'w1', max_records=3)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_empty_shard(self):
+        self.assertEqual(list(self.shard.iter_records()), [])
+
+    def test_records_sorted(self):
+        self.shard.add_record(PlayerRecord("a", MODE_NORMAL, 3))
+        self.shard.add_record(PlayerRecord("b", MODE_NORMAL, 7))
+        self.shard.add_record(PlayerRecord("c", MODE_NORMAL, 5))
+        self.assertEqual([r.score for r in self.shard.iter_records()], [7, 5, 3])
+
+    def test_records_cut(self):
+        self.shard.add_records([PlayerRecord(f"p{i}", MODE_NORMAL, i) for i in range(6)])
+        self.assertEqual([r.score for r in self.shard.iter_records()], [5, 4, 3])
+
+    def test_duplicate(self):
+        self.shard.add_record(PlayerRecord("a", MODE_NORMAL, 3))
+        with self.assertRaises(RecordInRecordsError):
+            self.shard.add_record(PlayerRecord("a", MODE_NORMAL, 3))
+
+    def test_wrong_mode(self):
+        with self.assertRaises(IncorrectModeError):
+            self.shard.add_record(PlayerRecord("a", MODE_HARD, 3))
+
+    def test_rewrite_is_atomic(self):
+        self.shard.add_record(PlayerRecord("a", MODE_NORMAL, 3))
+        stop = threading.Event()
+        errors = []
+
+        def read():
+            while not stop.is_set():
+                try:
+                    self.assertTrue(list(self.shard.iter_rows()))
+                except Exception as error:
+                    errors.append(error)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        for i in range(300):
+            self.shard.add_record(PlayerRecord(f"player_with_long_name_{i}", MODE_NORMAL, i))
+        stop.set()
+        reader.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(os.listdir(self.tmp_dir.name), ['Normal.w1.txt'])
+
+    def test_wrong_shard_mode(self):
+        with self.assertRaises(IncorrectModeError):
+            ScoreShard(self.tmp_dir.name, 'wrong', 'w1')
+
+
+class TestShardedScoreStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = ShardedScoreStore(self.tmp_dir.name, writer='w1')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_writers_use_own_files(self):
+        self.store.save_record(PlayerRecord("a", MODE_NORMAL, 3))
+        self.store.save_record(PlayerRecord("b", MODE_NORMAL, 4), writer='w2')
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), ['Normal.w1.txt', 'Normal.w2.txt'])
+
+    def test_shards_by_mode(self):
+        self.store.save_record(PlayerRecord("a", MODE_NORMAL, 3))
+        self.store.save_record(PlayerRecord("b", MODE_HARD, 4))
+        self.assertEqual([shard.mode for shard in self.store.shards(MODE_HARD)], [MODE_HARD])
+        self.assertEqual(len(self.store.shards()), 2)
+
+    def test_top_merges_shards(self):
+        for writer, scores in (('w1', [1, 8, 4]), ('w2', [7, 2]), ('w3', [9, 3])):
+            for score in scores:
+                self.store.save_record(PlayerRecord(f"{writer}_{score}", MODE_NORMAL, score), writer=writer)
+        top = self.store.top(4, MODE_NORMAL)
+        self.assertEqual([r.score for r in top], [9, 8, 7, 4])
+
+    def test_top_all_modes(self):
+        self.store.save_record(PlayerRecord("a", MODE_NORMAL, 3))
+        self.store.save_record(PlayerRecord("b", MODE_HARD, 4))
+        self.assertEqual([r.name for r in self.store.top()], ["b", "a"])
+
+    def test_top_missing_directory(self):
+        store = ShardedScoreStore(f'{self.tmp_dir.name}/missing')
+        self.assertEqual(store.top(), [])
+
+    def test_save_records(self):
+        store = ShardedScoreStore(self.tmp_dir.name, writer='w1', max_records=2)
+        store.save_records([PlayerRecord("a", MODE_NORMAL, 3), PlayerRecord("b", MODE_HARD, 4),
+                            PlayerRecord("a", MODE_NORMAL, 3)])
+        store.save_records([PlayerRecord("c", MODE_NORMAL, 5), PlayerRecord("a", MODE_NORMAL, 3)])
+        self.assertEqual(store.top_rows(mode=MODE_NORMAL), [("c", MODE_NORMAL, 5), ("a", MODE_NORMAL, 3)])
+        self.assertFalse(store.admits(PlayerRecord("d", MODE_NORMAL, 3)))
+        self.assertTrue(store.admits(PlayerRecord("d", MODE_NORMAL, 4)))
+        self.assertTrue(store.admits(PlayerRecord("d", MODE_HARD, 0)))
+
+    def test_save_records_fsync_once_per_shard(self):
+        with patch('source.score_store.os.fsync', wraps=os.fsync) as fsync:
+            self.store.save_records([PlayerRecord("a", MODE_NORMAL, 3), PlayerRecord("b", MODE_HARD, 4),
+                                     PlayerRecord("c", MODE_NORMAL, 5)])
+        # two shards and the directory
+        self.assertEqual(fsync.call_count, 3)
+
+    def test_score_file_read_with_shards(self):
+        score_file = os.path.join(self.tmp_dir.name, 'scores.txt')
+        with open(score_file, 'w') as file:
+            file.write("NAME   MODE      SCORE\nold    Hard      6\nold    Normal    2\nold    Easy      1\n")
+        store = ShardedScoreStore(os.path.join(self.tmp_dir.name, 'scores'), writer='w1', score_file=score_file)
+        store.save_record(PlayerRecord("new", MODE_NORMAL, 3))
+        self.assertEqual(store.top_rows(), [("old", MODE_HARD, 6), ("new", MODE_NORMAL, 3), ("old", MODE_NORMAL, 2)])
+        self.assertEqual(store.top_rows(mode=MODE_NORMAL), [("new", MODE_NORMAL, 3), ("old", MODE_NORMAL, 2)])
+        version = store.version()
+        store.save_record(PlayerRecord("new", MODE_HARD, 1))
+        self.assertNotEqual(store.version(), version)
@@ -0,0 +1,78 @@
+import tracemalloc
+import unittest
+from unittest.mock import patch
+
+from settings import MODE_NORMAL, MODE_HARD, PLAYER_LIVES, SESSION_BYTES_BUDGET
+from source.exceptions import IncorrectModeError
+from source.game import Game
+from source.persister import WriteBehindPersister
+from source.session import SessionState, SessionHost
+
+
+class TestSessionState(unittest.TestCase):
+    def test_init(self):
+        state = SessionState("Vlad", MODE_HARD)
+        self.assertEqual((state.level, state.lives, state.score), (0, PLAYER_LIVES, 0))
+
+    def test_incorrect_mode(self):
+        with self.assertRaises(IncorrectModeError):
+            SessionState("Vlad", "wrong")
+
+    def test_no_instance_dict(self):
+        with self.assertRaises(AttributeError):
+            SessionState("Vlad", MODE_NORMAL).extra = 1
+
+    def test_mode_is_shared(self):
+        self.assertIs(SessionState("a", ''.join(['Nor', 'mal'])).mode, SessionState("b", MODE_NORMAL).mode)
+
+    @patch("builtins.input")
+    def test_from_game(self, mock_input):
+        mock_input.side_effect = ['Vlad', "2"]
+        game = Game()
+        self.assertEqual(SessionState.from_game(game).level, 0)
+        game.new_enemy()
+        game.player.score = 4
+        state = SessionState.from_game(game)
+        self.assertEqual((state.name, state.mode, state.level, state.enemy_lives, state.score),
+                         ("Vlad", MODE_HARD, 1, 2, 4))
+
+    def test_bytes_per_session_budget(self):
+        sessions_number = 10_000
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            sessions = [SessionState(f"player{i}", MODE_NORMAL) for i in range(sessions_number)]
+            used = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(len(sessions), sessions_number)
+        self.assertLessEqual(used / sessions_number, SESSION_BYTES_BUDGET)
+
+
+class TestSlots(unittest.TestCase):
+    @patch("builtins.input")
+    def test_game_has_no_class_state(self, mock_input):
+        mock_input.side_effect = ['Vlad', "1", 'Ivan', "1"]
+        first, second = Game(), Game()
+        first.new_enemy()
+        first.player.score = 3
+        self.assertEqual(second.player.score, 0)
+        self.assertFalse(hasattr(first, '__dict__'))
+        self.assertFalse(hasattr(first.player, '__dict__'))
+
+
+class TestSessionHost(unittest.TestCase):
+    def test_sessions_are_deterministic_per_seed(self):
+        attacks = ['1', '2', '3'] * 20
+        batches = []
+        with WriteBehindPersister(commit=batches.append) as persister, SessionHost(workers=4,
+                                                                                  persister=persister) as host:
+            states = host.run([(f"p{i}", MODE_HARD, attacks, i % 2) for i in range(8)])
+        self.assertEqual([state.score for state in states[0::2]], [states[0].score] * 4)
+        self.assertEqual([state.score for state in states[1::2]], [states[1].score] * 4)
+        self.assertEqual(sum(len(batch) for batch in batches), sum(state.lives == 0 for state in states))
+
+    def test_quit(self):
+        with SessionHost(workers=1) as host:
+            state = host.submit("Vlad", MODE_NORMAL, ['0'], 1).result()
+        self.assertEqual((state.level, state.lives, state.score), (1, PLAYER_LIVES, 0))
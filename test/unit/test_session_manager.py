@@ -0,0 +1,113 @@
+import unittest
+
+from source.exceptions import SessionLimitError
+from source.session_manager import TimerWheel, SessionManager
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Session:
+    def __init__(self):
+        self.expired = []
+
+    def expire(self, save):
+        self.expired.append(save)
+
+
+class TestTimerWheel(unittest.TestCase):
+    def test_expire_in_order(self):
+        wheel = TimerWheel(slots=8, tick=1.0)
+        for key, deadline in (('a', 2.5), ('b', 3.0), ('c', 5.0)):
+            wheel.schedule(key, deadline)
+        self.assertEqual(wheel.advance(2.9), [])
+        self.assertEqual(wheel.advance(3.0), ['a', 'b'])
+        self.assertEqual(wheel.advance(10.0), ['c'])
+        self.assertEqual(len(wheel), 0)
+
+    def test_reschedule_and_cancel(self):
+        wheel = TimerWheel(slots=8, tick=1.0)
+        wheel.schedule('a', 2.0)
+        wheel.schedule('b', 2.0)
+        wheel.schedule('a', 6.0)
+        wheel.cancel('b')
+        wheel.cancel('missing')
+        self.assertEqual(wheel.advance(5.0), [])
+        self.assertIn('a', wheel)
+        self.assertEqual(wheel.advance(6.0), ['a'])
+
+    def test_longer_than_one_turn(self):
+        wheel = TimerWheel(slots=4, tick=1.0)
+        wheel.schedule('a', 9.0)
+        self.assertEqual(wheel.advance(1.0), [])
+        self.assertEqual(wheel.advance(5.0), [])
+        self.assertEqual(wheel.advance(8.5), [])
+        self.assertEqual(wheel.advance(9.0), ['a'])
+
+    def test_past_deadline(self):
+        wheel = TimerWheel(slots=4, tick=1.0, now=10.0)
+        wheel.schedule('a', 3.0)
+        self.assertEqual(wheel.advance(10.0), ['a'])
+
+
+class TestSessionManager(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.manager = SessionManager(max_sessions=2, idle_timeout=10, tick=1.0, slots=4, clock=self.clock)
+
+    def test_admission(self):
+        first, second = Session(), Session()
+        self.manager.open(first)
+        self.manager.open(second)
+        with self.assertRaises(SessionLimitError):
+            self.manager.open(Session())
+        self.manager.close(first)
+        self.manager.close(first)
+        self.manager.open(Session())
+        self.assertEqual((len(self.manager), self.manager.rejected), (2, 1))
+
+    def test_idle_session_expires(self):
+        session = Session()
+        self.manager.open(session)
+        self.clock.now = 9.0
+        self.assertEqual(self.manager.expire(), 0)
+        self.clock.now = 10.0
+        self.assertEqual(self.manager.expire(), 1)
+        self.assertEqual(session.expired, [True])
+        self.assertNotIn(session, self.manager)
+
+    def test_touch_extends(self):
+        session = Session()
+        self.manager.open(session)
+        self.clock.now = 8.0
+        self.manager.touch(session)
+        self.clock.now = 12.0
+        self.assertEqual(self.manager.expire(), 0)
+        self.clock.now = 18.0
+        self.assertEqual(self.manager.expire(), 1)
+        self.assertEqual(self.manager.expired, 1)
+
+    def test_discard_expired(self):
+        manager = SessionManager(idle_timeout=1, save_expired=False, clock=self.clock)
+        session = Session()
+        manager.open(session)
+        manager.expire(5.0)
+        self.assertEqual(session.expired, [False])
+
+    def test_failed_expire_keeps_expiring(self):
+        class FailingSession(Session):
+            def expire(self, save):
+                raise OSError
+
+        first, failing, last = Session(), FailingSession(), Session()
+        manager = SessionManager(idle_timeout=1, clock=self.clock)
+        for session in (first, failing, last):
+            manager.open(session)
+        with self.assertLogs('source.session_manager', 'ERROR'):
+            self.assertEqual(manager.expire(5.0), 3)
+        self.assertEqual((first.expired, last.expired, manager.failures, len(manager)), ([True], [True], 1, 0))
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from settings import MODE_NORMAL, MODE_HARD
+from source.events import EventBus, RecordSavedEvent
+from source.record import PlayerRecord
+from source.spectators import SpectatorHub, SpectatorProtocol
+
+
+class TestSpectatorHub(unittest.TestCase):
+    def setUp(self):
+        self.hub = SpectatorHub([("Vlad", MODE_NORMAL, 5)], top_n=2)
+
+    def connect(self):
+        protocol = SpectatorProtocol(self.hub)
+        protocol.connection_made(MagicMock())
+        return protocol
+
+    def test_snapshot_on_connect(self):
+        protocol = self.connect()
+        message = json.loads(protocol.transport.write.call_args[0][0])
+        self.assertEqual(message, {'type': 'snapshot', 'version': 0,
+                                   'modes': {MODE_NORMAL: [["Vlad", 5]], MODE_HARD: []}})
+
+    def test_coalesced_diff(self):
+        protocol = self.connect()
+        for score in (1, 7, 9):
+            self.hub.publish(PlayerRecord(f"p{score}", MODE_NORMAL, score))
+        self.assertEqual(self.hub.flush(), 1)
+        self.assertEqual(self.hub.flush(), 0)
+        message = json.loads(protocol.transport.write.call_args[0][0])
+        self.assertEqual(message, {'type': 'diff', 'version': 1, 'modes': {MODE_NORMAL: [["p9", 9], ["p7", 7]]}})
+
+    def test_no_diff_below_top(self):
+        self.hub.publish(PlayerRecord("Olga", MODE_NORMAL, 6))
+        self.hub.flush()
+        self.hub.publish(PlayerRecord("Ivan", MODE_NORMAL, 1))
+        self.assertEqual(self.hub.flush(), 0)
+        self.assertEqual(self.hub.version, 1)
+
+    def test_slow_spectator_gets_snapshot(self):
+        protocol = self.connect()
+        protocol.pause_writing()
+        self.hub.publish(PlayerRecord("Olga", MODE_HARD, 6))
+        self.hub.flush()
+        self.assertEqual(protocol.transport.write.call_count, 1)
+        protocol.resume_writing()
+        message = json.loads(protocol.transport.write.call_args[0][0])
+        self.assertEqual(message['type'], 'snapshot')
+        self.assertEqual(message['modes'][MODE_HARD], [["Olga", 6]])
+
+    def test_attach(self):
+        bus = EventBus()
+        self.hub.attach(bus)
+        bus.emit(RecordSavedEvent(PlayerRecord("Olga", MODE_HARD, 6)))
+        self.hub.flush()
+        self.assertEqual(self.hub.tops[MODE_HARD], [("Olga", MODE_HARD, 6)])
+
+
+class TestSpectatorServer(unittest.TestCase):
+    def test_push(self):
+        hub = SpectatorHub([], tick=0.01)
+        hub.start(port=0)
+        try:
+            async def spectate():
+                reader, writer = await asyncio.open_connection('127.0.0.1', hub.port)
+                snapshot = json.loads(await reader.readline())
+                hub.publish(PlayerRecord("Olga", MODE_NORMAL, 7))
+                diff = json.loads(await reader.readline())
+                writer.close()
+                return snapshot, diff
+
+            snapshot, diff = asyncio.run(spectate())
+        finally:
+            hub.stop()
+        self.assertEqual(snapshot['type'], 'snapshot')
+        self.assertEqual(diff, {'type': 'diff', 'version': 1, 'modes': {MODE_NORMAL: [["Olga", 7]]}})
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from random import Random
+
+from settings import MODE_NORMAL, PAPER, STONE, SCISSORS
+from source.exceptions import IncorrectStrategyError
+from source.models import Enemy, Player, Battle
+from source.strategies import EnemyStrategy, BEATS, PLAYER_STRATEGIES, save_enemy_strategy, load_enemy_strategy, \
+    FrequencyPlayer
+
+COUNTER = {'start': (1, 0, 0), PAPER: (0, 0, 1), STONE: (1, 0, 0), SCISSORS: (0, 1, 0)}
+
+
+class TestEnemyStrategy(unittest.TestCase):
+    def test_attack_by_last_player_attack(self):
+        strategy = EnemyStrategy(COUNTER)
+        self.assertEqual(strategy.attack(Random(1).random, None), PAPER)
+        for attack in (PAPER, STONE, SCISSORS):
+            self.assertEqual(strategy.attack(Random(1).random, attack), BEATS[attack])
+
+    def test_genome(self):
+        strategy = EnemyStrategy(COUNTER)
+        self.assertEqual(EnemyStrategy.from_genome(strategy.genome()).weights, strategy.weights)
+
+    def test_incorrect(self):
+        with self.assertRaises(IncorrectStrategyError):
+            EnemyStrategy({**COUNTER, PAPER: (0, 0, 0)})
+        with self.assertRaises(IncorrectStrategyError):
+            EnemyStrategy({PAPER: (1, 1, 1)})
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'strategy.json')
+            save_enemy_strategy(path, EnemyStrategy(COUNTER))
+            self.assertEqual(load_enemy_strategy(path).weights, EnemyStrategy(COUNTER).weights)
+            with open(path, 'w') as file:
+                file.write('{"start": [1, 2]}')
+            with self.assertRaises(IncorrectStrategyError):
+                load_enemy_strategy(path)
+
+    def test_enemy_uses_strategy(self):
+        enemy = Enemy(MODE_NORMAL, 3, Random(1), EnemyStrategy(COUNTER))
+        battle = Battle(Player("Vlad"), enemy, MODE_NORMAL, headless=True)
+        self.assertEqual(enemy.attack(), PAPER)
+        battle.play_round(STONE, PAPER)
+        self.assertEqual(enemy.attack(), PAPER)
+        battle.play_round(SCISSORS, PAPER)
+        self.assertEqual(enemy.attack(), STONE)
+
+
+class TestPlayerStrategies(unittest.TestCase):
+    def test_attacks(self):
+        rng = Random(1)
+        for make in PLAYER_STRATEGIES.values():
+            player = make()
+            for _ in range(10):
+                attack = player.attack(rng)
+                self.assertIn(attack, (PAPER, STONE, SCISSORS))
+                player.observe(attack, STONE)
+
+    def test_frequency(self):
+        player = FrequencyPlayer()
+        player.observe(PAPER, STONE)
+        player.observe(PAPER, STONE)
+        player.observe(PAPER, SCISSORS)
+        self.assertEqual(player.attack(Random(1)), PAPER)
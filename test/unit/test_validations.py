@@ -1,11 +1,13 @@
 import unittest
 from contextlib import nullcontext as does_not_raise
+from unittest.mock import patch
 
 from settings import MODE_NORMAL, MODE_HARD, MODES, ALLOWED_ATTACKS, MAIN_MENU_OPTIONS
 from source.exceptions import WhiteSpaceInputError, EmptyInputError, IncorrectModeError, IncorrectLevelError, \
-    IncorrectFightResult
+    IncorrectFightResult, IncorrectScoreError, InputSchemaError
+from source.schema import compile_input_schema
 from source.validations import validate_mode, validate_name, validate_fight_result, validate_level, is_valid_input_mode, \
-    is_valid_input_menu, is_valid_input_attack, get_allowed_options, validated_score_row_size
+    is_valid_input_menu, is_valid_input_attack, get_allowed_options, validated_score_row_size, validate_record_rows
 
 
 class TestValidateName(unittest.TestCase):
@@ -21,6 +23,10 @@ class TestValidateName(unittest.TestCase):
         with self.assertRaises(WhiteSpaceInputError):
             validate_name('bla bla')
 
+    def test_validate_name_invalid_tab(self):
+        with self.assertRaises(WhiteSpaceInputError):
+            validate_name('bla\tbla')
+
 
 class TestValidateMode(unittest.TestCase):
     def test_validate_mode_valid_normal(self):
@@ -143,3 +149,50 @@ class TestValidatedTitleSize(unittest.TestCase):
     def test_valid(self):
         size = validated_score_row_size(10)
         self.assertEqual(size, 10)
+
+
+class TestCompileInputSchema(unittest.TestCase):
+    def test_compile(self):
+        schema = compile_input_schema('mode', MODES)
+        self.assertEqual(schema.options, frozenset({'1', '2'}))
+        self.assertEqual(schema.values['2'], MODE_HARD)
+
+    @patch('source.schema.load_input_options')
+    def test_asset_mismatch(self, mock_load):
+        mock_load.return_value = {'1': MODE_NORMAL}
+        with self.assertRaises(InputSchemaError):
+            compile_input_schema('mode', MODES)
+
+
+class TestValidateRecordRows(unittest.TestCase):
+    def test_valid(self):
+        rows = [('Vlad', MODE_NORMAL, 5), ('Olga', MODE_HARD, 0)]
+        self.assertEqual(validate_record_rows(rows), 2)
+
+    def test_empty(self):
+        self.assertEqual(validate_record_rows([]), 0)
+
+    def test_empty_name(self):
+        with self.assertRaises(EmptyInputError):
+            validate_record_rows([('Vlad', MODE_NORMAL, 5), ('', MODE_HARD, 1)])
+
+    def test_space_in_name(self):
+        with self.assertRaises(WhiteSpaceInputError):
+            validate_record_rows([('Vlad', MODE_NORMAL, 5), ('bla bla', MODE_HARD, 1)])
+
+    def test_tab_or_newline_in_name(self):
+        for name in ('bla\tbla', 'bla\nbla', 'bla\n'):
+            with self.subTest(name=name), self.assertRaises(WhiteSpaceInputError):
+                validate_record_rows([('Vlad', MODE_NORMAL, 5), (name, MODE_HARD, 1)])
+
+    def test_wrong_mode(self):
+        with self.assertRaises(IncorrectModeError):
+            validate_record_rows([('Vlad', 'wrong', 5)])
+
+    def test_negative_score(self):
+        with self.assertRaises(IncorrectScoreError):
+            validate_record_rows([('Vlad', MODE_NORMAL, -5)])
+
+    def test_str_score(self):
+        with self.assertRaises(IncorrectScoreError):
+            validate_record_rows([('Vlad', MODE_NORMAL, '5')])